@@ -0,0 +1,121 @@
+import sys
+from collections import OrderedDict
+
+
+class BufferCache:
+    """Keeps the documents of recently used tabs in memory.
+
+    Buffers are kept in least recently used order. When the cached
+    documents go over the memory budget, the oldest buffers are handed
+    to `write_back` (so they can be stored on disk) and dropped.
+
+    The size of a document is measured when it is put into the cache,
+    and that size is what it takes from the budget until it leaves, so
+    `size` stays right while a loading document keeps growing.
+
+    Attributes
+    ----------
+    budget : int
+        Memory budget in bytes.
+    size : int
+        Memory used by the cached buffers when they were put, in bytes.
+
+    """
+    DEFAULT_BUDGET = 64 * 1024 * 1024  # 64 MB
+
+    def __init__(self, write_back, budget=None):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        write_back : callable (key, document)
+            Called with every buffer that is evicted.
+        budget : int, optional
+            Memory budget in bytes.
+
+        """
+        self.write_back = write_back
+        self.budget = self.DEFAULT_BUDGET if budget is None else budget
+        self.buffers = OrderedDict()  # key -> (document, size when put)
+        self.size = 0
+
+    def __contains__(self, key):
+        return key in self.buffers
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def items(self):
+        """Returns (key, document) of the cached buffers, oldest first."""
+        return [(key, entry[0]) for key, entry in self.buffers.items()]
+
+    def peek(self, key):
+        """Returns the cached document or None, leaving the order as is."""
+        entry = self.buffers.get(key)
+        return None if entry is None else entry[0]
+
+    def get(self, key):
+        """Returns the cached document and marks it as recently used.
+
+        Returns
+        -------
+        Document
+            If the buffer is cached.
+        None
+            If it is not.
+
+        """
+        if key not in self.buffers:
+            return None
+
+        self.buffers.move_to_end(key)
+        return self.buffers[key][0]
+
+    def put(self, key, document):
+        """Stores the document of a buffer and evicts old ones if needed."""
+        self.pop(key)
+        size = sys.getsizeof(document)
+        self.buffers[key] = (document, size)
+        self.size += size
+        self.evict()
+
+    def pop(self, key):
+        """Removes a buffer without writing it back.
+
+        Returns
+        -------
+        Document
+            The document that was cached.
+        None
+            If the buffer was not cached.
+
+        """
+        entry = self.buffers.pop(key, None)
+        if entry is None:
+            return None
+
+        document, size = entry
+        self.size -= size
+        return document
+
+    def evict(self):
+        """Writes back the least recently used buffers until under budget.
+
+        Note
+        ----
+        The most recently used buffer is always kept, even if it is
+        bigger than the whole budget on its own.
+
+        """
+        while self.size > self.budget and len(self.buffers) > 1:
+            self.write_back_oldest()
+
+    def flush(self):
+        """Writes back and drops every cached buffer."""
+        while self.buffers:
+            self.write_back_oldest()
+
+    def write_back_oldest(self):
+        key, (document, size) = self.buffers.popitem(last=False)
+        self.size -= size
+        self.write_back(key, document)
@@ -0,0 +1,123 @@
+import re
+import tkinter as tk
+from Document import Document
+from WordIndex import count_words
+
+
+WORD_BEFORE = re.compile(r"\w*\Z")
+WORD_AFTER = re.compile(r"\w*")
+
+
+class Completer:
+    """Completion list under the cursor, with the words of every tab.
+
+    The list shows up while a word of at least `MIN_PREFIX` characters
+    is typed. Up and Down pick a word, Tab puts it in, Escape hides
+    the list. The words come from a `WordIndex`, which is kept up to
+    date with the edits of the current tab.
+
+    """
+    MIN_PREFIX = 2
+    SIZE = 8  # Words in the list
+    CONTEXT = 64  # Characters looked at around an edit for its words
+    KEYS = ("Up", "Down", "Tab", "Escape")  # Handled while it's shown
+
+    def __init__(self, app, index):
+        self.app = app
+        self.index = index
+        self.text_field = app.text_field
+        self.prefix = ""
+        self.list = tk.Listbox(
+            self.text_field, height=self.SIZE, activestyle="none",
+            exportselection=False, relief=tk.SOLID, borderwidth=1
+        )
+        self.list.bind("<Double-Button-1>", self.accept)
+
+        self.text_field.listeners.append(self.on_edit)
+        self.text_field.bind("<KeyRelease>", self.on_key, add="+")
+        self.text_field.bind("<FocusOut>", self.hide, add="+")
+        self.text_field.bind("<Button-1>", self.hide, add="+")
+        for key in self.KEYS:
+            self.text_field.bind("<" + key + ">", self.on_list_key, add="+")
+
+    @property
+    def shown(self):
+        return self.list.winfo_ismapped()
+
+    def on_edit(self, edit):
+        """Tells the index which words the edit changed."""
+        tab_manager = self.app.tab_manager
+        if not isinstance(tab_manager.document, Document):
+            return  # Large files are not indexed
+
+        text_field = self.text_field
+        index = edit.index
+        end = index + "+" + str(len(edit.inserted)) + "c"
+        context = "+" + str(self.CONTEXT) + "c"
+        before = WORD_BEFORE.search(
+            text_field.get(index + "-" + str(self.CONTEXT) + "c", index)
+        ).group()
+        after = WORD_AFTER.match(text_field.get(end, end + context)).group()
+        self.index.update(
+            tab_manager.current_file_ref["file"].name,
+            count_words(before + edit.removed + after),
+            count_words(before + edit.inserted + after)
+        )
+
+    def on_key(self, event):
+        if event.keysym in self.KEYS:
+            return
+
+        self.prefix = WORD_BEFORE.search(
+            self.text_field.get("insert-" + str(self.CONTEXT) + "c",
+                                "insert")
+        ).group()
+        words = []
+        if len(self.prefix) >= self.MIN_PREFIX:
+            words = self.index.complete(self.prefix, self.SIZE)
+        if words == []:
+            self.hide()
+            return
+
+        self.list.delete(0, tk.END)
+        self.list.insert(tk.END, *words)
+        self.list.selection_set(0)
+        self.list['height'] = len(words)
+        self.list['width'] = max(len(word) for word in words) + 2
+
+        bbox = self.text_field.bbox(tk.INSERT)
+        if bbox is None:
+            self.hide()
+            return
+        x, y, _, height = bbox
+        self.list.place(x=x, y=y + height)
+
+    def on_list_key(self, event):
+        if not self.shown:
+            return None
+
+        if event.keysym == "Tab":
+            self.accept()
+        elif event.keysym == "Escape":
+            self.hide()
+        else:
+            step = 1 if event.keysym == "Down" else -1
+            selected = self.list.curselection()
+            current = selected[0] if selected else 0
+            current = (current + step) % self.list.size()
+            self.list.selection_clear(0, tk.END)
+            self.list.selection_set(current)
+            self.list.see(current)
+        return "break"  # Keeps the keys from moving the cursor
+
+    def accept(self, event=None):
+        """Completes the word before the cursor with the selected one."""
+        selected = self.list.curselection()
+        if selected:
+            word = self.list.get(selected[0])
+            self.text_field.insert(tk.INSERT, word[len(self.prefix):])
+        self.hide()
+        self.text_field.focus_set()
+
+    def hide(self, event=None):
+        self.list.place_forget()
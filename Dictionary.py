@@ -0,0 +1,92 @@
+import os
+from array import array
+
+
+class Dictionary:
+    """Compact set of the correctly spelled words, for the spell checker.
+
+    The words of a word list are kept lowercase, sorted and joined into
+    a single string, with an array of where every word starts, so a
+    word costs its characters and four bytes instead of a Python
+    object. A Bloom filter in front of it rejects most unknown words
+    without searching. The word list is read the first time a word is
+    looked up.
+
+    """
+    PATHS = (
+        os.path.join(os.path.expanduser("~"), ".notepad", "words.txt"),
+        "/usr/share/dict/words",
+        "/usr/share/dict/american-english",
+        "/usr/share/dict/british-english",
+    )
+    BITS_PER_WORD = 10  # About 1% of unknown words get past the filter
+    HASHES = 4
+
+    def __init__(self, paths=None):
+        self.paths = self.PATHS if paths is None else paths
+        self.text = None  # The sorted words, each ending with "\n"
+        self.starts = array("I")
+        self.bits = bytearray()
+        self.size = 0  # Bits of the Bloom filter
+
+    @property
+    def available(self):
+        """True if a word list was found."""
+        self.load()
+        return len(self.starts) > 0
+
+    def load(self):
+        if self.text is not None:
+            return
+
+        words = set()
+        for path in self.paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    words.update(line.strip().lower() for line in f)
+            except (OSError, UnicodeDecodeError):
+                continue
+            break  # The first list that can be read is used
+        words.discard("")
+
+        ordered = sorted(words)
+        self.text = "".join(word + "\n" for word in ordered)
+        position = 0
+        for word in ordered:
+            self.starts.append(position)
+            position += len(word) + 1
+
+        self.size = max(len(words) * self.BITS_PER_WORD, 8)
+        self.bits = bytearray(self.size // 8 + 1)
+        for word in words:
+            for bit in self.bit_positions(word):
+                self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def bit_positions(self, word):
+        value = hash(word) & 0xFFFFFFFFFFFFFFFF
+        first = value & 0xFFFFFFFF
+        step = (value >> 32) | 1
+        return [
+            (first + number * step) % self.size
+            for number in range(self.HASHES)
+        ]
+
+    def word_at(self, number):
+        start = self.starts[number]
+        return self.text[start:self.text.index("\n", start)]
+
+    def __contains__(self, word):
+        self.load()
+        word = word.lower()
+        for bit in self.bit_positions(word):
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+
+        low, high = 0, len(self.starts)
+        while low < high:
+            middle = (low + high) // 2
+            if self.word_at(middle) < word:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(self.starts) and self.word_at(low) == word
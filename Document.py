@@ -0,0 +1,344 @@
+import os
+import random
+
+
+class _Node:
+    """A piece of the document and the root of a treap of pieces.
+
+    Nodes are never changed after they are created, so a tree can be
+    shared by several documents and read while a newer version is
+    being edited.
+
+    Attributes
+    ----------
+    source : str
+        The text the piece points into.
+    start, length : int
+        The slice of `source` that belongs to the piece.
+    newlines : int
+        Number of newlines in the piece.
+    size, total_newlines : int
+        Characters and newlines in the whole subtree.
+
+    """
+    __slots__ = (
+        "source", "start", "length", "newlines", "priority",
+        "left", "right", "size", "total_newlines"
+    )
+
+    def __init__(self, source, start, length, newlines, priority,
+                 left=None, right=None):
+        self.source = source
+        self.start = start
+        self.length = length
+        self.newlines = newlines
+        self.priority = priority
+        self.left = left
+        self.right = right
+        self.size = length
+        self.total_newlines = newlines
+        if left is not None:
+            self.size += left.size
+            self.total_newlines += left.total_newlines
+        if right is not None:
+            self.size += right.size
+            self.total_newlines += right.total_newlines
+
+    def text(self):
+        return self.source[self.start:self.start + self.length]
+
+    def replace(self, left, right):
+        """Returns a copy of the node with other children."""
+        return _Node(
+            self.source, self.start, self.length, self.newlines,
+            self.priority, left, right
+        )
+
+
+def _new_node(source, start, length):
+    newlines = source.count("\n", start, start + length)
+    return _Node(source, start, length, newlines, random.random())
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if left.priority > right.priority:
+        return left.replace(left.left, _merge(left.right, right))
+    return right.replace(_merge(left, right.left), right.right)
+
+
+def _split(node, offset):
+    """Splits the tree into the first `offset` characters and the rest."""
+    if node is None:
+        return None, None
+
+    left_size = node.left.size if node.left is not None else 0
+    if offset <= left_size:
+        first, second = _split(node.left, offset)
+        return first, node.replace(second, node.right)
+
+    offset -= left_size
+    if offset >= node.length:
+        first, second = _split(node.right, offset - node.length)
+        return node.replace(node.left, first), second
+
+    # The split falls inside of this piece
+    head = _new_node(node.source, node.start, offset)
+    tail = _new_node(node.source, node.start + offset, node.length - offset)
+    return _merge(node.left, head), _merge(tail, node.right)
+
+
+def _iter_nodes(node):
+    """Yields the pieces of the tree in order."""
+    stack = []
+    while stack or node is not None:
+        if node is not None:
+            stack.append(node)
+            node = node.left
+        else:
+            node = stack.pop()
+            yield node
+            node = node.right
+
+
+class Document:
+    """Piece table holding the text of a tab.
+
+    The pieces are kept in a treap that is balanced on average, so
+    inserts, deletes and line lookups take O(log n) time, where n is
+    the number of pieces. Every piece is at most `PIECE_SIZE`
+    characters long, which keeps splitting a piece cheap.
+
+    A document created from a file reads it as it is needed, see
+    `read_more`. Reading the text up to the end of the document loads
+    the rest of the file first.
+
+    Every applied edit increases `version`, the document is modified
+    while it differs from `saved_version`.
+
+    Note
+    ----
+    Lines and columns follow the Tk text index convention, lines start
+    at 1 and columns at 0.
+
+    """
+    PIECE_SIZE = 64 * 1024
+    stream = None  # The file, while it is not read completely
+    stream_size = 0  # Size of the file in bytes
+    newline = None  # Line ending used by the file, None for the platform's
+    formatting = None  # See shortcuts.capture_formatting, None if unknown
+    version = 0
+    saved_version = 0
+
+    def __init__(self, text=""):
+        self.root = self._build(text)
+
+    @classmethod
+    def from_file(cls, filename):
+        """Creates a document that reads the file as it is needed."""
+        document = cls()
+        document.stream = open(filename, "r", encoding="utf-8")
+        document.stream_size = os.fstat(document.stream.fileno()).st_size
+        return document
+
+    @property
+    def modified(self):
+        return self.version != self.saved_version
+
+    def mark_saved(self, version=None):
+        """Marks the document, or an earlier version of it, as saved."""
+        self.saved_version = self.version if version is None else version
+
+    @property
+    def loaded(self):
+        """True once the whole file is in the document."""
+        return self.stream is None
+
+    def read_more(self, size):
+        """Reads the next part of the file into the document.
+
+        Returns
+        -------
+        str
+            The text that was read, empty once the file is read.
+
+        """
+        if self.stream is None:
+            return ""
+
+        text = self.stream.read(size)
+        if text == "":
+            self.close_stream()
+        else:
+            self.root = _merge(self.root, self._build(text))
+
+        return text
+
+    def finish_loading(self):
+        """Reads the rest of the file into the document."""
+        while self.read_more(self.PIECE_SIZE * 16):
+            pass
+
+    def close_stream(self):
+        """Closes the file once it is read, keeping its line ending.
+
+        Files with mixed line endings are saved with the platform's
+        for every line, and so are files without any line ending.
+
+        """
+        if isinstance(self.stream.newlines, str):
+            self.newline = self.stream.newlines
+        self.stream.close()
+        self.stream = None
+
+    def __len__(self):
+        return self.root.size if self.root is not None else 0
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + len(self)
+
+    @property
+    def line_count(self):
+        if self.root is None:
+            return 1
+        return self.root.total_newlines + 1
+
+    def _build(self, text):
+        root = None
+        for start in range(0, len(text), self.PIECE_SIZE):
+            length = min(self.PIECE_SIZE, len(text) - start)
+            root = _merge(root, _new_node(text, start, length))
+        return root
+
+    def snapshot(self):
+        """Returns a copy of the document that later edits won't change.
+
+        This is O(1), since the pieces themselves are never changed.
+
+        """
+        self.finish_loading()
+        copy = Document()
+        copy.root = self.root
+        copy.newline = self.newline
+        copy.formatting = self.formatting
+        copy.version = self.version
+        return copy
+
+    def insert(self, offset, text):
+        if text == "":
+            return
+        first, second = _split(self.root, offset)
+        self.root = _merge(_merge(first, self._build(text)), second)
+
+    def delete(self, offset, length):
+        if length <= 0:
+            return
+        first, rest = _split(self.root, offset)
+        _, second = _split(rest, length)
+        self.root = _merge(first, second)
+
+    def apply(self, edit):
+        """Applies an edit reported by the text field.
+
+        Parameter
+        ---------
+        edit : EditorText.Edit
+
+        """
+        line, column = map(int, edit.index.split("."))
+        offset = self.offset_of(line, column)
+        self.delete(offset, len(edit.removed))
+        self.insert(offset, edit.inserted)
+        self.version += 1
+
+    def offset_of(self, line, column=0):
+        """Returns the character offset of a line and column."""
+        return min(self._line_start(line) + column, len(self))
+
+    def _line_start(self, line):
+        newlines = line - 1  # Newlines that come before the line
+        if newlines <= 0:
+            return 0
+
+        node = self.root
+        offset = 0
+        while node is not None:
+            left_newlines = 0
+            left_size = 0
+            if node.left is not None:
+                left_newlines = node.left.total_newlines
+                left_size = node.left.size
+
+            if newlines <= left_newlines:
+                node = node.left
+                continue
+
+            newlines -= left_newlines
+            offset += left_size
+            if newlines <= node.newlines:
+                position = node.start - 1
+                for _ in range(newlines):
+                    position = node.source.find("\n", position + 1)
+                return offset + position + 1 - node.start
+
+            newlines -= node.newlines
+            offset += node.length
+            node = node.right
+
+        return len(self)  # There are fewer lines than asked for
+
+    def line_column(self, offset):
+        """Returns the (line, column) of a character offset."""
+        offset = max(0, min(offset, len(self)))
+        node = self.root
+        remaining = offset
+        newlines = 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if remaining < left_size:
+                node = node.left
+                continue
+
+            if node.left is not None:
+                newlines += node.left.total_newlines
+            remaining -= left_size
+            if remaining < node.length:
+                newlines += node.source.count(
+                    "\n", node.start, node.start + remaining
+                )
+                break
+
+            newlines += node.newlines
+            remaining -= node.length
+            node = node.right
+
+        line = newlines + 1
+        return line, offset - self._line_start(line)
+
+    def iter_chunks(self, start=0, end=None):
+        """Yields the text between two offsets, piece by piece.
+
+        If `end` is not given, the rest of the file is read first.
+
+        """
+        if end is None:
+            self.finish_loading()
+
+        node = self.root
+        if start > 0 or (end is not None and end < len(self)):
+            _, rest = _split(node, start)
+            node, _ = _split(rest, (len(self) if end is None else end) - start)
+
+        for piece in _iter_nodes(node):
+            yield piece.text()
+
+    def get_text(self, start=0, end=None):
+        return "".join(self.iter_chunks(start, end))
+
+    def is_blank(self):
+        """Returns True if the document holds only whitespace."""
+        return not any(chunk.strip() for chunk in self.iter_chunks())
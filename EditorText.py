@@ -0,0 +1,146 @@
+import tkinter as tk
+from collections import namedtuple
+from contextlib import contextmanager
+
+
+Edit = namedtuple("Edit", ["index", "removed", "inserted"])
+Edit.__doc__ = """A change of the text field content.
+
+`removed` was replaced by `inserted` at `index` ("line.column").
+"""
+
+
+class EditorText(tk.Text):
+    """Text field that reports every change of its content.
+
+    The Tk command of the widget is replaced by a Tcl proxy, so that
+    the inserts and deletes done by the Tk bindings (typing, pasting,
+    ...) are reported as well. The listeners are called with an `Edit`
+    after the change was made, and the scroll listeners with the
+    visible part of the text, as given to yscrollcommand.
+
+    Note
+    ----
+    Only the inserts, deletes and replaces go through Python. Like in
+    IDLE, their Tcl errors (deleting an empty selection, ...) are
+    swallowed and an empty string is returned instead. The other
+    commands go straight to the widget, so their errors are raised.
+
+    """
+    PROXY = """
+        if {$command in {insert delete replace}} {
+            return [%(edit)s $command {*}$args]
+        }
+        return [%(original)s $command {*}$args]
+    """
+
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.listeners = []
+        self.scroll_listeners = []
+        self.muted_count = 0
+        self['yscrollcommand'] = self.scrolled
+
+        self.original = self._w + "_original"
+        self.tk.call("rename", self._w, self.original)
+        self.tk.call("proc", self._w, "command args", self.PROXY % {
+            "edit": self.register(self.dispatch),
+            "original": self.original
+        })
+
+    def destroy(self):
+        self.tk.call("rename", self._w, "")
+        self.tk.call("rename", self.original, self._w)
+        super().destroy()
+
+    @contextmanager
+    def muted(self):
+        """Changes made inside of the block are not reported."""
+        self.muted_count += 1
+        try:
+            yield
+        finally:
+            self.muted_count -= 1
+
+    def call(self, *args):
+        """Calls the original Tk command of the widget."""
+        return self.tk.call((self.original,) + args)
+
+    def normalize(self, index):
+        """Returns the "line.column" form of the index.
+
+        The index is limited to the last character, just like Tk does
+        when it inserts or deletes text.
+
+        """
+        index = str(self.call("index", index))
+        if self.call("compare", index, ">", "end-1c"):
+            index = str(self.call("index", "end-1c"))
+        return index
+
+    def dispatch(self, command, *args):
+        """Makes an edit and reports it, called by the proxy."""
+        try:
+            if self.muted_count:
+                return self.call(command, *args)
+            if command == "insert":
+                return self.insert_command(*args)
+            if command == "delete":
+                return self.delete_command(*args)
+            return self.replace_command(*args)
+        except tk.TclError:
+            return ""
+
+    def insert_command(self, index, *args):
+        index = self.normalize(index)
+        result = self.call("insert", index, *args)
+        self.notify(Edit(index, "", "".join(args[0::2])))
+        return result
+
+    def delete_command(self, first, last=None, *more):
+        if more:  # Several ranges, delete them from the last one
+            indexes = (first, last) + more + (None,)
+            ranges = [
+                (self.normalize(indexes[i]), indexes[i + 1])
+                for i in range(0, len(indexes) - 1, 2)
+            ]
+            ranges.sort(key=lambda pair: tuple(map(int, pair[0].split("."))))
+            for range_first, range_last in reversed(ranges):
+                self.delete_command(range_first, range_last)
+            return ""
+
+        first = self.normalize(first)
+        if last is None:
+            last = self.normalize(first + "+1c")
+        else:
+            last = self.normalize(last)
+
+        if not self.call("compare", first, "<", last):
+            return ""
+
+        removed = str(self.call("get", first, last))
+        result = self.call("delete", first, last)
+        self.notify(Edit(first, removed, ""))
+        return result
+
+    def replace_command(self, first, last, *args):
+        first = self.normalize(first)
+        last = self.normalize(last)
+        removed = ""
+        if self.call("compare", first, "<", last):
+            removed = str(self.call("get", first, last))
+
+        result = self.call("replace", first, last, *args)
+        self.notify(Edit(first, removed, "".join(args[0::2])))
+        return result
+
+    def scrolled(self, first, last):
+        for listener in self.scroll_listeners:
+            listener(float(first), float(last))
+
+    def notify(self, edit):
+        if edit.removed == "" and edit.inserted == "":
+            return
+
+        for listener in self.listeners:
+            listener(edit)
@@ -0,0 +1,274 @@
+import os
+from Document import Document
+from LargeDocument import LargeDocument
+from SaveWorker import write_file
+from ScratchStore import ScratchStore
+from TabRegistry import TabRegistry
+
+
+class Engine:
+    """The lifecycle of the documents, without a GUI.
+
+    Documents are created, opened, changed, saved and closed by their
+    filename, the same way as in the editor: files from
+    `LargeDocument.MIN_SIZE` on are memory-mapped, untitled documents
+    live in the scratch store, saves replace the file atomically and
+    keep its line endings, and formatting goes into the format store.
+    The `TabManager` loads and saves the documents of its tabs with it,
+    and `batch.py` processes files from the command line with it.
+
+    Attributes
+    ----------
+    documents : dict
+        filename -> Document or LargeDocument, of the open documents.
+    untitled : set of str
+        Names of the untitled documents, handed out by `new` or taken
+        from the scratch store by `adopt`. Every other name is a path.
+
+    """
+
+    def __init__(self, scratch_store=None, format_store=None):
+        """Initialize the engine.
+
+        Parameters
+        ----------
+        scratch_store : ScratchStore, optional
+            Created when an untitled document is first stored.
+        format_store : FormatStore, optional
+            Without it, the formatting is not kept.
+
+        """
+        self.scratch_store = scratch_store
+        self.format_store = format_store
+        self.documents = {}
+        self.untitled = set()
+        self.untitled_count = 0
+
+    def is_untitled(self, filename):
+        """Untitled documents are kept in the scratch store."""
+        return filename in self.untitled
+
+    def key(self, filename):
+        """Returns the name the formatting of the document is kept by.
+
+        It is the normalized path of the file, see `TabRegistry.key`.
+
+        """
+        if self.is_untitled(filename):
+            return filename
+        return TabRegistry.normalize(filename)
+
+    def untitled_name(self):
+        """Returns the name of a new untitled document."""
+        filename = "Untitled-" + str(self.untitled_count) + ".txt"
+        self.untitled_count += 1
+        self.untitled.add(filename)
+        return filename
+
+    def adopt(self, filename):
+        """Takes an untitled document of an earlier run, by its name.
+
+        The next names handed out come after it.
+
+        """
+        self.untitled.add(filename)
+        number = filename[len("Untitled-"):].split(".")[0]
+        if number.isdigit():
+            self.untitled_count = max(self.untitled_count, int(number) + 1)
+
+    def forget(self, filename):
+        """Drops the document, without saving it."""
+        self.documents.pop(filename, None)
+        self.untitled.discard(filename)
+
+    def scratch(self):
+        if self.scratch_store is None:
+            self.scratch_store = ScratchStore()
+        return self.scratch_store
+
+    def load_document(self, filename):
+        """Returns a new document with the content of the file.
+
+        Files bigger than `LargeDocument.MIN_SIZE` are memory-mapped
+        and only shown a window at a time. Untitled documents come from
+        the scratch store.
+
+        """
+        if self.is_untitled(filename):
+            return Document(self.scratch().load(filename) or "")
+        if os.path.getsize(filename) >= LargeDocument.MIN_SIZE:
+            return LargeDocument(filename)
+        return Document.from_file(filename)
+
+    def open(self, filename):
+        """Returns the document of the file, loading it if needed."""
+        if filename not in self.documents:
+            self.documents[filename] = self.load_document(filename)
+        return self.documents[filename]
+
+    def new(self, filename=None):
+        """Adds an empty document.
+
+        Parameter
+        ---------
+        filename : str, optional
+            Created empty. If left blank, the document is untitled.
+
+        Returns
+        -------
+        str
+            The name of the document.
+
+        """
+        if filename is None:
+            filename = self.untitled_name()
+        else:
+            self.create_file(filename)
+        self.documents[filename] = Document()
+        return filename
+
+    @staticmethod
+    def create_file(filename):
+        """Creates the file empty, or empties it.
+
+        Returns
+        -------
+        IO
+            The file, closed.
+
+        """
+        with open(filename, "w+", encoding="utf-8") as raw_file:
+            pass
+        return raw_file
+
+    def is_empty_untitled(self, filename, document=None):
+        """Returns True for an untitled document that holds no text.
+
+        Parameter
+        ---------
+        document : Document, optional
+            The document of the file, if it is not one of `documents`.
+
+        """
+        if not self.is_untitled(filename):
+            return False
+        if document is None:
+            document = self.open(filename)
+        return document.is_blank()
+
+    def remove(self, filename):
+        """Deletes the document, with its file or its scratch copy.
+
+        Its formatting is forgotten as well.
+
+        """
+        if self.is_untitled(filename):
+            self.scratch().remove(filename)
+        else:
+            os.remove(filename)
+        if self.format_store is not None:
+            self.format_store.remove(self.key(filename))
+        self.forget(filename)
+
+    @staticmethod
+    def carry_over(old, new):
+        """Makes the new document the next version of the old one.
+
+        The new document takes the old one's line ending and save
+        state. Unless it has its own, like after a replace all, its
+        formatting is dropped, since the old ranges don't fit the new
+        text.
+
+        """
+        new.newline = old.newline
+        new.version = old.version + 1
+        new.saved_version = old.saved_version
+        if new.formatting is None:
+            new.formatting = {}
+        return new
+
+    def replace_text(self, filename, text):
+        """Gives the document a new text, as one edit.
+
+        Returns
+        -------
+        bool
+            False if the text was the same.
+
+        """
+        document = self.open(filename)
+        if "".join(document.iter_chunks()) == text:
+            return False
+
+        self.documents[filename] = self.carry_over(document, Document(text))
+        return True
+
+    def transform(self, filename, function):
+        """Replaces the text of the document by function(text).
+
+        Returns
+        -------
+        bool
+            True if the text changed.
+
+        """
+        document = self.open(filename)
+        return self.replace_text(
+            filename, function("".join(document.iter_chunks()))
+        )
+
+    def set_newline(self, filename, newline):
+        """Sets the line ending the document is saved with.
+
+        Parameter
+        ---------
+        newline : str or None
+            "\\n", "\\r\\n" or None for the platform's.
+
+        """
+        document = self.open(filename)
+        document.finish_loading()  # Reading the file sets its own
+        if document.newline != newline:
+            document.newline = newline
+            document.version += 1
+
+    def write(self, filename, snapshot):
+        """Writes a snapshot of a document, on any thread."""
+        if self.is_untitled(filename):
+            self.scratch().write(filename, snapshot)
+        else:
+            write_file(filename, snapshot)
+
+    def saved(self, filename, document, snapshot):
+        """Records that the snapshot of the document was written."""
+        document.mark_saved(snapshot.version)
+        if self.format_store is not None and snapshot.formatting is not None:
+            self.format_store.write(
+                self.key(filename),
+                snapshot.formatting,
+                len(snapshot)
+            )
+
+    def save(self, filename):
+        """Saves the document right away, if it was modified."""
+        document = self.open(filename)
+        if not document.modified:
+            return
+
+        snapshot = document.snapshot()
+        self.write(filename, snapshot)
+        self.saved(filename, document, snapshot)
+
+    def close(self, filename, save=True):
+        """Closes the document.
+
+        An empty untitled document is thrown away, a modified one is
+        saved first if `save` is True.
+
+        """
+        if self.is_empty_untitled(filename):
+            self.remove(filename)
+            return
+        if save:
+            self.save(filename)
+        self.forget(filename)
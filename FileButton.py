@@ -4,20 +4,45 @@ import os
 
 
 class FileButton(ttk.Button):
-    def __init__(self, app, raw_file):
-        displayed_name = os.path.basename(raw_file.name)
+    """Tab of the tab strip, showing one of the open files.
+
+    Buttons are reused for other files as the tab strip scrolls, see
+    `assign`.
+
+    """
+
+    def __init__(self, app, master):
         super().__init__(
-            app.button_frame,
+            master,
             style="File.TButton",
-            text=displayed_name,
-            command=lambda: app.tab_manager.switch_tabs(raw_file)
+            command=lambda: app.tab_manager.switch_tabs(self.file_ref)
         )
-        self.raw_file = raw_file
-        self.pack(side=tk.LEFT, fill=tk.Y)
-        self.config(width=len(displayed_name))
+        self.file_ref = None
         self.bind(
             '<Button-2>',  # Right click for Mac / Wheel click for Windows
 
-            lambda event: app.tab_manager.close_file(self.raw_file))
+            lambda event: app.tab_manager.close_file(self.file_ref))
 
-    
+    @staticmethod
+    def displayed_name(file_ref):
+        """Returns the name of the file, with a * if it has unsaved changes."""
+        displayed_name = os.path.basename(file_ref["file"].name)
+        if file_ref["modified"]:
+            displayed_name += "*"
+        return displayed_name
+
+    def assign(self, file_ref, current=False):
+        """Shows the file reference on this button."""
+        self.file_ref = file_ref
+        displayed_name = self.displayed_name(file_ref)
+        self.config(text=displayed_name, width=len(displayed_name))
+        self.set_current(current)
+
+    def set_current(self, current):
+        if current:
+            self.configure(style="Current.File.TButton")
+        else:
+            self.configure(style="File.TButton")
+
+    def show(self):
+        self.pack(side=tk.LEFT, fill=tk.Y)
@@ -0,0 +1,211 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+
+
+class Inotify:
+    """The directories of the watched files, through Linux's inotify.
+
+    Directories are watched instead of the files, since a file saved
+    by renaming a new one over it (like `saving.atomic_write` does) is
+    another inode afterwards.
+
+    Raises
+    ------
+    OSError
+        If inotify can't be used on this system.
+
+    """
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE)
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self):
+        library = ctypes.util.find_library("c")
+        try:
+            self.libc = ctypes.CDLL(library, use_errno=True)
+            init = self.libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError("inotify is not available")
+
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}  # wd -> directory
+        self.watches = {}  # directory -> (wd, number of files)
+
+    def add(self, directory):
+        if directory in self.watches:
+            wd, count = self.watches[directory]
+            self.watches[directory] = (wd, count + 1)
+            return
+
+        wd = self.libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), self.MASK
+        )
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        self.directories[wd] = directory
+        self.watches[directory] = (wd, 1)
+
+    def remove(self, directory):
+        wd, count = self.watches.pop(directory)
+        if count > 1:
+            self.watches[directory] = (wd, count - 1)
+            return
+
+        del self.directories[wd]
+        self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self):
+        """Returns the paths that had events since the last call.
+
+        Returns
+        -------
+        set of str
+        None
+            If events were lost, every file has to be checked.
+
+        """
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return paths
+
+            position = 0
+            while position < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, position)
+                position += self.EVENT.size
+                name = data[position:position + length].rstrip(b"\0")
+                position += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    paths = None
+                elif paths is not None and wd in self.directories:
+                    paths.add(os.path.join(
+                        self.directories[wd], os.fsdecode(name)
+                    ))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Tells when the files open in the editor are changed by others.
+
+    Every file has a signature (modification time, size and inode)
+    from when it was last seen. inotify tells which files may have
+    changed, on other systems every file is checked with `os.stat`
+    every `STAT_INTERVAL`. The callback is run on the Tk thread, for
+    files whose signature changed.
+
+    Note
+    ----
+    Saves done by the editor itself have to be passed to `refresh`,
+    otherwise they are reported too.
+
+    """
+    POLL_INTERVAL = 500  # Milliseconds between inotify reads
+    STAT_INTERVAL = 2000  # Milliseconds between checks without inotify
+
+    def __init__(self, widget, on_change):
+        """Initialize the watcher.
+
+        Parameters
+        ----------
+        widget : tkinter widget
+            Used to schedule the checks.
+        on_change : callable (filename)
+            Called with the name the file was watched with.
+
+        """
+        self.widget = widget
+        self.on_change = on_change
+        self.files = {}  # real path -> filename
+        self.signatures = {}  # real path -> signature
+        self.job = None
+        try:
+            self.inotify = Inotify()
+        except OSError:
+            self.inotify = None
+
+    @staticmethod
+    def signature(path):
+        """Returns what tells a version of the file, None if it is gone."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def watch(self, filename):
+        path = os.path.realpath(filename)
+        if path in self.files:
+            return
+
+        if self.inotify is not None:
+            try:
+                self.inotify.add(os.path.dirname(path))
+            except OSError:  # Out of watches, check by polling
+                self.inotify.close()
+                self.inotify = None
+        self.files[path] = filename
+        self.signatures[path] = self.signature(path)
+        self.schedule()
+
+    def unwatch(self, filename):
+        path = os.path.realpath(filename)
+        if self.files.pop(path, None) is None:
+            return
+
+        del self.signatures[path]
+        if self.inotify is not None:
+            self.inotify.remove(os.path.dirname(path))
+
+    def refresh(self, filename):
+        """Takes the current version of the file as the known one."""
+        path = os.path.realpath(filename)
+        if path in self.files:
+            self.signatures[path] = self.signature(path)
+
+    def schedule(self):
+        if self.job is None and self.files:
+            interval = self.POLL_INTERVAL
+            if self.inotify is None:
+                interval = self.STAT_INTERVAL
+            self.job = self.widget.after(interval, self.poll)
+
+    def poll(self):
+        self.job = None
+        paths = None
+        if self.inotify is not None:
+            paths = self.inotify.read()
+        if paths is None:
+            paths = list(self.files)
+
+        for path in paths:
+            if path not in self.files:
+                continue
+            signature = self.signature(path)
+            if signature != self.signatures[path]:
+                self.signatures[path] = signature
+                self.on_change(self.files[path])
+        self.schedule()
+
+    def close(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,400 @@
+import re
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+from functools import partial
+from Document import Document
+from LargeDocument import LargeDocument
+from SearchWorker import SearchWorker
+from search import (
+    compile_pattern, find_all, replace_with_edits, replace_in_chunks,
+    move_ranges, match_at_or_after, matches_between
+)
+
+
+class FindBar(tk.Frame):
+    """Find and replace bar of the current document.
+
+    The document is searched on a `SearchWorker`, which gives all the
+    match offsets at once. Only the matches in the viewport are tagged
+    in the text field, and they are tagged again when it scrolls.
+    "Replace all" builds the new text on the worker as well, and it is
+    shown like a single edit.
+
+    Note
+    ----
+    The search runs again shortly after the text is edited.
+
+    """
+    SEARCH_DELAY = 150  # Milliseconds without typing before searching
+    MAX_TAGGED = 1000  # Matches tagged in the viewport at most
+
+    def __init__(self, app):
+        super().__init__(app.text_frame)
+        self['bg'] = app.BACKGROUND_COLOR
+        self.app = app
+        self.text_field = app.text_field
+        self.worker = SearchWorker(self)
+        self.document = None  # Document the matches were found in
+        self.matches = None
+        self.current = None  # Number of the current match
+        self.visited = False  # If the current match was selected
+        self.select_after_search = False
+        self.search_job = None
+        self.tag_job = None
+
+        self.find_text = tk.StringVar(self)
+        self.replace_text = tk.StringVar(self)
+        self.regex = tk.BooleanVar(self, False)
+        self.case = tk.BooleanVar(self, False)
+        for variable in (self.find_text, self.regex, self.case):
+            variable.trace_add("write", self.schedule_search)
+
+        self.find_entry = ttk.Entry(self, textvariable=self.find_text)
+        self.find_entry.pack(side=tk.LEFT, padx=5, pady=2)
+        self.find_entry.bind('<Return>', lambda event: self.move(1))
+        self.find_entry.bind('<Shift-Return>', lambda event: self.move(-1))
+
+        self.replace_entry = ttk.Entry(self, textvariable=self.replace_text)
+        self.replace_entry.pack(side=tk.LEFT, padx=5, pady=2)
+        self.replace_entry.bind('<Return>', lambda event: self.replace())
+
+        for text, command in (
+            ("<", lambda: self.move(-1)),
+            (">", lambda: self.move(1)),
+            ("replace", self.replace),
+            ("replace all", self.replace_all)
+        ):
+            button = ttk.Button(self, text=text, command=command)
+            button.config(width=len(text) + 1)
+            button.pack(side=tk.LEFT)
+
+        ttk.Checkbutton(self, text="regex", variable=self.regex).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Checkbutton(self, text="case", variable=self.case).pack(
+            side=tk.LEFT, padx=5
+        )
+
+        close_button = ttk.Button(self, text="x", width=2, command=self.hide)
+        close_button.pack(side=tk.RIGHT)
+        self.status = tk.Label(self, bg=app.BACKGROUND_COLOR)
+        self.status.pack(side=tk.RIGHT, padx=5)
+
+        for entry in (self.find_entry, self.replace_entry):
+            entry.bind('<Escape>', lambda event: self.hide())
+
+        self.text_field.tag_configure("match", background="#ffe28a")
+        self.text_field.tag_configure("current_match", background="#f5a623")
+        self.text_field.tag_raise("sel")
+        self.text_field.listeners.append(self.on_edit)
+        self.text_field.scroll_listeners.append(self.on_scroll)
+
+    @property
+    def shown(self):
+        return self.winfo_ismapped()
+
+    def show(self):
+        if not self.shown:
+            self.pack(side=tk.TOP, fill=tk.X, before=self.text_field)
+        self.find_entry.focus_set()
+        self.find_entry.select_range(0, tk.END)
+        self.schedule_search()
+
+    def hide(self):
+        self.pack_forget()
+        self.worker.cancel()
+        self.clear()
+        self.text_field.focus_set()
+
+    def clear(self):
+        """Forgets the matches and removes their tags."""
+        self.matches = None
+        self.current = None
+        self.text_field.tag_remove("match", "1.0", tk.END)
+        self.text_field.tag_remove("current_match", "1.0", tk.END)
+        self.status['text'] = ""
+
+    def schedule_search(self, *args):
+        """Searches once the user stopped typing for a moment."""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY, self.start_search)
+
+    def current_pattern(self):
+        """Returns the compiled pattern, or None if it can't be used."""
+        if self.find_text.get() == "":
+            self.clear()
+            return None
+
+        try:
+            return compile_pattern(
+                self.find_text.get(), self.regex.get(), self.case.get()
+            )
+        except re.error:
+            self.clear()
+            self.status['text'] = "Invalid pattern"
+            return None
+
+    def start_search(self):
+        """Searches a snapshot of the current document on the worker."""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        document = self.app.tab_manager.document
+        pattern = self.current_pattern()
+        if document is None or pattern is None:
+            return
+
+        self.app.tab_manager.sync_document()
+        snapshot = document.snapshot()
+        self.status['text'] = "Searching..."
+        self.worker.submit(
+            lambda: find_all(snapshot.iter_chunks(), pattern),
+            lambda matches, error: self.searched(document, matches, error)
+        )
+
+    def searched(self, document, matches, error):
+        if error is not None:
+            self.clear()
+            self.status['text'] = str(error)
+            return
+
+        self.document = document
+        self.matches = matches
+        self.current = match_at_or_after(matches, self.offset_at(tk.INSERT))
+        self.visited = False
+        if self.select_after_search and len(matches.starts) > 0:
+            self.move(0)
+        else:
+            self.tag_visible()
+            self.update_status()
+        self.select_after_search = False
+
+    def update_status(self):
+        count = len(self.matches.starts)
+        if count == 0:
+            self.status['text'] = "No matches"
+        else:
+            self.status['text'] = "{:,} of {:,} matches".format(
+                self.current + 1, count
+            )
+
+    def block_of(self, offset):
+        """Returns the block of a large document that holds the offset."""
+        return bisect_right(self.matches.chunk_starts, offset) - 1
+
+    def index_of(self, offset):
+        """Returns the text field index of a document offset.
+
+        It is None if the offset is not in the window of a large
+        document.
+
+        """
+        if isinstance(self.document, LargeDocument):
+            block = self.block_of(offset)
+            if not self.document.first <= block < self.document.last:
+                return None
+            column = offset - self.matches.chunk_starts[block]
+            return "block" + str(block) + "+" + str(column) + "c"
+
+        line, column = self.document.line_column(offset)
+        return str(line) + "." + str(column)
+
+    def offset_at(self, index):
+        """Returns the document offset of a text field index."""
+        if isinstance(self.document, LargeDocument):
+            for block in reversed(range(self.document.first,
+                                        self.document.last)):
+                mark = "block" + str(block)
+                if self.text_field.compare(index, ">=", mark):
+                    count = self.text_field.count(mark, index, "chars")
+                    column = count[0] if count else 0
+                    return self.matches.chunk_starts[block] + column
+            return 0
+
+        line, column = map(int, self.text_field.index(index).split("."))
+        return self.document.offset_of(line, column)
+
+    def tag_visible(self):
+        """Tags the matches that are in the viewport."""
+        self.tag_job = None
+        self.text_field.tag_remove("match", "1.0", tk.END)
+        self.text_field.tag_remove("current_match", "1.0", tk.END)
+        if self.matches is None:
+            return
+
+        bottom = "@0," + str(self.text_field.winfo_height()) + " lineend"
+        shown = matches_between(
+            self.matches, self.offset_at("@0,0"), self.offset_at(bottom)
+        )
+        for number in shown[:self.MAX_TAGGED]:
+            self.tag_match("match", number)
+        if self.current is not None:
+            self.tag_match("current_match", self.current)
+
+    def tag_match(self, tag, number):
+        index = self.index_of(self.matches.starts[number])
+        if index is not None:
+            length = self.matches.ends[number] - self.matches.starts[number]
+            end_index = index + "+" + str(length) + "c"
+            self.text_field.tag_add(tag, index, end_index)
+
+    def on_edit(self, edit):
+        if self.shown:
+            self.schedule_search()
+
+    def on_scroll(self, first, last):
+        if not self.shown or self.matches is None:
+            return
+
+        if self.app.tab_manager.document is not self.document:
+            self.schedule_search()  # The tab was switched
+        elif self.tag_job is None:
+            self.tag_job = self.after_idle(self.tag_visible)
+
+    def move(self, step):
+        """Selects the next (1), previous (-1) or current (0) match."""
+        if not self.matches or len(self.matches.starts) == 0:
+            return
+
+        if self.visited:
+            self.current = (self.current + step) % len(self.matches.starts)
+        self.visited = True
+
+        start = self.matches.starts[self.current]
+        end = self.matches.ends[self.current]
+        index = self.index_of(start)
+        if index is None:  # Outside of the window of a large file
+            self.document.show_block(self.text_field, self.block_of(start))
+            index = self.index_of(start)
+
+        end_index = index + "+" + str(end - start) + "c"
+        self.text_field.tag_remove("sel", "1.0", tk.END)
+        self.text_field.tag_add("sel", index, end_index)
+        self.text_field.mark_set(tk.INSERT, end_index)
+        self.text_field.see(index)
+        self.tag_visible()
+        self.update_status()
+
+    def replace(self):
+        """Replaces the selected match and selects the next one."""
+        if not self.matches or not self.visited:
+            self.move(0)
+            return
+
+        pattern = self.current_pattern()
+        if pattern is None:
+            return
+
+        ranges = self.text_field.tag_ranges("sel")
+        if len(ranges) != 2:
+            return
+        start, end = map(str, ranges)
+        match = pattern.fullmatch(self.text_field.get(start, end))
+        if match is None:
+            return
+
+        replacement = self.replace_text.get()
+        if self.regex.get():
+            replacement = match.expand(replacement)
+        self.text_field.replace(start, end, replacement)
+
+        # The offsets are stale until the search is done again
+        self.clear()
+        self.select_after_search = True
+        self.start_search()
+
+    def replace_all(self):
+        """Replaces every match on the worker, as a single edit."""
+        tab_manager = self.app.tab_manager
+        document = tab_manager.document
+        pattern = self.current_pattern()
+        if document is None or pattern is None:
+            return
+
+        tab_manager.sync_document()
+        snapshot = document.snapshot()
+        replacement = self.replace_text.get()
+        regex = self.regex.get()
+        if isinstance(document, LargeDocument):
+            job = partial(
+                replace_in_chunks,
+                snapshot.iter_chunks(), pattern, replacement, regex
+            )
+        else:
+            job = partial(
+                self.replaced_document, snapshot, pattern, replacement, regex
+            )
+
+        self.clear()
+        self.status['text'] = "Replacing..."
+        self.worker.submit(
+            job,
+            lambda result, error: self.replaced(
+                document, snapshot.version, result, error
+            )
+        )
+
+    @staticmethod
+    def replaced_document(snapshot, pattern, replacement, regex):
+        """Returns (new Document, edits) for the undo history.
+
+        The formatting of the snapshot is moved along with the text.
+
+        """
+        text, edits = replace_with_edits(
+            "".join(snapshot.iter_chunks()), pattern, replacement, regex
+        )
+        document = Document(text)
+        if snapshot.formatting is not None:
+            document.formatting = {}
+            for tag, ranges in snapshot.formatting.items():
+                offsets = [
+                    (snapshot.offset_of(start_line, start_column),
+                     snapshot.offset_of(end_line, end_column))
+                    for start_line, start_column, end_line, end_column
+                    in ranges
+                ]
+                document.formatting[tag] = [
+                    document.line_column(start) + document.line_column(end)
+                    for start, end in move_ranges(offsets, edits)
+                ]
+        for number, (offset, removed, inserted) in enumerate(edits):
+            line, column = document.line_column(offset)
+            edits[number] = (
+                str(line) + "." + str(column), removed, inserted
+            )
+        return document, edits
+
+    def replaced(self, document, version, result, error):
+        tab_manager = self.app.tab_manager
+        if error is not None:
+            self.status['text'] = str(error)
+            return
+        changed = document.version != version
+        if tab_manager.document is not document or changed:
+            self.status['text'] = "The text changed, nothing was replaced"
+            return
+
+        if isinstance(document, LargeDocument):
+            new_blocks, count = result
+        else:
+            new_document, edits = result
+            count = len(edits)
+        if count == 0:
+            self.status['text'] = "No matches"
+            return
+
+        if isinstance(document, LargeDocument):
+            document.overlays.update(new_blocks)
+            document.version += 1
+            document.show(self.text_field)
+            tab_manager.app.tab_strip.set_modified(
+                tab_manager.current_file_ref, document.modified
+            )
+        else:
+            tab_manager.replace_document(new_document, edits)
+
+        self.start_search()
+        self.status['text'] = "Replaced {:,} matches".format(count)
@@ -0,0 +1,143 @@
+import json
+import os
+import threading
+import zlib
+
+
+def merge_ranges(ranges):
+    """Returns the ranges sorted, with overlapping or touching ones merged.
+
+    Parameter
+    ---------
+    ranges : iterable of tuple (start line, start column, end line,
+        end column)
+
+    """
+    merged = []
+    for start_line, start_column, end_line, end_column in sorted(ranges):
+        start, end = (start_line, start_column), (end_line, end_column)
+        if merged != [] and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [start + end for start, end in merged]
+
+
+def encode(formatting):
+    """Returns the formatting as a compressed run-length blob.
+
+    Every range is stored as the lines and columns it moved from the
+    end of the previous one, and its length, so the numbers stay small
+    and compress well.
+
+    Parameter
+    ---------
+    formatting : dict
+        Tag -> list of (start line, start column, end line, end column).
+
+    """
+    runs = {}
+    for tag, ranges in formatting.items():
+        numbers = []
+        line, column = 1, 0
+        for start_line, start_column, end_line, end_column in merge_ranges(
+            ranges
+        ):
+            if start_line != line:
+                column = 0  # Columns on a new line are not relative
+            numbers += [start_line - line, start_column - column]
+            end_from = start_column if end_line == start_line else 0
+            numbers += [end_line - start_line, end_column - end_from]
+            line, column = end_line, end_column
+        runs[tag] = numbers
+    return zlib.compress(json.dumps(runs, separators=(",", ":")).encode())
+
+
+def decode(blob):
+    """Returns the formatting that was encoded with `encode`."""
+    formatting = {}
+    runs = json.loads(zlib.decompress(blob).decode())
+    for tag, numbers in runs.items():
+        ranges = []
+        line, column = 1, 0
+        for position in range(0, len(numbers), 4):
+            line_step, start_column, line_span, end_column = (
+                numbers[position:position + 4]
+            )
+            start_line = line + line_step
+            if line_step == 0:
+                start_column += column
+            end_line = start_line + line_span
+            if line_span == 0:
+                end_column += start_column
+            ranges.append((start_line, start_column, end_line, end_column))
+            line, column = end_line, end_column
+        formatting[tag] = ranges
+    return formatting
+
+
+class FormatStore:
+    """SQLite database holding the formatting of the documents.
+
+    The text of a document is saved as plain text, its formatting tags
+    are stored here as run-length ranges, see `encode`. Every row also
+    has the length of the text it belongs to, so formatting is not put
+    on a file that was changed by another program.
+
+    """
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".notepad", "formatting.sqlite3"
+    )
+
+    def __init__(self, path=None):
+        import sqlite3  # Slow, so only imported once a store is opened
+        self.path = self.DEFAULT_PATH if path is None else path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS formatting ("
+            "name TEXT PRIMARY KEY, length INTEGER, ranges BLOB)"
+        )
+
+    def write(self, name, formatting, length):
+        """Stores the formatting of a text of `length` characters.
+
+        A document without formatting has its row removed.
+
+        """
+        if not any(formatting.values()):
+            self.remove(name)
+            return
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO formatting VALUES (?, ?, ?)",
+                (name, length, encode(formatting))
+            )
+
+    def load(self, name, length):
+        """Returns the formatting of the text, or None.
+
+        It is None as well if it was stored for a text of another
+        length.
+
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT length, ranges FROM formatting WHERE name = ?",
+                (name,)
+            ).fetchone()
+        if row is None or row[0] != length:
+            return None
+        return decode(row[1])
+
+    def remove(self, name):
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM formatting WHERE name = ?", (name,)
+            )
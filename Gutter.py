@@ -0,0 +1,60 @@
+import tkinter as tk
+from tkinter.font import Font
+
+
+class Gutter(tk.Canvas):
+    """Line numbers on the left of the text field.
+
+    Only the numbers of the lines in view are drawn. Edits and scrolls
+    schedule a redraw when Tk is idle, so a burst of them is drawn
+    once.
+
+    """
+    PADDING = 8  # Pixels on both sides of the numbers
+    COLOR = "#a0a1a7"
+
+    def __init__(self, app, master):
+        super().__init__(
+            master, width=0, highlightthickness=0, bg="#f5f5f5"
+        )
+        self.app = app
+        self.text_field = app.text_field
+        self.font = Font(font=self.text_field['font'])
+        self.redraw_job = None
+        self.text_field.listeners.append(self.schedule)
+        self.text_field.scroll_listeners.append(self.schedule)
+        self.text_field.bind("<Configure>", self.schedule, add="+")
+
+    def schedule(self, *args):
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.redraw)
+
+    def redraw(self):
+        self.redraw_job = None
+        self.delete("all")
+        text_field = self.text_field
+        offset = self.app.tab_manager.line_offset()
+
+        # Wide enough for the number of the last line
+        last_line = int(text_field.index("end-1c").split(".")[0]) + offset
+        width = self.font.measure("0" * len(str(last_line)))
+        width += 2 * self.PADDING
+        if int(self['width']) != width:
+            self['width'] = width
+
+        index = text_field.index("@0,0 linestart")
+        while True:
+            info = text_field.dlineinfo(index)
+            if info is not None:
+                line = int(index.split(".")[0]) + offset
+                self.create_text(
+                    width - self.PADDING, info[1], anchor=tk.NE,
+                    text=str(line), font=self.font, fill=self.COLOR
+                )
+            elif text_field.compare(index, ">", "@0,0"):
+                break  # Past the bottom of the view
+
+            next_index = text_field.index(index + "+1 lines linestart")
+            if next_index == index:
+                break  # The last line
+            index = next_index
@@ -0,0 +1,186 @@
+class Highlighter:
+    """Colors the text field with the tokens of a `Lexer`.
+
+    The lexer state at the start of every line is kept in `states`.
+    An edit only invalidates the states from its line on, and the lines
+    after it are lexed again until their state is the same as before,
+    so the rest of the file is known to be unchanged. Only the lines in
+    the viewport and a margin around it are tagged, and lines that are
+    still tagged correctly are not tagged again.
+
+    Note
+    ----
+    Lines are numbered from 1 like in Tk, `states[i]` is the state at
+    the start of line i + 1.
+
+    """
+    MARGIN = 50  # Lines tagged above and below the viewport
+    BATCH = 2000  # Lines lexed before letting Tk handle events
+    COLORS = {
+        "keyword": "#a626a4",
+        "string": "#50a14f",
+        "comment": "#a0a1a7",
+        "number": "#986801",
+    }
+
+    def __init__(self, text_field):
+        self.text_field = text_field
+        self.lexer = None
+        self.states = []
+        self.valid = 0  # Number of states that are known to be right
+        self.dirty_end = 0  # Lines up to this one must be lexed again
+        self.tagged = set()  # Lines whose tags are up to date
+        self.job = None
+
+        for tag, color in self.COLORS.items():
+            self.text_field.tag_configure(self.tag_name(tag), foreground=color)
+        self.text_field.listeners.append(self.on_edit)
+        self.text_field.scroll_listeners.append(self.on_scroll)
+
+    @staticmethod
+    def tag_name(tag):
+        return "syntax_" + tag
+
+    def reset(self, lexer):
+        """Starts over for a new text, highlighted with the lexer.
+
+        Parameter
+        ---------
+        lexer : Lexer or None
+            None turns the highlighting off.
+
+        """
+        self.lexer = lexer
+        self.states = [] if lexer is None else [lexer.INITIAL]
+        self.valid = len(self.states)
+        self.dirty_end = 0
+        self.tagged = set()
+        for tag in self.COLORS:
+            self.text_field.tag_remove(self.tag_name(tag), "1.0", "end")
+        self.schedule()
+
+    def schedule(self, delay=None):
+        if self.job is None and self.lexer is not None:
+            if delay is None:
+                self.job = self.text_field.after_idle(self.refresh)
+            else:
+                self.job = self.text_field.after(delay, self.refresh)
+
+    def on_scroll(self, first, last):
+        self.schedule()
+
+    def on_edit(self, edit):
+        """Forgets the states and tags of the lines that were changed."""
+        if self.lexer is None:
+            return
+
+        line = int(edit.index.split(".")[0])
+        removed = edit.removed.count("\n")
+        inserted = edit.inserted.count("\n")
+        moved = inserted - removed
+
+        # The lines after `line` that were removed get new start states
+        self.states[line:line + removed] = [None] * inserted
+        self.valid = min(self.valid, line)
+        if self.dirty_end > line + removed:
+            self.dirty_end += moved
+        self.dirty_end = max(self.dirty_end, line + inserted)
+
+        self.tagged = {
+            tagged if tagged < line else tagged + moved
+            for tagged in self.tagged
+            if tagged < line or tagged > line + removed
+        }
+        self.schedule()
+
+    def invalidate(self, line):
+        """Lexes and tags the line again, its text was changed unseen."""
+        if self.lexer is None:
+            return
+
+        self.valid = min(self.valid, line)
+        self.dirty_end = max(self.dirty_end, line)
+        self.tagged.discard(line)
+        self.schedule()
+
+    def line_of(self, index):
+        return int(self.text_field.index(index).split(".")[0])
+
+    def visible_lines(self):
+        """Returns the first and last line to tag."""
+        height = self.text_field.winfo_height()
+        first = self.line_of("@0,0") - self.MARGIN
+        last = self.line_of("@0," + str(height)) + self.MARGIN
+        return max(first, 1), min(last, self.line_of("end-1c"))
+
+    def line_text(self, line):
+        return self.text_field.get(str(line) + ".0", str(line) + ".end")
+
+    def refresh(self):
+        """Lexes what is needed to tag the lines in view, and tags them.
+
+        If there are too many lines to lex, the rest is done later.
+
+        """
+        self.job = None
+        if self.lexer is None:
+            return
+
+        first, last = self.visible_lines()
+        budget = self.BATCH
+
+        # Find the states up to the last line, lexing what changed
+        while self.valid <= last and budget > 0:
+            line = self.valid
+            tokens, state = self.lexer.tokenize(
+                self.line_text(line), self.states[line - 1]
+            )
+            if first <= line:
+                self.tag_line(line, tokens)
+
+            if line < len(self.states):
+                unchanged = self.states[line] == state
+                self.states[line] = state
+            else:
+                unchanged = False
+                self.states.append(state)
+            self.valid = line + 1
+
+            if unchanged and line >= self.dirty_end:
+                self.valid = len(self.states)  # The rest is still right
+            elif not unchanged:
+                self.tagged.discard(line + 1)
+            budget -= 1
+
+        if self.valid <= last:
+            self.schedule(1)
+            return
+
+        # Tag the lines that came into view
+        for line in range(first, last + 1):
+            if line not in self.tagged:
+                tokens, _ = self.lexer.tokenize(
+                    self.line_text(line), self.states[line - 1]
+                )
+                self.tag_line(line, tokens)
+
+        # Lines out of view are tagged again when they come back
+        self.tagged = {
+            line for line in self.tagged if first <= line <= last
+        }
+
+    def tag_line(self, line, tokens):
+        start = str(line) + ".0"
+        end = str(line) + ".end"
+        for tag in self.COLORS:
+            self.text_field.tag_remove(self.tag_name(tag), start, end)
+
+        ranges = {}
+        for start_column, end_column, tag in tokens:
+            ranges.setdefault(tag, []).extend((
+                str(line) + "." + str(start_column),
+                str(line) + "." + str(end_column)
+            ))
+        for tag, indexes in ranges.items():
+            self.text_field.tag_add(self.tag_name(tag), *indexes)
+        self.tagged.add(line)
@@ -0,0 +1,250 @@
+import copy
+import mmap
+
+
+class LargeDocument:
+    """Document of a file that is too big to be loaded all at once.
+
+    The file is memory-mapped and split into blocks of about
+    `BLOCK_SIZE` bytes, each ending on a newline. Only a window of
+    `WINDOW_BLOCKS` blocks around the viewport is in the text field,
+    the next blocks are paged in as the user scrolls. Blocks that were
+    edited are kept in `overlays` until the file is saved. Files that
+    use "\r\n" line endings in their first block are shown with "\n"
+    and saved back with "\r\n", the other ones are saved with "\n".
+
+    Note
+    ----
+    The start of every block in the window is kept as a "block<i>"
+    mark in the text field.
+
+    The map stays open while the document is, and keeps reading the
+    old file after a save renamed the new one over it. Windows can't
+    rename over a mapped file, so saving a large file fails there: the
+    error is shown and the edits are kept in the document.
+
+    """
+    MIN_SIZE = 64 * 1024 * 1024  # Files from this size on are large
+    BLOCK_SIZE = 256 * 1024
+    WINDOW_BLOCKS = 3
+    EDGE = 0.1  # Part of the window that makes it move when scrolled into
+    version = 0
+    saved_version = 0
+    formatting = None  # Formatting is not kept for large files
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.blocks = self.find_blocks()
+        self.newline = "\n"
+        if b"\r\n" in self.map[:self.blocks[1]]:
+            self.newline = "\r\n"
+        self.overlays = {}  # block index -> edited text
+        self.newline_counts = {}  # block index -> newlines in the file
+        self.first = 0  # The window is blocks[first:last]
+        self.last = min(self.WINDOW_BLOCKS, self.block_count)
+        self.shift_pending = False
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sum(
+            len(text) for text in self.overlays.values()
+        )
+
+    @property
+    def modified(self):
+        return self.version != self.saved_version
+
+    def mark_saved(self, version=None):
+        """Marks the document, or an earlier version of it, as saved."""
+        self.saved_version = self.version if version is None else version
+
+    def snapshot(self):
+        """Returns a copy that shares the map but not the overlays.
+
+        Note
+        ----
+        The edits in the window are only seen after `capture`.
+
+        """
+        snapshot = copy.copy(self)
+        snapshot.overlays = dict(self.overlays)
+        return snapshot
+
+    @property
+    def block_count(self):
+        return len(self.blocks) - 1
+
+    def find_blocks(self):
+        """Returns the offsets where the blocks start, and the file size."""
+        blocks = [0]
+        size = len(self.map)
+        while blocks[-1] < size:
+            end = self.map.find(b"\n", blocks[-1] + self.BLOCK_SIZE)
+            blocks.append(size if end == -1 else end + 1)
+        return blocks
+
+    def original_text(self, block):
+        text = self.map[self.blocks[block]:self.blocks[block + 1]].decode(
+            "utf-8"
+        )
+        if self.newline != "\n":
+            text = text.replace(self.newline, "\n")
+        return text
+
+    def block_text(self, block):
+        if block in self.overlays:
+            return self.overlays[block]
+        return self.original_text(block)
+
+    def iter_chunks(self):
+        """Yields the text of the document, block by block.
+
+        Note
+        ----
+        The edits in the window are only seen after `capture`.
+
+        """
+        for block in range(self.block_count):
+            yield self.block_text(block)
+
+    def finish_loading(self):
+        """The whole file is always available through the map."""
+
+    def is_blank(self):
+        return not any(chunk.strip() for chunk in self.iter_chunks())
+
+    def apply(self, edit):
+        """Edits stay in the text field until the window is captured."""
+        self.version += 1
+
+    def block_end(self, block):
+        if block + 1 < self.last:
+            return "block" + str(block + 1)
+        return "end-1c"
+
+    def capture_block(self, text_field, block):
+        """Stores the text of a block in the window as an overlay."""
+        text = text_field.get("block" + str(block), self.block_end(block))
+        if text != self.original_text(block):
+            self.overlays[block] = text
+        else:
+            self.overlays.pop(block, None)
+
+    def capture(self, text_field):
+        """Stores the edits made in the window."""
+        for block in range(self.first, self.last):
+            self.capture_block(text_field, block)
+
+    def show(self, text_field):
+        """Loads the window into the text field."""
+        with text_field.muted():
+            text_field.delete("1.0", "end")
+            for name in text_field.mark_names():
+                if str(name).startswith("block"):
+                    text_field.mark_unset(name)
+
+            for block in range(self.first, self.last):
+                self.append_block(text_field, block)
+
+    def show_block(self, text_field, block):
+        """Moves the window so that it holds the block, and shows it."""
+        self.capture(text_field)
+        last_first = max(self.block_count - self.WINDOW_BLOCKS, 0)
+        self.first = max(0, min(block - 1, last_first))
+        self.last = min(self.first + self.WINDOW_BLOCKS, self.block_count)
+        self.show(text_field)
+
+    def block_lines(self, block):
+        """Returns the number of newlines in the block."""
+        if block in self.overlays:
+            return self.overlays[block].count("\n")
+        if block not in self.newline_counts:
+            start, end = self.blocks[block], self.blocks[block + 1]
+            self.newline_counts[block] = self.map[start:end].count(b"\n")
+        return self.newline_counts[block]
+
+    def first_line(self):
+        """Returns the line of the file that the window starts with."""
+        return 1 + sum(self.block_lines(block) for block in range(self.first))
+
+    def show_line(self, text_field, line):
+        """Moves the window to the line, and returns its index."""
+        self.capture(text_field)
+        first_line = 1  # Line where the block starts
+        for block in range(self.block_count - 1):
+            block_lines = self.block_lines(block)
+            if line < first_line + block_lines:
+                break
+            first_line += block_lines
+        else:
+            block = self.block_count - 1  # Lines past the end go there
+
+        if not self.first <= block < self.last:
+            self.show_block(text_field, block)
+        return "block" + str(block) + "+" + str(line - first_line) + " lines"
+
+    def append_block(self, text_field, block):
+        mark = "block" + str(block)
+        text_field.mark_set(mark, "end-1c")
+        text_field.mark_gravity(mark, "left")
+        text_field.insert("end-1c", self.block_text(block))
+
+    def scrolled(self, text_field, first, last):
+        """Moves the window when the view gets close to one of its ends.
+
+        Parameters
+        ----------
+        text_field : EditorText
+        first, last : float
+            The visible part of the text field, as given to its
+            yscrollcommand.
+
+        """
+        if self.shift_pending:
+            return
+
+        if last > 1 - self.EDGE and self.last < self.block_count:
+            step = 1
+        elif first < self.EDGE and self.first > 0:
+            step = -1
+        else:
+            return
+
+        self.shift_pending = True
+        text_field.after_idle(self.shift, text_field, step)
+
+    def shift(self, text_field, step):
+        """Moves the window one block down (step 1) or up (step -1)."""
+        self.shift_pending = False
+        top_line = int(text_field.index("@0,0").split(".")[0])
+
+        with text_field.muted():
+            if step > 0:
+                self.capture_block(text_field, self.first)
+                next_first = "block" + str(self.first + 1)
+                moved_lines = int(text_field.index(next_first).split(".")[0])
+                moved_lines -= 1
+                text_field.delete("1.0", next_first)
+                text_field.mark_unset("block" + str(self.first))
+                self.append_block(text_field, self.last)
+                self.first += 1
+                self.last += 1
+            else:
+                self.capture_block(text_field, self.last - 1)
+                text_field.delete("block" + str(self.last - 1), "end-1c")
+                text_field.mark_unset("block" + str(self.last - 1))
+                text = self.block_text(self.first - 1)
+                text_field.insert("1.0", text)
+                self.first -= 1
+                self.last -= 1
+                text_field.mark_set("block" + str(self.first), "1.0")
+                text_field.mark_set(
+                    "block" + str(self.first + 1),
+                    "1.0+" + str(len(text)) + "c"
+                )
+                moved_lines = -text.count("\n")
+
+        # Keep the same line at the top of the view
+        text_field.yview(str(max(top_line - moved_lines, 1)) + ".0")
@@ -0,0 +1,146 @@
+import os
+import re
+
+
+class Lexer:
+    """Splits a line of text into tokens, for the `Highlighter`.
+
+    `rules` maps every state to a list of (regex, tag, next state). A
+    state is what is carried from the end of a line to the start of
+    the next one, so constructs that span lines (block comments, long
+    strings) are lexed one line at a time. A tag of None leaves the
+    text as it is, and a next state of None keeps the state.
+
+    """
+    INITIAL = "root"
+    rules = {}
+
+    def __init__(self):
+        self.patterns = {}
+        self.actions = {}
+        for state, rules in self.rules.items():
+            groups = []
+            for number, (regex, tag, next_state) in enumerate(rules):
+                name = "rule" + str(number)
+                groups.append("(?P<" + name + ">" + regex + ")")
+                self.actions[state, name] = (tag, next_state)
+            self.patterns[state] = re.compile("|".join(groups))
+
+    def tokenize(self, line, state):
+        """Returns the tokens of a line and the state at its end.
+
+        Parameters
+        ----------
+        line : str
+            Without the newline.
+        state : str
+            The state at the end of the previous line.
+
+        Returns
+        -------
+        list of tuple (start column, end column, tag), str
+
+        """
+        tokens = []
+        position = 0
+        while position < len(line):
+            match = self.patterns[state].search(line, position)
+            if match is None:
+                break
+
+            tag, next_state = self.actions[state, match.lastgroup]
+            if tag is not None and match.end() > match.start():
+                tokens.append((match.start(), match.end(), tag))
+            if next_state is not None:
+                state = next_state
+            position = max(match.end(), position + 1)
+        return tokens, state
+
+
+def keywords(*words):
+    return r"\b(?:" + "|".join(words) + r")\b"
+
+
+NUMBER = r"\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*\.?\d*(?:[eE][+-]?\d+)?)"
+
+
+class PythonLexer(Lexer):
+    rules = {
+        "root": [
+            (r"#.*", "comment", None),
+            (r'[rRbBuUfF]{0,2}"""', "string", "long_string"),
+            (r"[rRbBuUfF]{0,2}'''", "string", "long_bytes"),
+            (r'[rRbBuUfF]{0,2}"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"[rRbBuUfF]{0,2}'(?:[^'\\]|\\.)*'?", "string", None),
+            (keywords(
+                "False", "None", "True", "and", "as", "assert", "async",
+                "await", "break", "class", "continue", "def", "del",
+                "elif", "else", "except", "finally", "for", "from",
+                "global", "if", "import", "in", "is", "lambda",
+                "nonlocal", "not", "or", "pass", "raise", "return",
+                "try", "while", "with", "yield"
+            ), "keyword", None),
+            (r"@[\w.]+", "keyword", None),
+            (NUMBER, "number", None),
+            (r"\w+", None, None),
+        ],
+        "long_string": [
+            (r'(?:[^"\\]|\\.|"(?!""))*"""', "string", "root"),
+            (r".+", "string", None),
+        ],
+        "long_bytes": [
+            (r"(?:[^'\\]|\\.|'(?!''))*'''", "string", "root"),
+            (r".+", "string", None),
+        ],
+    }
+
+
+class CLexer(Lexer):
+    """C, C++, Java, JavaScript and their kind."""
+    rules = {
+        "root": [
+            (r"//.*", "comment", None),
+            (r"/\*(?:[^*]|\*(?!/))*\*/", "comment", None),
+            (r"/\*.*", "comment", "block_comment"),
+            (r'"(?:[^"\\]|\\.)*"?', "string", None),
+            (r"'(?:[^'\\]|\\.)*'?", "string", None),
+            (r"`(?:[^`\\]|\\.)*`?", "string", None),
+            (r"^\s*#\s*\w+", "keyword", None),
+            (keywords(
+                "auto", "break", "case", "catch", "char", "class",
+                "const", "continue", "default", "delete", "do", "double",
+                "else", "enum", "export", "extends", "extern", "false",
+                "final", "float", "for", "function", "goto", "if",
+                "import", "int", "interface", "let", "long", "namespace",
+                "new", "null", "private", "protected", "public",
+                "return", "short", "signed", "sizeof", "static",
+                "struct", "switch", "template", "this", "throw", "true",
+                "try", "typedef", "union", "unsigned", "var", "void",
+                "volatile", "while"
+            ), "keyword", None),
+            (NUMBER, "number", None),
+            (r"\w+", None, None),
+        ],
+        "block_comment": [
+            (r"(?:[^*]|\*(?!/))*\*/", "comment", "root"),
+            (r".+", "comment", None),
+        ],
+    }
+
+
+# File extension -> Lexer class, other modules can add their own
+LEXERS = {
+    ".py": PythonLexer,
+    ".pyw": PythonLexer,
+}
+for extension in (".c", ".h", ".cpp", ".hpp", ".cc", ".java", ".js",
+                  ".ts", ".cs", ".go", ".rs", ".swift", ".kt"):
+    LEXERS[extension] = CLexer
+
+
+def lexer_for(filename):
+    """Returns a lexer for the file, or None if there is none."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in LEXERS:
+        return None
+    return LEXERS[extension]()
@@ -0,0 +1,119 @@
+import time
+
+
+class Loader:
+    """Fills the text field with a document, one chunk at a time.
+
+    The first chunk is inserted right away, the next ones are scheduled
+    with `after()` so the editor stays responsive while a big file is
+    loading. The user can edit the part that is already shown.
+
+    Attributes
+    ----------
+    first_paint : float
+        Seconds it took to show the first chunk.
+    duration : float
+        Seconds it took to load the whole document, once done.
+
+    """
+    CHUNK_SIZE = 128 * 1024  # Characters inserted per step
+
+    def __init__(self, text_field, document, on_progress=None, on_done=None,
+                 on_chunk=None):
+        """Initialize the loader.
+
+        Parameters
+        ----------
+        text_field : EditorText
+        document : Document
+        on_progress : callable (fraction), optional
+            Called after every chunk with the loaded part (0 to 1), and
+            with None once the loading is done or cancelled.
+        on_done : callable (), optional
+            Called once the whole document is in the text field.
+        on_chunk : callable (text), optional
+            Called with every chunk right before it is inserted, since
+            the inserts are not reported to the text field listeners.
+
+        """
+        self.text_field = text_field
+        self.document = document
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_chunk = on_chunk
+        self.job = None
+        self.first_paint = None
+        self.duration = None
+
+    @property
+    def running(self):
+        return self.job is not None
+
+    def start(self):
+        """Clears the text field and shows the first chunk."""
+        self.started = time.perf_counter()
+        with self.text_field.muted():
+            self.text_field.delete("1.0", "end")
+
+        self.step()
+        self.text_field.update_idletasks()
+        self.first_paint = time.perf_counter() - self.started
+
+    def cancel(self):
+        """Stops loading, the document keeps what was read so far."""
+        if self.job is not None:
+            self.text_field.after_cancel(self.job)
+            self.job = None
+            self.report(None)
+
+    def finish(self):
+        """Inserts the rest of the document right away."""
+        if self.job is None:
+            return
+
+        self.text_field.after_cancel(self.job)
+        rest = self.document.get_text(self.loaded_offset())
+        if self.on_chunk is not None:
+            self.on_chunk(rest)
+        with self.text_field.muted():
+            self.text_field.insert("end-1c", rest)
+        self.step()
+
+    def loaded_offset(self):
+        """Returns the document offset where the text field ends."""
+        line, column = self.text_field.index("end-1c").split(".")
+        return self.document.offset_of(int(line), int(column))
+
+    def step(self):
+        self.job = None
+
+        # Everything before `offset` is already in the text field
+        offset = self.loaded_offset()
+        if offset < len(self.document):
+            chunk = self.document.get_text(offset, offset + self.CHUNK_SIZE)
+        else:
+            chunk = self.document.read_more(self.CHUNK_SIZE)
+
+        if chunk == "":
+            self.duration = time.perf_counter() - self.started
+            self.report(None)
+            if self.on_done is not None:
+                self.on_done()
+            return
+
+        if self.on_chunk is not None:
+            self.on_chunk(chunk)
+        with self.text_field.muted():
+            self.text_field.insert("end-1c", chunk)
+
+        total = len(self.document)
+        if not self.document.loaded:
+            total = max(total, self.document.stream_size)
+        if total > self.CHUNK_SIZE:  # Small files are done in one step
+            self.report((offset + len(chunk)) / total)
+
+        self.job = self.text_field.after(1, self.step)
+
+    def report(self, fraction):
+        if self.on_progress is not None:
+            self.on_progress(fraction)
@@ -0,0 +1,101 @@
+import time
+
+
+class Paster:
+    """Inserts a pasted text into the text field, one chunk at a time.
+
+    Like the `Loader`, the first chunk is inserted right away and the
+    next ones are scheduled with `after()`, so pasting megabytes doesn't
+    freeze the editor. The chunks go to a mark that moves along with
+    them, and the view follows it. The inserts are reported to the text
+    field listeners like typing.
+
+    Attributes
+    ----------
+    duration : float
+        Seconds it took to insert the whole text, once done.
+
+    """
+    CHUNK_SIZE = 128 * 1024  # Characters inserted per step
+    MARK = "paste"
+
+    def __init__(self, text_field, text, on_progress=None, on_done=None):
+        """Initialize the paster.
+
+        Parameters
+        ----------
+        text_field : EditorText
+        text : str
+        on_progress : callable (fraction), optional
+            Called after every chunk with the pasted part (0 to 1), and
+            with None once the paste is done or cancelled.
+        on_done : callable (), optional
+            Called once the paste is done or cancelled.
+
+        """
+        self.text_field = text_field
+        self.text = text
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.offset = 0  # Everything before it is inserted
+        self.job = None
+        self.started = None
+        self.duration = None
+
+    @property
+    def running(self):
+        return self.job is not None
+
+    def start(self, index):
+        """Inserts the first chunk at the index."""
+        self.started = time.perf_counter()
+        self.text_field.mark_set(self.MARK, index)
+        self.text_field.mark_gravity(self.MARK, "right")  # After the chunks
+        self.step()
+
+    def cancel(self):
+        """Stops pasting, what was inserted so far stays.
+
+        The caller can undo it, see `TabManager.cancel_paste`.
+
+        """
+        if self.job is not None:
+            self.text_field.after_cancel(self.job)
+            self.done()
+
+    def finish(self):
+        """Inserts the rest of the text right away."""
+        if self.job is None:
+            return
+
+        self.text_field.after_cancel(self.job)
+        self.text_field.insert(self.MARK, self.text[self.offset:])
+        self.offset = len(self.text)
+        self.done()
+
+    def step(self):
+        self.job = None
+        chunk = self.text[self.offset:self.offset + self.CHUNK_SIZE]
+        self.text_field.insert(self.MARK, chunk)
+        self.offset += len(chunk)
+        self.text_field.see(self.MARK)
+
+        if self.offset >= len(self.text):
+            self.done()
+            return
+
+        self.report(self.offset / len(self.text))
+        self.job = self.text_field.after(1, self.step)
+
+    def done(self):
+        self.job = None
+        self.duration = time.perf_counter() - self.started
+        self.text_field.see(self.MARK)
+        self.text_field.mark_unset(self.MARK)
+        self.report(None)
+        if self.on_done is not None:
+            self.on_done()
+
+    def report(self, fraction):
+        if self.on_progress is not None:
+            self.on_progress(fraction)
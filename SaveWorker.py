@@ -0,0 +1,116 @@
+import queue
+import threading
+from saving import atomic_write
+
+
+class SaveWorker:
+    """Saves documents on a background thread.
+
+    Every save works on a snapshot of the document, so the user can
+    keep editing while it is written. If a file is saved again (with
+    the same writer) before its previous save started, only the newest
+    snapshot is written.
+
+    The callbacks are run on the Tk thread: the results are picked up
+    with `after()` while there are saves left.
+
+    """
+    POLL_INTERVAL = 50  # Milliseconds between checks for finished saves
+
+    def __init__(self, widget):
+        """Initialize the worker and start its thread.
+
+        Parameter
+        ---------
+        widget : tkinter widget
+            Used to schedule the result checks.
+
+        """
+        self.widget = widget
+        self.lock = threading.Lock()
+        self.waiting = {}  # (filename, writer) -> (snapshot, on_done)
+        self.unfinished = {}  # filename -> number of saves left
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.poll_job = None
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def save(self, filename, document, on_done=None, writer=None):
+        """Queues a snapshot of the document to be saved into the file.
+
+        Parameters
+        ----------
+        filename : str
+        document : Document or LargeDocument
+        on_done : callable (snapshot, error), optional
+            Called on the Tk thread once the save is done. `error` is
+            None if it succeeded. It is not called if the save gets
+            replaced by a newer one.
+        writer : callable (filename, snapshot), optional
+            Does the saving on the worker's thread, `write_file` by
+            default.
+
+        """
+        key = (filename, writer or write_file)
+        snapshot = document.snapshot()
+        with self.lock:
+            coalesced = key in self.waiting
+            self.waiting[key] = (snapshot, on_done)
+
+        if not coalesced:
+            self.unfinished[filename] = self.unfinished.get(filename, 0) + 1
+            self.jobs.put(key)
+
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
+
+    def busy(self, filename):
+        """Returns True if the file has saves that are not done yet."""
+        return filename in self.unfinished
+
+    def run(self):
+        while True:
+            key = self.jobs.get()
+            with self.lock:
+                snapshot, on_done = self.waiting.pop(key)
+
+            filename, writer = key
+            error = None
+            try:
+                writer(filename, snapshot)
+            except Exception as e:
+                error = e
+
+            self.results.put((filename, snapshot, on_done, error))
+
+    def finish(self, result):
+        filename, snapshot, on_done, error = result
+        self.unfinished[filename] -= 1
+        if self.unfinished[filename] == 0:
+            del self.unfinished[filename]
+
+        if on_done is not None:
+            on_done(snapshot, error)
+
+    def poll(self):
+        self.poll_job = None
+        while True:
+            try:
+                self.finish(self.results.get_nowait())
+            except queue.Empty:
+                break
+
+        if self.unfinished:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
+
+    def drain(self):
+        """Waits until every queued save is done."""
+        while self.unfinished:
+            self.finish(self.results.get())
+
+
+def write_file(filename, snapshot):
+    """Saves the snapshot into the file, see `saving.atomic_write`."""
+    atomic_write(filename, snapshot.iter_chunks(), snapshot.newline)
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+
+class ScratchFile:
+    """Stands in for the file object of an untitled document.
+
+    Untitled documents are kept in the `ScratchStore` instead of in a
+    file, until the user saves them somewhere.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class ScratchStore:
+    """SQLite database holding untitled documents and recovery copies.
+
+    Every row is the text of a document, under the name of its tab for
+    untitled documents, or the path of its file for the unsaved changes
+    of an opened file. Rows are left behind only if the editor did not
+    quit cleanly, so they can be restored on the next start.
+
+    Note
+    ----
+    The store is used from the save worker's thread as well.
+
+    """
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".notepad", "scratch.sqlite3"
+    )
+
+    def __init__(self, path=None):
+        import sqlite3  # Slow, so only imported once a store is opened
+        self.path = self.DEFAULT_PATH if path is None else path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "name TEXT PRIMARY KEY, text TEXT NOT NULL, updated REAL)"
+        )
+
+    def write(self, name, document):
+        """Stores the text of the document under the name."""
+        text = "".join(document.iter_chunks())
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)",
+                (name, text, time.time())
+            )
+
+    def load(self, name):
+        """Returns the text stored under the name, or None."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT text FROM documents WHERE name = ?", (name,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def load_all(self):
+        """Returns a list of (name, text), the oldest first."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT name, text FROM documents ORDER BY updated"
+            ).fetchall()
+
+    def remove(self, name):
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM documents WHERE name = ?", (name,)
+            )
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM documents")
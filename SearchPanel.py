@@ -0,0 +1,268 @@
+import os
+import queue
+import re
+import tkinter as tk
+from tkinter import ttk
+from concurrent.futures import Future
+from functools import partial
+from LargeDocument import LargeDocument
+from search import (
+    compile_pattern, find_lines, find_lines_in_part, search_file
+)
+
+
+class SearchPanel(tk.Frame):
+    """Finds a pattern in every open file.
+
+    Every tab is searched in a process of a pool: the files that are
+    not changed are read from the disk by the process, the others are
+    sent with the text of their document. Large files are sent a part
+    at a time. The hits are listed as the files are done, and choosing
+    one only switches to its tab.
+
+    """
+    MAX_HITS = 1000  # Hits listed per file at most
+    PART_SIZE = 16 * 1024 * 1024  # Characters of a large file sent at once
+    POLL_INTERVAL = 50  # Milliseconds between checks for results
+
+    def __init__(self, app):
+        super().__init__(app.text_frame)
+        self['bg'] = app.BACKGROUND_COLOR
+        self.app = app
+        self.pool = None  # Started with the first search
+        self.futures = []
+        self.remaining = 0  # Files whose hits are not listed yet
+        self.results = queue.Queue()  # (generation, file id, future)
+        self.generation = 0
+        self.hits = []  # (file id, line, column, length) of every row
+        self.poll_job = None
+
+        self.regex = tk.BooleanVar(self, False)
+        self.case = tk.BooleanVar(self, False)
+
+        top = tk.Frame(self, bg=app.BACKGROUND_COLOR)
+        top.pack(side=tk.TOP, fill=tk.X)
+        self.entry = ttk.Entry(top)
+        self.entry.pack(side=tk.LEFT, padx=5, pady=2)
+        self.entry.bind('<Return>', lambda event: self.start_search())
+        self.entry.bind('<Escape>', lambda event: self.hide())
+        ttk.Checkbutton(top, text="regex", variable=self.regex).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Checkbutton(top, text="case", variable=self.case).pack(
+            side=tk.LEFT, padx=5
+        )
+        close_button = ttk.Button(top, text="x", width=2, command=self.hide)
+        close_button.pack(side=tk.RIGHT)
+        self.status = tk.Label(top, bg=app.BACKGROUND_COLOR)
+        self.status.pack(side=tk.RIGHT, padx=5)
+
+        self.listbox = tk.Listbox(
+            self, height=10, activestyle="none", borderwidth=0
+        )
+        scrollbar = ttk.Scrollbar(self, command=self.listbox.yview)
+        self.listbox['yscrollcommand'] = scrollbar.set
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.listbox.bind('<<ListboxSelect>>', self.jump)
+
+    def show(self):
+        if not self.winfo_ismapped():
+            self.pack(side=tk.TOP, fill=tk.X, before=self.app.text_field)
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+
+    def hide(self):
+        self.cancel()
+        self.pack_forget()
+        self.app.text_field.focus_set()
+
+    def cancel(self):
+        """Stops the running search, its results are thrown away."""
+        self.generation += 1
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        self.remaining = 0
+
+    def shutdown(self):
+        self.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def start_search(self):
+        self.cancel()
+        self.listbox.delete(0, tk.END)
+        self.hits = []
+        if self.entry.get() == "":
+            self.status['text'] = ""
+            return
+
+        try:
+            pattern = compile_pattern(
+                self.entry.get(), self.regex.get(), self.case.get()
+            )
+        except re.error:
+            self.status['text'] = "Invalid pattern"
+            return
+
+        if self.pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # Forking would copy the Tk interpreter and the worker threads
+            self.pool = ProcessPoolExecutor(
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+        tab_manager = self.app.tab_manager
+        tab_manager.sync_document()
+        for file_ref in tab_manager.files_in_tab:
+            future = self.submit(file_ref, pattern)
+            future.add_done_callback(
+                partial(self.searched, self.generation, file_ref["id"])
+            )
+            self.futures.append(future)
+        self.remaining = len(self.futures)
+
+        self.update_status()
+        if self.poll_job is None:
+            self.poll_job = self.after(self.POLL_INTERVAL, self.poll)
+
+    def submit(self, file_ref, pattern):
+        """Searches the tab in the pool, from its file if possible."""
+        tab_manager = self.app.tab_manager
+        filename = file_ref["file"].name
+        if tab_manager.is_current_file(file_ref):
+            document = tab_manager.document
+        else:
+            document = tab_manager.buffer_cache.peek(filename)
+
+        if document is None and tab_manager.is_untitled(filename):
+            text = tab_manager.scratch_store.load(filename) or ""
+        elif isinstance(document, LargeDocument) and document.modified:
+            return self.search_parts(
+                document.snapshot().iter_chunks(), pattern
+            )
+        elif document is not None and (
+            document.modified or tab_manager.is_untitled(filename)
+        ):
+            text = "".join(document.snapshot().iter_chunks())
+        else:
+            return self.pool.submit(
+                search_file, filename, pattern, self.MAX_HITS
+            )
+        return self.pool.submit(find_lines, text, pattern, self.MAX_HITS)
+
+    def search_parts(self, chunks, pattern):
+        """Searches the chunks in the pool, `PART_SIZE` characters at once.
+
+        The next part is only read once the last one is searched, so a
+        large file is never joined into a single string. Matches that
+        would cross two parts are not found.
+
+        Returns
+        -------
+        Future
+            Of all the hits, like the futures of the pool.
+
+        """
+        result = Future()
+        hits = []
+        lines = 0  # Newlines in the parts searched so far
+        chunks = iter(chunks)
+
+        def search_next(part_future=None):
+            nonlocal lines
+            if result.cancelled():
+                return
+            try:
+                if part_future is not None:
+                    part_hits, newlines = part_future.result()
+                    hits.extend(
+                        (lines + line, column, length, line_text)
+                        for line, column, length, line_text in part_hits
+                    )
+                    lines += newlines
+
+                part = []
+                size = 0
+                if len(hits) < self.MAX_HITS:
+                    for chunk in chunks:
+                        part.append(chunk)
+                        size += len(chunk)
+                        if size >= self.PART_SIZE:
+                            break
+                if part == []:
+                    result.set_result(hits)
+                    return
+                part_future = self.pool.submit(
+                    find_lines_in_part, "".join(part), pattern,
+                    self.MAX_HITS - len(hits)
+                )
+            except Exception as error:  # The tab was closed, or the pool
+                result.set_exception(error)
+                return
+            part_future.add_done_callback(search_next)
+
+        search_next()
+        return result
+
+    def searched(self, generation, file_id, future):
+        """Called on the pool's thread when a file is done."""
+        self.results.put((generation, file_id, future))
+
+    def poll(self):
+        self.poll_job = None
+        while True:
+            try:
+                generation, file_id, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation:
+                self.remaining -= 1
+                self.add_hits(file_id, future)
+
+        self.update_status()
+        if self.remaining > 0:
+            self.poll_job = self.after(self.POLL_INTERVAL, self.poll)
+
+    def add_hits(self, file_id, future):
+        """Lists the hits of a file that was searched."""
+        file_ref = self.app.tab_manager.files_in_tab.get(file_id)
+        if file_ref is None or future.cancelled():
+            return
+        if future.exception() is not None:
+            return  # The file can't be read anymore
+
+        name = os.path.basename(file_ref["file"].name)
+        for line, column, length, line_text in future.result():
+            self.listbox.insert(
+                tk.END,
+                name + ":" + str(line) + ": " + line_text.strip()
+            )
+            self.hits.append((file_id, line, column, length))
+
+    def update_status(self):
+        text = "{:,} hits".format(len(self.hits))
+        if self.remaining > 0:
+            done = len(self.futures) - self.remaining
+            text += ", " + str(done) + " of " + str(len(self.futures))
+            text += " files searched"
+        self.status['text'] = text
+
+    def jump(self, event):
+        """Shows the chosen hit, only its tab is switched to."""
+        selection = self.listbox.curselection()
+        if selection == ():
+            return
+
+        file_id, line, column, length = self.hits[selection[0]]
+        tab_manager = self.app.tab_manager
+        file_ref = tab_manager.files_in_tab.get(file_id)
+        if file_ref is None:
+            self.status['text'] = "The file was closed"
+            return
+
+        tab_manager.switch_tabs(file_ref)
+        tab_manager.go_to(line, column, length)
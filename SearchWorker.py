@@ -0,0 +1,100 @@
+import queue
+import threading
+
+
+class SearchWorker:
+    """Runs searches on a background thread, the newest one wins.
+
+    A search that is submitted while another one waits replaces it,
+    and the results of a search that was replaced are thrown away, so
+    typing into the find bar never builds a backlog.
+
+    The callbacks are run on the Tk thread: the results are picked up
+    with `after()` while a search is running.
+
+    """
+    POLL_INTERVAL = 20  # Milliseconds between checks for results
+
+    def __init__(self, widget):
+        """Initialize the worker and start its thread.
+
+        Parameter
+        ---------
+        widget : tkinter widget
+            Used to schedule the result checks.
+
+        """
+        self.widget = widget
+        self.lock = threading.Lock()
+        self.waiting = None  # (generation, job, on_done)
+        self.generation = 0
+        self.pending = 0  # Jobs whose result was not picked up yet
+        self.wake_up = threading.Event()
+        self.results = queue.Queue()
+        self.poll_job = None
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, job, on_done):
+        """Runs the job on the worker's thread.
+
+        Parameters
+        ----------
+        job : callable ()
+            Does the search and returns its result.
+        on_done : callable (result, error)
+            Called on the Tk thread with what the job returned, or the
+            exception it raised. It is not called if another job was
+            submitted meanwhile.
+
+        """
+        with self.lock:
+            self.generation += 1
+            if self.waiting is None:
+                self.pending += 1
+            self.waiting = (self.generation, job, on_done)
+        self.wake_up.set()
+
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
+
+    def cancel(self):
+        """Throws away the results of the submitted jobs."""
+        with self.lock:
+            self.generation += 1
+            if self.waiting is not None:
+                self.pending -= 1
+            self.waiting = None
+
+    def run(self):
+        while True:
+            self.wake_up.wait()
+            with self.lock:
+                self.wake_up.clear()
+                waiting, self.waiting = self.waiting, None
+            if waiting is None:
+                continue
+
+            generation, job, on_done = waiting
+            result = error = None
+            try:
+                result = job()
+            except Exception as e:
+                error = e
+            self.results.put((generation, on_done, result, error))
+
+    def poll(self):
+        self.poll_job = None
+        while True:
+            try:
+                generation, on_done, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.pending -= 1
+            if generation == self.generation:
+                on_done(result, error)
+
+        if self.pending > 0:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
@@ -0,0 +1,56 @@
+import json
+import os
+from saving import atomic_write
+
+
+class SessionFile:
+    """Stands in for the file object of a tab restored from a session.
+
+    The file is only read when its tab is shown for the first time.
+
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Session:
+    """The tabs that were open when the editor was quit.
+
+    It is stored as JSON, with every tab's file, cursor and scroll
+    position, in the order of the tabs, and which one was shown.
+
+    """
+    DEFAULT_PATH = os.path.join(
+        os.path.expanduser("~"), ".notepad", "session.json"
+    )
+
+    def __init__(self, path=None):
+        self.path = self.DEFAULT_PATH if path is None else path
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def save(self, tabs, active=None):
+        """Stores the tabs, replacing the previous session.
+
+        Parameters
+        ----------
+        tabs : list of dict ({"file": str, "cursor": str, "yview": float})
+        active : int, optional
+            Position of the shown tab in `tabs`.
+
+        """
+        session = {"tabs": tabs, "active": active}
+        atomic_write(self.path, [json.dumps(session, indent=1)], "\n")
+
+    def load(self):
+        """Returns (tabs, active) like they were saved.
+
+        The session is empty if it was never saved or can't be read.
+
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                session = json.load(f)
+            return session["tabs"], session["active"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return [], None
@@ -0,0 +1,189 @@
+import re
+from Dictionary import Dictionary
+from SearchWorker import SearchWorker
+
+
+WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+
+
+def misspelled(dictionary, lines):
+    """Returns the words of the lines that are not in the dictionary.
+
+    Acronyms, camelCase names and words with a possessive "'s" that
+    is known without it are not reported.
+
+    Parameters
+    ----------
+    dictionary : Dictionary
+    lines : list of tuple (line, text)
+
+    Returns
+    -------
+    list of tuple (line, start column, end column)
+
+    """
+    if not dictionary.available:
+        return []
+
+    words = []
+    for line, text in lines:
+        for match in WORD.finditer(text):
+            word = match.group()
+            if len(word) < 2 or not word[1:].replace("'", "").islower():
+                continue  # Acronyms, camelCase names and the like
+            if word in dictionary:
+                continue
+            if word.endswith("'s") and word[:-2] in dictionary:
+                continue
+            words.append((line, match.start(), match.end()))
+    return words
+
+
+class SpellChecker:
+    """Underlines the misspelled words of the lines in view.
+
+    Like the `Highlighter`, it keeps the lines whose marks are up to
+    date, edits only invalidate the lines they changed, and only the
+    lines in view (and a margin around them) are checked. The words are
+    looked up on a worker thread, and the marks of a check are added
+    with one `tag_add` call. Checks wait for a pause in the typing, and
+    the result of a check is thrown away if the text changed meanwhile.
+
+    """
+    TAG = "misspelled"
+    MARGIN = 20  # Lines checked above and below the viewport
+    DELAY = 300  # Milliseconds after an edit before checking
+
+    def __init__(self, text_field, dictionary=None):
+        self.text_field = text_field
+        self.dictionary = Dictionary() if dictionary is None else dictionary
+        self.worker = SearchWorker(text_field)
+        self.enabled = False
+        self.checked = set()  # Lines whose marks are up to date
+        self.stale = set()  # Lines changed while they were being checked
+        self.version = 0  # Changes with every edit
+        self.job = None
+
+        self.text_field.tag_configure(self.TAG, underline=True)
+        self.text_field.listeners.append(self.on_edit)
+        self.text_field.scroll_listeners.append(self.on_scroll)
+
+    def reset(self, enabled=True):
+        """Starts over for a new text.
+
+        Parameter
+        ---------
+        enabled : bool, optional
+            False turns the checking off.
+
+        """
+        self.enabled = enabled
+        self.checked = set()
+        self.stale = set()
+        self.version += 1
+        self.worker.cancel()
+        self.text_field.tag_remove(self.TAG, "1.0", "end")
+        self.schedule()
+
+    def schedule(self, delay=None):
+        if self.job is not None:
+            if delay is None:
+                return
+            self.text_field.after_cancel(self.job)
+        if not self.enabled:
+            self.job = None
+        elif delay is None:
+            self.job = self.text_field.after_idle(self.refresh)
+        else:
+            self.job = self.text_field.after(delay, self.refresh)
+
+    def on_scroll(self, first, last):
+        self.schedule()
+
+    def on_edit(self, edit):
+        """Forgets the lines that were changed and shifts the others."""
+        line = int(edit.index.split(".")[0])
+        removed = edit.removed.count("\n")
+        moved = edit.inserted.count("\n") - removed
+        self.checked = {
+            checked if checked < line else checked + moved
+            for checked in self.checked
+            if checked < line or checked > line + removed
+        }
+        self.stale = set()  # The checks in progress are thrown away
+        self.version += 1
+        self.schedule(self.DELAY)
+
+    def invalidate(self, line):
+        """Checks the line again, its text was changed unseen.
+
+        Unlike an edit, it doesn't move the other lines, so the checks
+        in progress are still good for them.
+
+        """
+        self.checked.discard(line)
+        self.stale.add(line)
+        self.schedule()
+
+    def line_of(self, index):
+        return int(self.text_field.index(index).split(".")[0])
+
+    def visible_lines(self):
+        height = self.text_field.winfo_height()
+        first = self.line_of("@0,0") - self.MARGIN
+        last = self.line_of("@0," + str(height)) + self.MARGIN
+        return max(first, 1), min(last, self.line_of("end-1c"))
+
+    def refresh(self):
+        """Sends the lines in view that are not checked to the worker."""
+        self.job = None
+        if not self.enabled:
+            return
+
+        first, last = self.visible_lines()
+        texts = self.text_field.get(
+            str(first) + ".0", str(last) + ".end"
+        ).split("\n")
+        lines = [
+            (line, text)
+            for line, text in zip(range(first, last + 1), texts)
+            if line not in self.checked
+        ]
+        if lines == []:
+            return
+
+        self.stale.difference_update(line for line, _ in lines)
+        version = self.version
+        dictionary = self.dictionary
+        self.worker.submit(
+            lambda: misspelled(dictionary, lines),
+            lambda words, error: self.checked_lines(
+                version, lines, words, error
+            )
+        )
+
+    def checked_lines(self, version, lines, words, error):
+        if version != self.version:
+            self.schedule(self.DELAY)  # The lines moved meanwhile
+            return
+        if error is not None:
+            return
+
+        for line, _ in lines:
+            if line in self.stale:
+                continue
+            self.text_field.tag_remove(
+                self.TAG, str(line) + ".0", str(line) + ".end"
+            )
+            self.checked.add(line)
+        if self.stale:
+            self.schedule()
+
+        indexes = []
+        for line, start, end in words:
+            if line in self.stale:
+                continue
+            indexes.append(str(line) + "." + str(start))
+            indexes.append(str(line) + "." + str(end))
+        if indexes:
+            self.text_field.tag_add(self.TAG, *indexes)
@@ -0,0 +1,52 @@
+import tkinter as tk
+import tracing
+
+
+class StatsOverlay(tk.Label):
+    """Shows how long the traced operations take, over the text field.
+
+    The p50 and p99 of the recent spans of every operation are
+    refreshed every `INTERVAL` while the overlay is shown.
+
+    """
+    INTERVAL = 1000  # Milliseconds between refreshes
+
+    def __init__(self, master):
+        super().__init__(
+            master,
+            justify=tk.LEFT,
+            font=("Courier", 10),
+            bg="#ffffe0",
+            relief=tk.SOLID,
+            borderwidth=1,
+            padx=6,
+            pady=4
+        )
+        self.job = None
+
+    def toggle(self):
+        if self.job is None:
+            self.place(relx=1.0, rely=0.0, anchor=tk.NE)
+            self.lift()
+            self.refresh()
+        else:
+            self.after_cancel(self.job)
+            self.job = None
+            self.place_forget()
+
+    def refresh(self):
+        if tracing.tracer is None:
+            text = "Tracing is off, start with NOTEPAD_TRACE=<file>"
+        else:
+            lines = ["{:<24}{:>7}{:>10}{:>10}".format(
+                "operation", "count", "p50 ms", "p99 ms"
+            )]
+            stats = tracing.tracer.percentiles()
+            for name in sorted(stats):
+                count, p50, p99 = stats[name]
+                lines.append("{:<24}{:>7}{:>10.1f}{:>10.1f}".format(
+                    name[:23], count, p50 * 1000, p99 * 1000
+                ))
+            text = "\n".join(lines)
+        self['text'] = text
+        self.job = self.after(self.INTERVAL, self.refresh)
@@ -0,0 +1,103 @@
+import re
+import tkinter as tk
+
+
+WORD = re.compile(r"\S+")
+
+
+def count_words(text):
+    return sum(1 for _ in WORD.finditer(text))
+
+
+class StatusBar(tk.Frame):
+    """Cursor position and line, word and character counts.
+
+    The counts are only computed from the whole text as it is loaded,
+    a chunk at a time, see `count_chunk`. Then every edit changes them
+    by what it removed and inserted, so an edit costs as much as its
+    own size. Words are counted with the character before and after
+    the edit, since an edit can join or split words.
+
+    """
+
+    def __init__(self, app, master):
+        super().__init__(master, bg="#f5f5f5")
+        self.app = app
+        self.text_field = app.text_field
+        self.label = tk.Label(
+            self, anchor=tk.E, bg="#f5f5f5", fg="#282828", padx=10
+        )
+        self.label.pack(fill=tk.X)
+        self.counting = False
+        self.lines = 1
+        self.words = 0
+        self.chars = 0
+        self.refresh_job = None
+
+        self.text_field.listeners.append(self.on_edit)
+        for sequence in ("<KeyRelease>", "<ButtonRelease-1>"):
+            self.text_field.bind(sequence, self.schedule, add="+")
+
+    def reset(self, counting=True):
+        """Starts counting again, for an empty text field.
+
+        Parameter
+        ---------
+        counting : bool, optional
+            False only shows the cursor, for large files whose text
+            field only holds a window.
+
+        """
+        self.counting = counting
+        self.lines = 1
+        self.words = 0
+        self.chars = 0
+        self.schedule()
+
+    def count_chunk(self, chunk):
+        """Counts text that is about to be appended, without an edit."""
+        if self.counting:
+            self.add(self.text_field.get("end-2c"), "", chunk, "")
+
+    def on_edit(self, edit):
+        if self.counting:
+            index = edit.index
+            before = ""
+            if index != "1.0":
+                before = self.text_field.get(index + "-1c")
+            after = self.text_field.get(
+                index + "+" + str(len(edit.inserted)) + "c"
+            )
+            self.add(before, edit.removed, edit.inserted, after)
+        self.schedule()
+
+    def add(self, before, removed, inserted, after):
+        """Counts `removed` being replaced by `inserted`.
+
+        Parameters
+        ----------
+        before, after : str
+            The characters around the edit, "" at the ends of the text.
+
+        """
+        self.chars += len(inserted) - len(removed)
+        self.lines += inserted.count("\n") - removed.count("\n")
+        self.words += (
+            count_words(before + inserted + after)
+            - count_words(before + removed + after)
+        )
+
+    def schedule(self, *args):
+        if self.refresh_job is None:
+            self.refresh_job = self.after_idle(self.refresh)
+
+    def refresh(self):
+        self.refresh_job = None
+        line, column = map(int, self.text_field.index(tk.INSERT).split("."))
+        line += self.app.tab_manager.line_offset()
+        text = "Ln {:,}, Col {:,}".format(line, column + 1)
+        if self.counting:
+            text += "    {:,} lines    {:,} words    {:,} characters".format(
+                self.lines, self.words, self.chars
+            )
+        self.label['text'] = text
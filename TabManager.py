@@ -1,35 +1,423 @@
 import tkinter as tk
 import os
-from tkinter import filedialog
+from tkinter import messagebox
 from random import choice
-from FileButton import FileButton
+from TabRegistry import TabRegistry
+from BufferCache import BufferCache
+from Document import Document
+from LargeDocument import LargeDocument
+from Loader import Loader
+from Paster import Paster
+from UndoHistory import UndoHistory
+from Lexer import lexer_for
+from shortcuts import capture_formatting, apply_formatting
+from SaveWorker import SaveWorker
+from ScratchStore import ScratchStore, ScratchFile
+from FormatStore import FormatStore
+from Session import Session, SessionFile
+from Engine import Engine
+from diffing import diff_edits
+from tracing import traced, add_span
+
+
+def file_details(tab_manager, filename):
+    details = {"file": os.path.basename(filename)}
+    if not tab_manager.is_untitled(filename) and os.path.isfile(filename):
+        details["bytes"] = os.path.getsize(filename)
+    return details
+
+
+def document_details(tab_manager, *args):
+    """Describes the current document in the traces, see `tracing`.
+
+    For a traced call, it is the document the call starts from.
+
+    """
+    file_ref = tab_manager.current_file_ref
+    if file_ref is None or tab_manager.document is None:
+        return {}
+
+    details = file_details(tab_manager, file_ref["file"].name)
+    if isinstance(tab_manager.document, Document):
+        details["chars"] = len(tab_manager.document)
+    return details
+
+
+def displayed_details(tab_manager, raw_file):
+    details = file_details(tab_manager, raw_file.name)
+    details["cached"] = raw_file.name in tab_manager.buffer_cache
+    return details
+
+
+def switched_details(tab_manager, tab_file_ref):
+    raw_file = tab_file_ref
+    if type(tab_file_ref) is dict:
+        raw_file = tab_file_ref["file"]
+    details = document_details(tab_manager)
+    details["to"] = os.path.basename(raw_file.name)
+    return details
+
+
+def tabs_details(tab_manager, *args):
+    return {"tabs": len(tab_manager.files_in_tab)}
+
+
+def closed_details(tab_manager, ref_to_close):
+    raw_file = ref_to_close
+    if type(ref_to_close) is dict:
+        raw_file = ref_to_close["file"]
+    return {
+        "file": os.path.basename(raw_file.name),
+        "tabs": len(tab_manager.files_in_tab)
+    }
 
 
 class TabManager:
-    files_in_tab = []
     current_file_ref = None
-    untitled_count = 0
+    document = None  # Document of the current file
+    loader = None  # Loads the current document into the text field
+    paster = None  # Pastes into the current document
+    CACHE_BUDGET = 64 * 1024 * 1024  # Bytes of inactive documents in memory
+    RECOVERY_INTERVAL = 10 * 1000  # Milliseconds between recovery copies
+    UNDO_LIMIT = 4 * 1024 * 1024  # Bytes of undo history kept per tab
 
     def __init__(self, app, text_field, master):
         self.app = app
         self.text_field = text_field
         self.master = master
+        self.engine = Engine()
+        self.files_in_tab = TabRegistry(self.engine.is_untitled)
+        self.buffer_cache = BufferCache(
+            self.write_back_document, self.CACHE_BUDGET
+        )
+        self.save_worker = SaveWorker(self.master)
+        self.scratch_store = None  # The stores are opened by `start`
+        self.format_store = None
+        self.file_watcher = None
+        self.session = Session()
+        self.recovered = {}  # filename -> version in the scratch store
+        self.text_field.listeners.append(self.on_edit)
+        self.text_field.scroll_listeners.append(self.on_scroll)
+        self.text_field.bind("<<Formatted>>", self.on_formatted)
+        self.text_field.bind("<<Undo>>", self.undo)
+        self.text_field.bind("<<Redo>>", self.redo)
+        self.text_field.bind("<<Paste>>", self.paste)
+        self.text_field.bind("<Escape>", self.cancel_paste, add="+")
+
+    def start(self):
+        """Opens the stores and starts watching the files.
+
+        sqlite3 and ctypes are slow to import, so it waits until the
+        window is shown, see `TextEditor.finish_startup`.
+
+        """
+        from FileWatcher import FileWatcher
+        self.scratch_store = ScratchStore()
+        self.format_store = FormatStore()
+        self.engine.scratch_store = self.scratch_store
+        self.engine.format_store = self.format_store
+        self.file_watcher = FileWatcher(self.master, self.file_changed)
+        self.master.after(self.RECOVERY_INTERVAL, self.store_recovery)
+
+    def is_untitled(self, filename):
+        """Untitled documents are kept in the scratch store."""
+        return self.engine.is_untitled(filename)
+
+    def on_edit(self, edit):
+        """Keeps the current document in sync with the text field."""
+        if self.document is None:
+            return
+
+        was_modified = self.document.modified
+        self.document.apply(edit)
+        if not was_modified:
+            self.app.tab_strip.set_modified(self.current_file_ref, True)
+
+        # The indexes of a large file's window change as it moves
+        if not isinstance(self.document, LargeDocument):
+            self.current_file_ref["history"].record(edit)
+
+    def undo(self, event=None):
+        """Undoes the last edits of the current tab."""
+        self.apply_history(UndoHistory.undo)
+        return "break"  # Tk's own undo stack is not used
+
+    def redo(self, event=None):
+        self.apply_history(UndoHistory.redo)
+        return "break"
+
+    def apply_history(self, method):
+        if self.document is None or isinstance(self.document, LargeDocument):
+            return
+        if self.loader is not None:
+            self.loader.finish()  # The edits may be past the loaded text
+        self.finish_paste()
+
+        cursor = method(self.current_file_ref["history"], self.text_field)
+        if cursor is not None:
+            self.text_field.tag_remove("sel", "1.0", tk.END)
+            self.text_field.mark_set(tk.INSERT, cursor)
+            self.text_field.see(tk.INSERT)
+
+    def paste(self, event=None):
+        """Pastes the clipboard at the cursor, replacing the selection.
 
+        Big texts are inserted a chunk at a time, see `Paster`, and
+        Escape cancels it. The whole paste is undone at once, with the
+        edits made while it runs.
+
+        """
+        try:
+            text = self.text_field.clipboard_get()
+        except tk.TclError:
+            return "break"  # Nothing to paste
+        if self.document is None or text == "":
+            return "break"
+
+        self.finish_paste()
+        history = self.current_file_ref["history"]
+        history.begin_group()
+        if self.text_field.tag_ranges("sel"):
+            self.text_field.delete("sel.first", "sel.last")
+
+        def pasted():
+            history.end_group()
+            self.paster = None
+            add_span(
+                "paste", paster.started, paster.duration,
+                {"chars": len(text)}
+            )
+
+        paster = Paster(
+            self.text_field, text, self.app.show_progress, pasted
+        )
+        self.paster = paster
+        paster.start(tk.INSERT)
+        return "break"  # Instead of Tk's paste
+
+    def finish_paste(self):
+        """Completes the paste in the current document, if any."""
+        if self.paster is not None:
+            self.paster.finish()
+
+    def cancel_paste(self, event=None):
+        """Stops the paste and undoes what it inserted so far."""
+        if self.paster is None:
+            return None  # Escape is for the other bindings
+        self.paster.cancel()
+        self.undo()  # The paste group, closed by the cancel
+        return "break"
+
+    def on_scroll(self, first, last):
+        """Pages the window of a large file as the user scrolls."""
+        if isinstance(self.document, LargeDocument):
+            self.document.scrolled(self.text_field, first, last)
+
+    def line_offset(self):
+        """Returns the number of lines of the file above the text field."""
+        if isinstance(self.document, LargeDocument):
+            return self.document.first_line() - 1
+        return 0
+
+    def load_document(self, filename):
+        """Returns a new document with the content of the file.
+
+        See `Engine.load_document`.
+
+        """
+        if self.save_worker.busy(filename):  # Read what is being saved
+            self.save_worker.drain()
+        return self.engine.load_document(filename)
+
+    def on_formatted(self, event):
+        """Marks the document as changed when its formatting changes."""
+        if self.document is None or isinstance(self.document, LargeDocument):
+            return
+
+        was_modified = self.document.modified
+        self.document.version += 1
+        if not was_modified:
+            self.app.tab_strip.set_modified(self.current_file_ref, True)
+
+    def sync_document(self):
+        """Stores the edits of a large file's window, or the formatting."""
+        if isinstance(self.document, LargeDocument):
+            self.document.capture(self.text_field)
+        elif self.document is not None:
+            if self.loader is not None and self.loader.running:
+                return  # Its formatting is not shown yet
+            self.document.formatting = capture_formatting(self.text_field)
+
+    @traced("display_text", displayed_details)
     def display_text(self, new_raw_file):
         """Displays text on the text editor based on the file in use.
 
+        The document is taken from the buffer cache when the tab was used
+        recently, otherwise it is read from the file. The text is shown
+        progressively, see `Loader`.
+
         Parameter
         ---------
         new_raw_file : IO
 
         """
-        # Refresh the editor
-        self.text_field.delete('1.0', tk.END)
+        document = self.buffer_cache.pop(new_raw_file.name)
+        changed = self.current_file_ref.pop("changed", False)
+        if document is None:
+            document = self.load_document(new_raw_file.name)
+            changed = False  # It was just read
+        self.document = document
+
+        if isinstance(document, LargeDocument):
+            self.app.highlighter.reset(None)  # Its window keeps moving
+            self.app.spell_checker.reset(enabled=False)
+            self.app.status_bar.reset(counting=False)
+            document.show(self.text_field)
+            if changed:
+                self.reload_file()
+            return
+
+        lexer = lexer_for(new_raw_file.name)
+        self.app.highlighter.reset(lexer)
+        self.app.spell_checker.reset(enabled=lexer is None)  # Prose only
+        self.app.status_bar.reset()
+        if new_raw_file.name not in self.app.word_index:
+            self.app.word_index.add_document(new_raw_file.name, document)
 
         # Replace the editor with the new file's text
-        with open(new_raw_file.name, "r+", encoding="utf-8") as f:
-            text = f.read()
-        self.text_field.insert('1.0', text)
+        self.loader = Loader(
+            self.text_field, document, self.app.show_progress,
+            self.loaded, self.loading_chunk
+        )
+        self.loader.start()
+        add_span(
+            "first_paint", self.loader.started, self.loader.first_paint,
+            document_details(self)
+        )
+        if changed:
+            self.reload_file()
+
+    def loading_chunk(self, chunk):
+        """Takes a chunk the loader is about to add to the text field.
+
+        The inserts of the loader are not reported, so the line the
+        chunk continues is marked as changed here.
+
+        """
+        self.app.status_bar.count_chunk(chunk)
+        line = int(self.text_field.index("end-1c").split(".")[0])
+        self.app.highlighter.invalidate(line)
+        self.app.spell_checker.invalidate(line)
+
+    def replace_document(self, document, edits):
+        """Shows a new text for the current document, as one edit.
+
+        Parameters
+        ----------
+        document : Document
+            Holds the new text, it takes the place of the current one.
+        edits : list of tuple (index, removed, inserted)
+            The changes from the current text to the new one, in the
+            order they are made. They are undone at once.
+
+        """
+        self.finish_paste()
+        self.remember_view()
+        self.stop_loading()
+        self.document = Engine.carry_over(self.document, document)
+
+        self.app.highlighter.reset(self.app.highlighter.lexer)
+        self.app.spell_checker.reset(self.app.spell_checker.enabled)
+        self.app.status_bar.reset()
+        self.app.word_index.add_document(
+            self.current_file_ref["file"].name, document
+        )
+        self.loader = Loader(
+            self.text_field, document, self.app.show_progress,
+            self.loaded, self.loading_chunk
+        )
+        self.loader.start()
+        self.current_file_ref["history"].record_group(edits)
+        self.app.tab_strip.set_modified(
+            self.current_file_ref, document.modified
+        )
+
+    def stop_loading(self):
+        """Cancels the loading of the current document, if any."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    def remember_view(self):
+        """Keeps the cursor and scroll position of the current tab."""
+        if self.loader is not None and self.loader.running:
+            return  # The view of the last time was not restored yet
+        if isinstance(self.document, LargeDocument):
+            return  # Its indexes only point into the shown window
+
+        self.current_file_ref["cursor"] = self.text_field.index(tk.INSERT)
+        self.current_file_ref["yview"] = self.text_field.yview()[0]
+
+    def loaded(self):
+        """Puts the formatting and the view back once the text is shown."""
+        document = self.document
+        if document.formatting is None:
+            document.formatting = self.format_store.load(
+                self.engine.key(self.current_file_ref["file"].name),
+                len(document)
+            ) or {}
+        apply_formatting(self.text_field, document.formatting)
+        self.restore_view()
+
+        if self.loader is not None and self.loader.duration is not None:
+            add_span(
+                "load", self.loader.started, self.loader.duration,
+                document_details(self)
+            )
+
+    def restore_view(self):
+        """Puts the cursor and scroll position back where they were."""
+        file_ref = self.current_file_ref
+        if "cursor" in file_ref:
+            self.text_field.mark_set(tk.INSERT, file_ref["cursor"])
+            self.text_field.yview_moveto(file_ref["yview"])
+
+    def go_to(self, line, column=0, length=0):
+        """Selects a place of the current document and scrolls to it.
+
+        Parameters
+        ----------
+        line, column : int
+            Where the selection starts.
+        length : int, optional
+            Characters selected.
+
+        """
+        if isinstance(self.document, LargeDocument):
+            index = self.document.show_line(self.text_field, line)
+        else:
+            if self.loader is not None:
+                self.loader.finish()  # The line may not be shown yet
+            index = str(line) + ".0"
+
+        start = self.text_field.index(index + "+" + str(column) + "c")
+        end = self.text_field.index(start + "+" + str(length) + "c")
+        self.text_field.tag_remove("sel", "1.0", tk.END)
+        self.text_field.tag_add("sel", start, end)
+        self.text_field.mark_set(tk.INSERT, end)
+        self.text_field.see(start)
+        self.text_field.focus_set()
+
+    def stash_current_document(self):
+        """Moves the document of the current tab into the buffer cache."""
+        self.finish_paste()
+        self.remember_view()
+        self.stop_loading()
+        self.sync_document()
+        self.current_file_ref["history"].compress()
+        self.buffer_cache.put(
+            self.current_file_ref["file"].name, self.document
+        )
 
     def left_file(self, event):
         """Switch to the text on the left file's tab when called.
@@ -43,12 +431,12 @@ class TabManager:
         right_file : The same but for the right.
 
         """
-        for index, file_reference in enumerate(self.files_in_tab):
-            if self.is_current_file(file_reference):
-                if index - 1 < 0:  # User is already at the left-most tab
-                    return
+        if self.current_file_ref is None:
+            return
 
-                file_ref_to_open = self.files_in_tab[index - 1]
+        file_ref_to_open = self.files_in_tab.left_of(self.current_file_ref)
+        if file_ref_to_open is None:  # User is already at the left-most tab
+            return
 
         self.switch_tabs(file_ref_to_open)
 
@@ -64,13 +452,12 @@ class TabManager:
         left_file : The same but for the left.
 
         """
-        for index, file_reference in enumerate(self.files_in_tab):
-            if self.is_current_file(file_reference):
-                # If the user is already at the right-most tab
-                if index + 1 > len(self.files_in_tab) - 1:
-                    return
+        if self.current_file_ref is None:
+            return
 
-                file_ref_to_open = self.files_in_tab[index + 1]
+        file_ref_to_open = self.files_in_tab.right_of(self.current_file_ref)
+        if file_ref_to_open is None:  # User is already at the right-most tab
+            return
 
         self.switch_tabs(file_ref_to_open)
 
@@ -78,41 +465,47 @@ class TabManager:
         """Returns a file reference dict in the right format."""
         file_reference = {
             "file": filename,
-            "tab": FileButton(self.app, filename)
+            "modified": False,
+            "history": UndoHistory(self.UNDO_LIMIT)
         }
         return file_reference
 
     def find_file_reference(self, raw_file):
-        """Iterates through the `files_in_tab` list to find it.
+        """Looks the file up in `files_in_tab` by its normalized path.
 
         Parameter
         ---------
-        raw_file : IO
+        raw_file : IO or str
 
         Returns
         -------
-        file_reference : dict ({"file": x, "tab": y})
+        file_reference : dict ({"file": x, "id": y})
             If found.
         None
             If not found.
         """
-        for file_reference in self.files_in_tab:
-            if file_reference["file"] == raw_file:
-                return file_reference
-
-        return None
+        filename = getattr(raw_file, "name", raw_file)
+        return self.files_in_tab.find(filename)
 
     def is_current_file(self, file_ref):
         """Returns a bool."""
         current = self.current_file_ref
-        if current is not None and file_ref == current:
+        if current is not None and file_ref is current:
             return True
 
         return False
 
+    def is_modified(self, file_ref):
+        """Returns True if the file has changes that are not saved."""
+        if self.is_current_file(file_ref):
+            return self.document.modified
+
+        document = self.buffer_cache.get(file_ref["file"].name)
+        return document is not None and document.modified
+
     def close_all_files(self):
-        while self.files_in_tab != []:
-            self.close_file(self.files_in_tab[0])
+        while len(self.files_in_tab) > 0:
+            self.close_file(self.files_in_tab.first_ref())
 
     def save_and_quit(self, ref_to_close):
         """Updates the file's content and close the file.
@@ -122,7 +515,7 @@ class TabManager:
 
         Parameter
         ---------
-        ref_to_close : dict ({"file": x, "tab": y})
+        ref_to_close : dict ({"file": x, "id": y})
 
         """
         current = False
@@ -150,7 +543,7 @@ class TabManager:
         There needs to be at least one element in `files_in_tab`.
 
         """
-        random_file_reference = choice(self.files_in_tab)
+        random_file_reference = choice(list(self.files_in_tab))
         self.switch_tabs(random_file_reference)
 
     def add_file_to_app(self, raw_file):
@@ -162,44 +555,65 @@ class TabManager:
 
         Returns
         -------
-        file_ref : dict ({"file": x, "tab": y})
+        file_ref : dict ({"file": x, "id": y})
             The one that was created.
 
         """
         file_ref = self.create_file_reference(raw_file)
-        self.files_in_tab.append(file_ref)
+        self.files_in_tab.add(file_ref)
+        self.app.tab_strip.add(file_ref)
+        if not self.is_untitled(raw_file.name):
+            self.file_watcher.watch(raw_file.name)
 
         return file_ref
 
     def remove_file_from_app(self, file_reference, os_remove=False):
         """Removes the file tab and as well as the file reference.
 
-        The FileButton tk.Button object disappears from the tab bar,
+        The tab disappears from the tab strip,
         and the dict is removed from the `files_in_tab` attribute.
 
         Parameters
         ----------
-        file_reference: dict ({"file": x, "tab": y})
+        file_reference: dict ({"file": x, "id": y})
         os_remove : bool, optional
 
         """
         if file_reference is None:
             return
 
-        file_reference["tab"].pack_forget()
+        self.file_watcher.unwatch(file_reference["file"].name)
+        self.app.tab_strip.remove(file_reference)
         self.files_in_tab.remove(file_reference)
+        self.buffer_cache.pop(file_reference["file"].name)
+        self.app.word_index.remove(file_reference["file"].name)
 
+        filename = file_reference["file"].name
         if os_remove:
-            os.remove(file_reference["file"].name)
+            # Pending saves would bring the file back
+            if self.save_worker.busy(filename):
+                self.save_worker.drain()
+            self.engine.remove(filename)
+
+        # Its changes were saved or thrown away, no need to recover them
+        self.scratch_store.remove(filename)
+        self.recovered.pop(filename, None)
+        self.engine.forget(filename)
 
         if self.is_current_file(file_reference):
+            self.stop_loading()
+            if self.paster is not None:
+                self.paster.cancel()  # The text field is cleared anyway
             self.current_file_ref = None
+            self.document = None
 
     def prompt_to_open_file(self):
         """Removes the text field."""
-        self.text_field.delete("1.0", tk.END)
+        with self.text_field.muted():
+            self.text_field.delete("1.0", tk.END)
         self.text_field.pack_forget()
 
+    @traced("open_file", tabs_details)
     def open_file(self):
         """Adds an existing file in the user's system to the tab.
 
@@ -210,10 +624,11 @@ class TabManager:
         -------
         None
             If the user decides not to open a file after the prompt.
-        file_reference: dict ({"file": x, "tab": y})
+        file_reference: dict ({"file": x, "id": y})
             The file reference of the file that is opened or switched to.
 
         """
+        from tkinter import filedialog  # Rarely used, not at startup
         file_to_open = filedialog.askopenfile(
             parent=self.master,
             mode='r+'
@@ -224,10 +639,11 @@ class TabManager:
             return None
 
         # If the file already exists in the text editor
-        for file_reference in self.files_in_tab:
-            if file_reference["file"].name == file_to_open.name:
-                self.switch_tabs(file_reference)
-                return file_reference
+        file_reference = self.find_file_reference(file_to_open)
+        if file_reference is not None:
+            file_to_open.close()
+            self.switch_tabs(file_reference)
+            return file_reference
 
         self.add_file_to_app(file_to_open)
         self.switch_tabs(file_to_open)  # Open that file
@@ -239,7 +655,7 @@ class TabManager:
 
         Note
         ----
-        It is saved in the TextEditor file directory as of now.
+        Untitled documents are kept in the scratch store, not on disk.
 
         Parameter
         ---------
@@ -248,22 +664,21 @@ class TabManager:
 
         Returns
         -------
-        file_ref : dict ({"file": x, "tab": y})
+        file_ref : dict ({"file": x, "id": y})
 
         """
         if filename is None:
-            filename = "Untitled-" + str(self.untitled_count) + ".txt"
-
-        with open(filename, "w+", encoding='utf-8') as raw_file:
-            file_ref = self.add_file_to_app(raw_file)
+            raw_file = ScratchFile(self.engine.untitled_name())
+        else:
+            raw_file = self.engine.create_file(filename)
+        file_ref = self.add_file_to_app(raw_file)
 
         if open_instantly:
             self.switch_tabs(file_ref)
 
-        self.untitled_count += 1
-
         return file_ref
 
+    @traced("save_file", document_details)
     def save_file(self, permanent=True):
         """Stores the text in the text field into the file.
 
@@ -280,11 +695,11 @@ class TabManager:
         ----------
         permanent : bool
             Directed towards unsaved files.
-        file_ref : dict ({"file": x, "tab": y})
+        file_ref : dict ({"file": x, "id": y})
 
         Returns
         -------
-        file_ref : dict ({"file": x, "tab": y})
+        file_ref : dict ({"file": x, "id": y})
             The file reference that was recently saved.
         None
             If the user clicks cancel.
@@ -295,7 +710,7 @@ class TabManager:
 
         """
         file_ref = self.current_file_ref
-        is_perm_save = permanent and file_ref["file"].name[0:8] == "Untitled"
+        is_perm_save = permanent and self.is_untitled(file_ref["file"].name)
         if is_perm_save:
             new_file_ref = self.save_new_file()
             return new_file_ref
@@ -317,12 +732,13 @@ class TabManager:
 
         Returns
         -------
-        file reference : dict ({"file": x, "tab": y})
+        file reference : dict ({"file": x, "id": y})
             If user agreed to save.
         None
             If the user clicks no.
 
         """
+        from tkinter import filedialog
         file_to_save = filedialog.asksaveasfile(
             mode='w',
             defaultextension=".txt",
@@ -333,22 +749,28 @@ class TabManager:
         if file_to_save is None:
             return None
 
+        # The file is replaced, so a tab that has it open goes away
+        self.remove_file_from_app(self.find_file_reference(file_to_save))
+
         # Delete the old untitled file
+        document = self.document
         self.remove_file_from_app(self.current_file_ref, os_remove=True)
 
         # Create the new file and appending the text to it
         new_file_ref = self.new_file(file_to_save.name, open_instantly=False)
-        self.write_to_file(new_file_ref)
+        self.write_document(new_file_ref["file"].name, document)
+        self.buffer_cache.put(new_file_ref["file"].name, document)
         self.switch_tabs(new_file_ref)
 
         return new_file_ref
 
+    @traced("switch_tabs", switched_details)
     def switch_tabs(self, tab_file_ref):
         """Save current text and change it to the new file's.
 
         Parameter
         ---------
-        tab_file_ref : dict ({"file": x, "tab": y})
+        tab_file_ref : dict ({"file": x, "id": y})
 
         """
         if type(tab_file_ref) is not dict:
@@ -358,61 +780,57 @@ class TabManager:
 
         if not self.is_current_file(tab_file_ref):
             # Reconfigure colors to show the current file in use
-            self.focus_tabs(tab_file_ref["file"])
+            self.focus_tabs(tab_file_ref)
 
-            # Temporarily save untitled files
+            # Keep the previous tab's text in memory instead of saving it
             if self.current_file_ref is not None:
-                self.save_file(permanent=False)
+                self.stash_current_document()
 
             self.current_file_ref = tab_file_ref
             self.display_text(tab_file_ref["file"])
 
-    def focus_tabs(self, focused_raw_file):
+    def focus_tabs(self, focused_file_ref):
         """Reconfigure the styles of the tabs to show which is in use.
 
+        Only the tabs of the current and the focused file are changed.
+
         Parameter
         ---------
-        focused_raw_file : dict ({"file": x, "tab": y})
+        focused_file_ref : dict ({"file": x, "id": y})
 
         """
-        for file_reference in self.files_in_tab:
-            if self.is_current_file(file_reference):
-                file_reference["tab"].configure(
-                    style="File.TButton"
-                )
-            elif file_reference["file"] == focused_raw_file:
-                file_reference["tab"].configure(
-                    style="Current.File.TButton"
-                )
+        current_file_ref = self.current_file_ref
+        if current_file_ref not in self.files_in_tab:
+            current_file_ref = None
+        self.app.tab_strip.set_current(current_file_ref, focused_file_ref)
 
     def check_untitled_empty(self, file_reference):
         """Checks if it is an untitled file and if it is empty.
 
         Parameter
         ---------
-        file_reference: dict ({"file": x, "tab": y})
+        file_reference: dict ({"file": x, "id": y})
 
         Returns
         -------
         bool
 
         """
-        if file_reference["file"].name[0:8] != "Untitled":
+        filename = file_reference["file"].name
+        if not self.is_untitled(filename):
             return False
 
         # To ensure that the function is checking on the most updated version
         if self.is_current_file(file_reference):
-            self.save_file(permanent=False)
-
-        file_to_check = file_reference["file"]
-        with open(file_to_check.name, "r+", encoding="utf-8") as f:
-            text = f.read().strip()
-
-        if text == "":
-            return True
+            document = self.document
+        elif filename in self.buffer_cache:
+            document = self.buffer_cache.get(filename)
         else:
-            return False
+            document = self.load_document(filename)
+
+        return self.engine.is_empty_untitled(filename, document)
 
+    @traced("close_file", closed_details)
     def close_file(self, ref_to_close):
         """Save and quit the file.
 
@@ -421,7 +839,7 @@ class TabManager:
 
         Parameter
         ---------
-        ref_to_close : dict ({"file": x, "tab": y})
+        ref_to_close : dict ({"file": x, "id": y})
 
         """
         # If the parameter isn't the file reference, find it
@@ -431,21 +849,318 @@ class TabManager:
         current = False
         if self.is_current_file(ref_to_close):
             current = True
+            self.finish_paste()  # It is saved with the rest
 
+        is_untitled = self.is_untitled(ref_to_close["file"].name)
         if self.check_untitled_empty(ref_to_close):
             self.remove_file_from_app(ref_to_close, os_remove=True)
+        elif not is_untitled and not self.is_modified(ref_to_close):
+            self.remove_file_from_app(ref_to_close)  # Nothing to save
         else:
             self.save_and_quit(ref_to_close)
 
-        if self.files_in_tab != []:
+        if len(self.files_in_tab) > 0:
             if current:
                 self.random_open()
         else:
             self.prompt_to_open_file()
 
-    def write_to_file(self, file_ref: dict):  # May require textfield instance
-        """Writes text field text into the file."""
-        with open(file_ref["file"].name, 'r+', encoding='utf-8') as f:
-            current_text = self.text_field.get("1.0", tk.END).strip()
-            f.truncate()
-            f.write(current_text)
+    def write_to_file(self, file_ref: dict):
+        """Writes the current document into the file, if it was modified."""
+        if not self.document.modified:
+            return
+
+        self.sync_document()
+        self.write_document(file_ref["file"].name, self.document)
+
+    def write_back_document(self, filename, document):
+        """Writes a document evicted from the buffer cache, if modified.
+
+        Its words are taken out of the completion until it is shown
+        again.
+
+        """
+        self.app.word_index.remove(filename)
+        if document.modified:
+            self.write_document(filename, document)
+
+    def write_document(self, filename, document):
+        """Queues the document to be saved into the file.
+
+        A snapshot of the document is written by the save worker, see
+        `SaveWorker` and `Engine.write`.
+
+        """
+        self.save_worker.save(
+            filename,
+            document,
+            lambda snapshot, error: self.document_saved(
+                filename, document, snapshot, error
+            ),
+            self.engine.write
+        )
+
+    def document_saved(self, filename, document, snapshot, error):
+        """Updates the document and its tab after a save is done.
+
+        If the save failed, the document is put back into the buffer
+        cache, so the changes are not lost if it was evicted.
+
+        """
+        file_ref = self.find_file_reference(filename)
+        if error is not None:
+            messagebox.showerror(
+                "Save failed",
+                "Could not save " + filename + ":\n" + str(error),
+                parent=self.master
+            )
+            if file_ref is not None and document is not self.document:
+                self.buffer_cache.put(filename, document)
+            return
+
+        self.engine.saved(filename, document, snapshot)
+        if file_ref is not None:
+            self.app.tab_strip.set_modified(file_ref, document.modified)
+
+        if not self.is_untitled(filename):
+            self.file_watcher.refresh(filename)  # Not a change by others
+            self.scratch_store.remove(filename)  # The file is up to date
+            self.recovered.pop(filename, None)
+
+    def file_changed(self, filename):
+        """Handles a file that was changed by another program.
+
+        The current tab is reloaded right away, a tab whose document is
+        in memory is reloaded when it is shown. Other tabs read the
+        file anyway once they are shown, so their undo history, made
+        for the old text, is dropped.
+
+        """
+        if self.save_worker.busy(filename):
+            return  # Changed by our own save
+        file_ref = self.find_file_reference(filename)
+        if file_ref is None or not os.path.isfile(filename):
+            return  # A deleted file is kept as it is in the editor
+
+        if self.is_current_file(file_ref):
+            self.reload_file()
+        elif filename in self.buffer_cache:
+            file_ref["changed"] = True
+        else:
+            file_ref["history"].clear()
+
+    def reload_file(self):
+        """Brings the current document up to date with its file.
+
+        If it has unsaved changes, the user is asked first. Only the
+        parts that differ are replaced in the text field, see
+        `diffing.diff_edits`, so the view and the formatting of the
+        rest stay, and the reload can be undone like one edit.
+
+        """
+        filename = self.current_file_ref["file"].name
+        if self.document.modified and not messagebox.askyesno(
+            "Reload",
+            filename + " was changed by another program.\n"
+            "Reload it and lose your changes?",
+            parent=self.master
+        ):
+            return
+
+        if isinstance(self.document, LargeDocument):
+            self.document = LargeDocument(filename)
+            self.document.show(self.text_field)
+            self.app.tab_strip.set_modified(self.current_file_ref, False)
+            return
+
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                text = f.read()
+                newline = f.newlines
+        except (OSError, UnicodeDecodeError):
+            return
+
+        if self.loader is not None:
+            self.loader.finish()  # The edits may be past the loaded text
+        self.finish_paste()
+        document = self.document
+        edits = []
+        for start, end, inserted in diff_edits(document.get_text(), text):
+            start_line, start_column = document.line_column(start)
+            end_line, end_column = document.line_column(end)
+            edits.append((
+                str(start_line) + "." + str(start_column),
+                str(end_line) + "." + str(end_column),
+                inserted
+            ))
+
+        # From the last edit, so the indexes of the others stay right
+        history = self.current_file_ref["history"]
+        history.begin_group()
+        try:
+            for start, end, inserted in reversed(edits):
+                self.text_field.replace(start, end, inserted)
+        finally:
+            history.end_group()
+
+        if isinstance(newline, str):
+            document.newline = newline
+        document.mark_saved()
+        self.app.tab_strip.set_modified(self.current_file_ref, False)
+
+    def open_documents(self):
+        """Returns (filename, document) of the documents in memory."""
+        documents = self.buffer_cache.items()
+        if self.current_file_ref is not None:
+            documents.append(
+                (self.current_file_ref["file"].name, self.document)
+            )
+        return documents
+
+    def store_recovery(self):
+        """Copies the unsaved changes into the scratch store.
+
+        Only the documents that changed since their last copy are
+        written. Untitled documents are stored like when they are
+        saved, the other ones are kept until their file is saved.
+        Large files are left out.
+
+        """
+        self.sync_document()
+        for filename, document in self.open_documents():
+            if isinstance(document, LargeDocument) or not document.modified:
+                continue
+
+            if self.is_untitled(filename):
+                self.write_document(filename, document)
+            elif self.recovered.get(filename) != document.version:
+                self.write_recovery_copy(filename, document)
+
+        self.master.after(self.RECOVERY_INTERVAL, self.store_recovery)
+
+    def write_recovery_copy(self, filename, document):
+        """Queues a copy of the document to be put in the scratch store."""
+        self.save_worker.save(
+            filename,
+            document,
+            lambda snapshot, error: self.recovery_stored(
+                filename, document, snapshot, error
+            ),
+            self.scratch_store.write
+        )
+
+    def recovery_stored(self, filename, document, snapshot, error):
+        """Forgets the copy if the file was saved or closed meanwhile."""
+        if error is not None:
+            return
+
+        is_open = self.find_file_reference(filename) is not None
+        if not is_open or document.saved_version >= snapshot.version:
+            self.scratch_store.remove(filename)
+        else:
+            self.recovered[filename] = snapshot.version
+
+    def offer_recovery(self):
+        """Offers to restore the documents left by the last session.
+
+        Restored documents are put into the buffer cache, so only the
+        one that is shown gets loaded into the text field.
+
+        """
+        stored = self.scratch_store.load_all()
+        if stored == []:
+            return
+
+        restore = messagebox.askyesno(
+            "Restore",
+            "Restore " + str(len(stored)) + " unsaved document(s)?",
+            parent=self.master
+        )
+        if not restore:
+            self.scratch_store.clear()
+            return
+
+        file_ref = None
+        for filename, text in stored:
+            document = Document(text)
+            if not os.path.isabs(filename):  # Files are stored by path
+                raw_file = ScratchFile(filename)
+                self.engine.adopt(filename)
+            else:
+                try:  # Creates the file again if it was deleted
+                    with open(filename, "a+", encoding='utf-8') as raw_file:
+                        pass
+                except OSError:
+                    continue
+                document.version += 1  # Differs from the file
+                self.recovered[filename] = document.version
+
+            file_ref = self.find_file_reference(filename)
+            if file_ref is None:  # Not one of the session's tabs
+                file_ref = self.add_file_to_app(raw_file)
+            self.app.tab_strip.set_modified(file_ref, document.modified)
+            self.buffer_cache.put(filename, document)
+
+        if file_ref is not None:
+            self.switch_tabs(file_ref)
+
+    def save_session(self):
+        """Stores the open files, to be reopened on the next start.
+
+        Untitled documents are left out, they are saved or thrown away
+        when the editor is quit.
+
+        """
+        if self.current_file_ref is not None:
+            self.remember_view()
+
+        tabs = []
+        active = None
+        for file_ref in self.files_in_tab:
+            filename = file_ref["file"].name
+            if self.is_untitled(filename):
+                continue
+
+            if file_ref is self.current_file_ref:
+                active = len(tabs)
+            tabs.append({
+                "file": os.path.abspath(filename),
+                "cursor": file_ref.get("cursor", "1.0"),
+                "yview": file_ref.get("yview", 0.0)
+            })
+
+        try:
+            self.session.save(tabs, active)
+        except OSError:
+            pass  # Only the tabs are lost, not the work
+
+    def restore_session(self):
+        """Adds the tabs of the last session, without reading the files.
+
+        A file is only read when its tab is shown, see `display_text`.
+        Files that were deleted since are skipped.
+
+        Returns
+        -------
+        file_ref : dict ({"file": x, "id": y})
+            The tab that was shown when the editor was quit, or None.
+
+        """
+        tabs, active = self.session.load()
+        active_ref = None
+        for index, tab in enumerate(tabs):
+            filename = tab.get("file")
+            if filename is None or not os.path.isfile(filename):
+                continue
+            if self.find_file_reference(filename) is not None:
+                continue
+
+            file_ref = self.add_file_to_app(SessionFile(filename))
+            file_ref["cursor"] = tab.get("cursor", "1.0")
+            file_ref["yview"] = tab.get("yview", 0.0)
+            if index == active:
+                active_ref = file_ref
+
+        if active_ref is None:
+            active_ref = self.files_in_tab.first_ref()
+        return active_ref
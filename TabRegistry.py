@@ -0,0 +1,112 @@
+import os
+from itertools import count
+
+
+class TabRegistry:
+    """The open file references, in the order of their tabs.
+
+    References are found by the normalized path of their file, so a
+    file opened through a symlink or a relative path is found as well.
+    Every reference gets an "id" that stays the same while it is open.
+    Lookups, neighbours, adding and removing are all O(1).
+
+    """
+
+    def __init__(self, is_untitled=None):
+        """Initialize the registry.
+
+        Parameter
+        ---------
+        is_untitled : callable (filename), optional
+            True for the documents that have no path, see
+            `Engine.is_untitled`.
+
+        """
+        self.is_untitled = is_untitled
+        self.by_key = {}
+        self.by_id = {}
+        self.previous = {}  # id -> id of the reference on the left
+        self.next = {}  # id -> id of the reference on the right
+        self.first = None
+        self.last = None
+        self.ids = count()
+
+    @staticmethod
+    def normalize(filename):
+        """Returns the path of the file, the same however it's written."""
+        return os.path.normcase(os.path.realpath(filename))
+
+    def key(self, filename):
+        """Returns the normalized path of the file.
+
+        Untitled documents have no path and are found by their name.
+
+        """
+        if self.is_untitled is not None and self.is_untitled(filename):
+            return filename
+        return self.normalize(filename)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        file_id = self.first
+        while file_id is not None:
+            next_id = self.next[file_id]
+            yield self.by_id[file_id]
+            file_id = next_id
+
+    def __contains__(self, file_ref):
+        return self.by_id.get(file_ref.get("id")) is file_ref
+
+    def add(self, file_ref):
+        """Gives the reference an id and puts it after the last one."""
+        file_id = next(self.ids)
+        file_ref["id"] = file_id
+        self.by_key[self.key(file_ref["file"].name)] = file_ref
+        self.by_id[file_id] = file_ref
+
+        self.previous[file_id] = self.last
+        self.next[file_id] = None
+        if self.last is None:
+            self.first = file_id
+        else:
+            self.next[self.last] = file_id
+        self.last = file_id
+
+    def remove(self, file_ref):
+        file_id = file_ref["id"]
+        del self.by_id[file_id]
+        key = self.key(file_ref["file"].name)
+        if self.by_key.get(key) is file_ref:
+            del self.by_key[key]
+
+        previous_id = self.previous.pop(file_id)
+        next_id = self.next.pop(file_id)
+        if previous_id is None:
+            self.first = next_id
+        else:
+            self.next[previous_id] = next_id
+        if next_id is None:
+            self.last = previous_id
+        else:
+            self.previous[next_id] = previous_id
+
+    def find(self, filename):
+        """Returns the reference of the file, or None."""
+        return self.by_key.get(self.key(filename))
+
+    def get(self, file_id):
+        """Returns the reference with the id, or None."""
+        return self.by_id.get(file_id)
+
+    def left_of(self, file_ref):
+        """Returns the reference on the left, or None."""
+        return self.by_id.get(self.previous[file_ref["id"]])
+
+    def right_of(self, file_ref):
+        """Returns the reference on the right, or None."""
+        return self.by_id.get(self.next[file_ref["id"]])
+
+    def first_ref(self):
+        return self.by_id.get(self.first)
@@ -0,0 +1,181 @@
+import tkinter as tk
+from tkinter import ttk
+from tkinter.font import Font
+from FileButton import FileButton
+
+
+class TabStrip(tk.Frame):
+    """Tab bar that only has buttons for the tabs that fit in it.
+
+    The visible tabs start at `first_visible` and go on to the right
+    for as long as they fit. The arrows scroll the tabs one at a time,
+    and the overflow menu lists all of them.
+
+    Note
+    ----
+    The order of the tabs is the one of `TabManager.files_in_tab`.
+
+    """
+    PADDING = 16  # Pixels a tab needs besides its text
+
+    def __init__(self, app, master):
+        super().__init__(master)
+        self['bg'] = app.BACKGROUND_COLOR
+        self.app = app
+        self.first_visible = None
+        self.visible = []  # File references that have a button
+        self.buttons = []  # FileButton pool, the first ones are visible
+        self.font = Font(font=app.BUTTON_FONT)
+        self.refresh_job = None
+
+        self.left_arrow = ttk.Button(
+            self,
+            text="<",
+            width=2,
+            command=lambda: self.scroll(-1)
+        )
+        self.left_arrow.pack(side=tk.LEFT)
+
+        self.overflow_menu = tk.Menu(
+            self, tearoff=0, postcommand=self.build_menu
+        )
+        self.overflow_button = ttk.Menubutton(
+            self,
+            text="...",
+            width=3,
+            menu=self.overflow_menu
+        )
+        self.overflow_button.pack(side=tk.RIGHT)
+
+        self.right_arrow = ttk.Button(
+            self,
+            text=">",
+            width=2,
+            command=lambda: self.scroll(1)
+        )
+        self.right_arrow.pack(side=tk.RIGHT)
+
+        self.slots = tk.Frame(self, bg=app.BACKGROUND_COLOR)
+        self.slots.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.slots.bind('<Configure>', lambda event: self.schedule_refresh())
+
+    @property
+    def tabs(self):
+        return self.app.tab_manager.files_in_tab
+
+    def current_ref(self):
+        return self.app.tab_manager.current_file_ref
+
+    def tab_width(self, file_ref):
+        """Returns an estimate of a tab's width in pixels."""
+        displayed_name = FileButton.displayed_name(file_ref)
+        return self.font.measure("0") * len(displayed_name) + self.PADDING
+
+    def schedule_refresh(self):
+        """Refreshes once the pending events are handled."""
+        if self.refresh_job is None:
+            self.refresh_job = self.after_idle(self.refresh)
+
+    def refresh(self):
+        """Assigns the buttons to the tabs that fit, from first_visible."""
+        self.refresh_job = None
+        if self.first_visible not in self.tabs:
+            self.first_visible = self.tabs.first_ref()
+
+        available = max(self.slots.winfo_width(), 1)
+        self.visible = []
+        file_ref = self.first_visible
+        while file_ref is not None:
+            available -= self.tab_width(file_ref)
+            if available < 0 and self.visible != []:
+                break
+            self.visible.append(file_ref)
+            file_ref = self.tabs.right_of(file_ref)
+
+        current = self.current_ref()
+        for index, file_ref in enumerate(self.visible):
+            if index == len(self.buttons):
+                self.buttons.append(FileButton(self.app, self.slots))
+            self.buttons[index].assign(file_ref, file_ref is current)
+            self.buttons[index].show()
+
+        for button in self.buttons[len(self.visible):]:
+            button.pack_forget()
+
+        self.update_arrows()
+
+    def update_arrows(self):
+        can_go_left = (
+            self.first_visible is not None
+            and self.tabs.left_of(self.first_visible) is not None
+        )
+        can_go_right = (
+            self.visible != []
+            and self.tabs.right_of(self.visible[-1]) is not None
+        )
+        self.left_arrow.state(["!disabled" if can_go_left else "disabled"])
+        self.right_arrow.state(["!disabled" if can_go_right else "disabled"])
+
+    def button_of(self, file_ref):
+        """Returns the button showing the file reference, or None."""
+        for index, visible_ref in enumerate(self.visible):
+            if visible_ref is file_ref:
+                return self.buttons[index]
+        return None
+
+    def scroll(self, step):
+        """Moves the visible tabs one tab to the right (1) or left (-1)."""
+        if self.first_visible is None:
+            return
+
+        if step < 0:
+            new_first = self.tabs.left_of(self.first_visible)
+        else:
+            new_first = self.tabs.right_of(self.first_visible)
+
+        if new_first is not None:
+            self.first_visible = new_first
+            self.refresh()
+
+    def add(self, file_ref):
+        """Shows a new tab, which is added after the last one."""
+        self.schedule_refresh()
+
+    def remove(self, file_ref):
+        """Hides a tab, before it is removed from the registry."""
+        if file_ref is self.first_visible:
+            self.first_visible = (
+                self.tabs.left_of(file_ref) or self.tabs.right_of(file_ref)
+            )
+        if self.button_of(file_ref) is not None:
+            self.schedule_refresh()
+
+    def set_current(self, old_ref, new_ref):
+        """Restyles the tabs of the previous and the new current file."""
+        old_button = self.button_of(old_ref)
+        if old_button is not None:
+            old_button.set_current(False)
+
+        new_button = self.button_of(new_ref)
+        if new_button is not None:
+            new_button.set_current(True)
+        else:
+            self.first_visible = new_ref
+            self.refresh()
+
+    def set_modified(self, file_ref, modified):
+        """Shows or hides the * of a tab that has unsaved changes."""
+        file_ref["modified"] = modified
+        button = self.button_of(file_ref)
+        if button is not None:
+            button.assign(file_ref, button.file_ref is self.current_ref())
+
+    def build_menu(self):
+        """Fills the overflow menu with every tab."""
+        self.overflow_menu.delete(0, tk.END)
+        for file_ref in self.tabs:
+            self.overflow_menu.add_command(
+                label=FileButton.displayed_name(file_ref),
+                command=lambda file_ref=file_ref:
+                    self.app.tab_manager.switch_tabs(file_ref)
+            )
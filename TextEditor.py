@@ -1,7 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-from ttkthemes import ThemedStyle
 from TabManager import TabManager
+from EditorText import EditorText
+from TabStrip import TabStrip
+from Highlighter import Highlighter
+from StatusBar import StatusBar
+from Gutter import Gutter
+from WordIndex import WordIndex
+from Completer import Completer
+from SpellChecker import SpellChecker
+from tracing import traced
+import shortcuts
+import startup
 
 
 class TextEditor(tk.Frame):
@@ -13,8 +23,19 @@ class TextEditor(tk.Frame):
 
     Attributes
     ----------
-    files_in_tab : list of dict ({"file": x, "tab": y})
-    current_file_ref : dict ({"file": x, "tab": y})
+    files_in_tab : TabRegistry of dict ({"file": x, "id": y})
+    current_file_ref : dict ({"file": x, "id": y})
+    tab_strip : TabStrip
+    find_bar : FindBar
+    search_panel : SearchPanel
+    stats_overlay : StatsOverlay
+    status_bar : StatusBar
+    gutter : Gutter
+    word_index : WordIndex
+        The words of the open tabs, for the completer.
+    completer : Completer
+    spell_checker : SpellChecker
+    highlighter : Highlighter
     untitled_count : 0
         For the purposes of keeping track of the untitled files.
 
@@ -50,6 +71,11 @@ class TextEditor(tk.Frame):
     # TITLE_FONT = tk_font(family='Georgia', size=30, weight="bold")
     TEXT_FONT = ('Microsoft Sans Serif', 14)
 
+    # Created by finish_startup, once the window is shown
+    find_bar = None
+    search_panel = None
+    stats_overlay = None
+
     def __init__(self, master=None):
         """Initialize the app instance.
 
@@ -68,11 +94,41 @@ class TextEditor(tk.Frame):
         self.tab_manager.prompt_to_open_file()  # Tells user to open something
 
     def initialize_user_interface(self):
-        """Create the widgets and configure the styles."""
+        """Create the widgets that are shown, the rest comes later.
+
+        Note
+        ----
+        `finish_startup` must be called once the window is shown, app.py
+        schedules it with `after_idle()` after the first paint.
+
+        """
         self.create_widgets()
-        self.configure_styles()
+
+    def finish_startup(self):
+        """Does the setup that can wait until the window is shown.
+
+        The styles are configured, the hidden widgets created, the
+        stores opened, and the tabs of the last session and the
+        documents left by a crash are restored.
+
+        """
+        with startup.phase("configure styles"):
+            self.configure_styles()
+        with startup.phase("create hidden widgets"):
+            self.create_hidden_widgets()
+        with startup.phase("open stores"):
+            self.tab_manager.start()
+
+        with startup.phase("restore session"):
+            session_ref = self.tab_manager.restore_session()
+        with startup.phase("offer recovery"):
+            self.tab_manager.offer_recovery()  # Documents left by a crash
+        if session_ref is not None:
+            with startup.phase("show first tab"):
+                self.tab_manager.switch_tabs(session_ref)
 
     def configure_styles(self):
+        from ttkthemes import ThemedStyle  # Slow, so only imported here
         style = ThemedStyle(self.master)
 
         style.set_theme("default")
@@ -107,7 +163,7 @@ class TextEditor(tk.Frame):
         self.text_frame = tk.Frame(self.master)
         self.text_frame['bg'] = self.BACKGROUND_COLOR
         self.text_frame['highlightthickness'] = "0"
-        self.text_frame.place(relx=0, rely=0.05, relwidth=1, relheight=1)
+        self.text_frame.place(relx=0, rely=0.05, relwidth=1, relheight=0.95)
         self.initialize_text_field()
 
     def create_widgets(self):
@@ -148,9 +204,41 @@ class TextEditor(tk.Frame):
         save_button.pack(side=tk.RIGHT, padx=10, fill=tk.Y)
         save_button.config(width=len(save_button['text']))
 
+        # Initialize tab_strip, only the tabs that fit get a button
+        self.tab_strip = TabStrip(self, self.button_frame)
+        self.tab_strip.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Initialize status_bar and gutter, around the text field
+        self.status_bar = StatusBar(self, self.text_frame)
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.gutter = Gutter(self, self.text_frame)
+        self.gutter.pack(side=tk.LEFT, fill=tk.Y)
+
+        # Initialize progress_bar, shown while a file is loading
+        self.progress_bar = ttk.Progressbar(
+            self.text_frame,
+            mode="determinate",
+            maximum=1.0
+        )
+
+    def create_hidden_widgets(self):
+        """Creates the widgets that are only shown on demand."""
+        from FindBar import FindBar
+        from SearchPanel import SearchPanel
+        from StatsOverlay import StatsOverlay
+
+        # Initialize find_bar, shown with ctrlF
+        self.find_bar = FindBar(self)
+
+        # Initialize search_panel, shown with ctrlShiftF
+        self.search_panel = SearchPanel(self)
+
+        # Initialize stats_overlay, shown with F12
+        self.stats_overlay = StatsOverlay(self.text_frame)
+
     def initialize_text_field(self):
         """Initialize the text field."""
-        self.text_field = tk.Text(self.text_frame)
+        self.text_field = EditorText(self.text_frame)
         self.text_field['border'] = '0'
         self.text_field['fg'] = self.FOREGROUND_COLOR
         self.text_field['font'] = self.TEXT_FONT
@@ -161,11 +249,36 @@ class TextEditor(tk.Frame):
         self.text_field['state'] = 'normal'
         self.text_field['padx'] = '60'
         self.text_field['pady'] = '20'
+        self.highlighter = Highlighter(self.text_field)
+        self.word_index = WordIndex(self.text_field)
+        self.completer = Completer(self, self.word_index)
+        self.spell_checker = SpellChecker(self.text_field)
+
+        # Formatting, saved with the document (see FormatStore)
+        shortcuts.configure_tags(self.text_field)
+        self.text_field.bind("<Control-e>", shortcuts.title)
+        self.text_field.bind("<Control-r>", shortcuts.color)
+        # self.text_field.bind("<Control-v>", shortcuts.paste)
+        self.text_field.bind("<Control-d>", shortcuts.textReset)
 
-        # self.text_field.bind("<Control-e>", title)
-        # self.text_field.bind("<Control-r>", color)
-        # self.text_field.bind("<Control-v>", paste)
-        # self.text_field.bind("<Control-d>", textReset)
+    def show_progress(self, fraction):
+        """Shows the progress bar filled to `fraction`, or hides it.
+
+        Parameter
+        ---------
+        fraction : float or None
+            None hides the progress bar.
+
+        """
+        if fraction is None:
+            self.progress_bar.pack_forget()
+            return
+
+        self.progress_bar['value'] = fraction
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_bar.pack(
+                side=tk.TOP, fill=tk.X, before=self.text_field
+            )
 
     def hideButton(self, button):
         """Forgets the tab button's pack.
@@ -380,15 +493,30 @@ class TextEditor(tk.Frame):
             text = f.read()
         self.text_field.insert('1.0', text)
 
+    @traced("key.ctrlS")
     def ctrlS(self, event):
         self.tab_manager.save_file()
 
+    @traced("key.ctrlO")
     def ctrlO(self, event):
         self.tab_manager.open_file()
 
+    @traced("key.ctrlN")
     def ctrlN(self, event):
         self.tab_manager.new_file()
 
+    @traced("key.ctrlF")
+    def ctrlF(self, event):
+        self.find_bar.show()
+
+    @traced("key.ctrlShiftF")
+    def ctrlShiftF(self, event):
+        self.search_panel.show()
+
+    def toggle_stats(self, event):
+        self.stats_overlay.toggle()
+
+    @traced("key.ctrlQ")
     def ctrlQ(self, event):
         """Closes all tabs and files and quit the app.
 
@@ -397,10 +525,17 @@ class TextEditor(tk.Frame):
         close_file : saves and quit the file.
 
         """
+        self.tab_manager.save_session()  # Reopened on the next start
         self.tab_manager.close_all_files()
+        self.tab_manager.save_worker.drain()  # Let the saves finish
+        if self.search_panel is not None:  # Quit before finish_startup
+            self.search_panel.shutdown()
+        if self.tab_manager.file_watcher is not None:
+            self.tab_manager.file_watcher.close()
 
         self.master.quit()
 
+    @traced("key.left_file")
     def left_file(self, event):
         """Switch to the text on the left file's tab when called.
 
@@ -415,6 +550,7 @@ class TextEditor(tk.Frame):
         """
         self.tab_manager.left_file(event)
 
+    @traced("key.right_file")
     def right_file(self, event):
         """Switch to the text on the right file's tab when called.
 
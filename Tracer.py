@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class Tracer:
+    """Writes spans into a Chrome trace file and keeps their durations.
+
+    The file is a JSON array of complete ("X") events, that can be
+    opened in chrome://tracing or Perfetto. Its closing bracket is left
+    out, which both accept, so every span is appended as it ends. When
+    the file gets bigger than `MAX_SIZE`, it is renamed to "<path>.1"
+    (the older ones to ".2" and so on) and a new one is started.
+
+    """
+    MAX_SIZE = 16 * 1024 * 1024  # Bytes of a trace file before rotating
+    BACKUPS = 3  # Rotated trace files that are kept
+    SAMPLES = 1000  # Durations kept per operation for the percentiles
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.durations = {}  # name -> deque of seconds
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.open()
+
+    def open(self):
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.file.write("[\n")
+        self.size = 2
+
+    def rotate(self):
+        self.file.close()
+        for number in range(self.BACKUPS - 1, 0, -1):
+            older = self.path + "." + str(number)
+            if os.path.exists(older):
+                os.replace(older, self.path + "." + str(number + 1))
+        os.replace(self.path, self.path + ".1")
+        self.open()
+
+    def add(self, name, start, duration, args=None):
+        """Records a span.
+
+        Parameters
+        ----------
+        name : str
+        start : float
+            `time.perf_counter()` when the span started.
+        duration : float
+            In seconds.
+        args : dict, optional
+            Shown with the span in the trace viewer.
+
+        """
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": args or {}
+        }
+        line = json.dumps(event, separators=(",", ":")) + ",\n"
+        with self.lock:
+            if name not in self.durations:
+                self.durations[name] = deque(maxlen=self.SAMPLES)
+            self.durations[name].append(duration)
+
+            self.file.write(line)
+            self.file.flush()  # A frozen editor may never write it later
+            self.size += len(line)
+            if self.size > self.MAX_SIZE:
+                self.rotate()
+
+    def percentiles(self):
+        """Returns the durations of the recent spans of every operation.
+
+        Returns
+        -------
+        dict
+            Name -> (number of spans, p50, p99), in seconds.
+
+        """
+        with self.lock:
+            samples = {
+                name: sorted(durations)
+                for name, durations in self.durations.items()
+            }
+        return {
+            name: (
+                len(durations),
+                durations[len(durations) // 2],
+                durations[min(len(durations) - 1,
+                              len(durations) * 99 // 100)]
+            )
+            for name, durations in samples.items()
+        }
+
+    def close(self):
+        with self.lock:
+            self.file.close()
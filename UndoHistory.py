@@ -0,0 +1,217 @@
+import pickle
+import time
+import zlib
+from collections import deque
+
+
+class UndoHistory:
+    """Undo and redo history of one tab.
+
+    The history is a ring of groups of edits, each undone at once. Typed
+    characters and deleted ones are merged into a single edit until a
+    word ends or the user pauses, so a group is about a word or a
+    burst. When the edits take more than `limit` bytes, the oldest
+    groups are dropped. Only the edits are kept, never the document.
+
+    Note
+    ----
+    Edits are (index, removed, inserted) like `EditorText.Edit`, with
+    the index the edit had when it was made.
+
+    """
+    DEFAULT_LIMIT = 4 * 1024 * 1024  # Bytes of edits kept per tab
+    EDIT_OVERHEAD = 64  # Bytes an edit takes besides its text
+    BURST = 1.0  # Seconds of pause after which typing is a new group
+
+    def __init__(self, limit=None):
+        self.limit = self.DEFAULT_LIMIT if limit is None else limit
+        self.groups = deque()
+        self.redo_groups = []
+        self.size = 0  # Bytes taken by `groups`
+        self.compressed = None  # The groups while the tab is inactive
+        self.applying = False  # Edits made by undo and redo are ignored
+        self.group_depth = 0
+        self.mergeable = False  # If the last group can take more typing
+        self.last_time = 0
+
+    @classmethod
+    def edit_size(cls, edit):
+        return len(edit[1]) + len(edit[2]) + cls.EDIT_OVERHEAD
+
+    def compress(self):
+        """Packs the groups, for a tab that is not shown."""
+        if self.compressed is None and self.groups:
+            self.compressed = zlib.compress(pickle.dumps(
+                (list(self.groups), self.redo_groups)
+            ))
+            self.groups = deque()
+            self.redo_groups = []
+        self.mergeable = False
+
+    def decompress(self):
+        if self.compressed is not None:
+            groups, self.redo_groups = pickle.loads(
+                zlib.decompress(self.compressed)
+            )
+            self.groups = deque(groups)
+            self.compressed = None
+
+    def clear(self):
+        self.groups = deque()
+        self.redo_groups = []
+        self.size = 0
+        self.compressed = None
+        self.mergeable = False
+
+    def begin_group(self):
+        """Edits until `end_group` are undone together.
+
+        The redo is kept until an edit is recorded into the group.
+
+        """
+        self.decompress()
+        if self.group_depth == 0:
+            self.groups.append([])
+        self.group_depth += 1
+
+    def end_group(self):
+        self.group_depth -= 1
+        self.mergeable = False
+        if self.group_depth == 0 and self.groups and not self.groups[-1]:
+            self.groups.pop()  # Nothing was recorded
+
+    def add_group(self, group):
+        self.groups.append(group)
+        self.size += sum(self.edit_size(edit) for edit in group)
+        self.redo_groups = []
+        self.trim()
+
+    def trim(self):
+        """Drops the oldest groups until the history fits its limit."""
+        while self.size > self.limit and len(self.groups) > 1:
+            dropped = self.groups.popleft()
+            self.size -= sum(self.edit_size(edit) for edit in dropped)
+
+    def record(self, edit):
+        """Adds an edit that was made in the text field."""
+        if self.applying:
+            return
+
+        self.decompress()
+        edit = tuple(edit)
+        now = time.monotonic()
+        if self.group_depth > 0:
+            if not self.groups[-1]:
+                self.redo_groups = []
+            self.groups[-1].append(edit)
+            self.size += self.edit_size(edit)
+            self.trim()
+        elif (self.mergeable and now - self.last_time < self.BURST
+              and self.merge(edit)):
+            pass
+        else:
+            self.add_group([edit])
+            self.mergeable = True
+        self.last_time = now
+
+    def record_group(self, edits):
+        """Adds edits that were made at once, like a replace all."""
+        self.decompress()
+        self.add_group([tuple(edit) for edit in edits])
+        self.mergeable = False
+
+    def merge(self, edit):
+        """Merges a typed or deleted character into the last edit.
+
+        Returns
+        -------
+        bool
+            False if the edit can't be merged.
+
+        """
+        group = self.groups[-1]
+        index, removed, inserted = edit
+        last_index, last_removed, last_inserted = group[-1]
+        line, column = map(int, index.split("."))
+        last_line, last_column = map(int, last_index.split("."))
+        if line != last_line or "\n" in removed + inserted:
+            return False
+
+        if removed == "" and len(inserted) == 1 and last_removed == "":
+            # Typing, until the end of a word
+            if column != last_column + len(last_inserted):
+                return False
+            if inserted.isspace() and not last_inserted[-1].isspace():
+                return False
+            merged = (last_index, "", last_inserted + inserted)
+        elif inserted == "" and len(removed) == 1 and last_inserted == "":
+            if column == last_column - 1:  # Backspace
+                merged = (index, removed + last_removed, "")
+            elif column == last_column:  # Delete
+                merged = (index, last_removed + removed, "")
+            else:
+                return False
+        else:
+            return False
+
+        self.size += self.edit_size(merged) - self.edit_size(group[-1])
+        group[-1] = merged
+        return True
+
+    def undo(self, text_field):
+        """Undoes the last group in the text field.
+
+        Returns
+        -------
+        str or None
+            Where the cursor goes, None if there is nothing to undo.
+
+        """
+        self.decompress()
+        if not self.groups:
+            return None
+
+        group = self.groups.pop()
+        self.size -= sum(self.edit_size(edit) for edit in group)
+        self.redo_groups.append(group)
+        self.mergeable = False
+
+        cursor = None
+        self.applying = True
+        try:
+            for index, removed, inserted in reversed(group):
+                if inserted != "":
+                    end = index + "+" + str(len(inserted)) + "c"
+                    text_field.delete(index, end)
+                if removed != "":
+                    text_field.insert(index, removed)
+                cursor = index + "+" + str(len(removed)) + "c"
+        finally:
+            self.applying = False
+        return cursor
+
+    def redo(self, text_field):
+        """Makes the last undone group again, see `undo`."""
+        self.decompress()
+        if not self.redo_groups:
+            return None
+
+        group = self.redo_groups.pop()
+        self.groups.append(group)
+        self.size += sum(self.edit_size(edit) for edit in group)
+        self.trim()
+        self.mergeable = False
+
+        cursor = None
+        self.applying = True
+        try:
+            for index, removed, inserted in group:
+                if removed != "":
+                    end = index + "+" + str(len(removed)) + "c"
+                    text_field.delete(index, end)
+                if inserted != "":
+                    text_field.insert(index, inserted)
+                cursor = index + "+" + str(len(inserted)) + "c"
+        finally:
+            self.applying = False
+        return cursor
@@ -0,0 +1,222 @@
+import heapq
+import queue
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+WORD = re.compile(r"\w+")
+TAIL = re.compile(r"\w*\Z")  # A word that may go on in the next chunk
+MIN_LENGTH = 3  # Shorter words are not worth completing
+MAX_LENGTH = 40  # Longer ones are data, not words
+
+
+def count_words(text):
+    """Returns a Counter of the words of the text worth completing."""
+    return Counter(
+        word for word in WORD.findall(text)
+        if MIN_LENGTH <= len(word) <= MAX_LENGTH
+    )
+
+
+def count_chunks(chunks):
+    """Like `count_words`, for a text given in chunks."""
+    counts = Counter()
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        tail = TAIL.search(text).start()
+        counts.update(WORD.findall(text, 0, tail))
+        carry = text[tail:]
+    counts[carry] += 1
+    for word in list(counts):
+        if not MIN_LENGTH <= len(word) <= MAX_LENGTH:
+            del counts[word]
+    return counts
+
+
+def read_chunks(filename, size=1024 * 1024):
+    with open(filename, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(size)
+            if chunk == "":
+                return
+            yield chunk
+
+
+class WordIndex:
+    """The words of the open documents, for completion.
+
+    Every document has a Counter of its words, and `counts` is their
+    sum. `words` holds the same words sorted, so the words with a
+    prefix are found by bisection. A document is counted on a
+    background thread when it is added, and edits then change its
+    words by what they removed and inserted, see `update`. Removing a
+    document subtracts its words again.
+
+    The callbacks are run on the Tk thread: the results are picked up
+    with `after()` while documents are being counted.
+
+    """
+    POLL_INTERVAL = 50  # Milliseconds between checks for counted documents
+    SCAN_LIMIT = 2000  # Words with a prefix that are ranked
+    FEW = 32  # Words that are inserted one by one, not by sorting
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.documents = {}  # name -> Counter
+        self.pending = {}  # name -> edits made while it is counted
+        self.generations = {}  # name -> number of its counting job
+        self.generation = 0
+        self.counts = Counter()
+        self.words = []
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.poll_job = None
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __contains__(self, name):
+        return name in self.generations
+
+    def add_document(self, name, document):
+        """Counts the words of the document, replacing its old ones.
+
+        A document that is still being read from its file, and wasn't
+        edited, is counted from the file, so it doesn't have to be
+        read on the Tk thread.
+
+        """
+        if document.loaded or document.modified:
+            self.add(name, document.snapshot().iter_chunks())
+        else:
+            self.add(name, name)
+
+    def add(self, name, source):
+        """Queues a document to be counted.
+
+        Parameter
+        ---------
+        source : str or iterable of str
+            The file to read, or the chunks of the text.
+
+        """
+        self.remove(name)
+        self.generation += 1
+        self.generations[name] = self.generation
+        self.pending[name] = []
+        self.jobs.put((name, self.generation, source))
+
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
+
+    def remove(self, name):
+        """Forgets the words of the document."""
+        self.generations.pop(name, None)
+        self.pending.pop(name, None)
+        counts = self.documents.pop(name, None)
+        if counts is not None:
+            self.subtract(counts)
+
+    def update(self, name, removed, inserted):
+        """Changes the words of a document by an edit.
+
+        Parameters
+        ----------
+        removed, inserted : Counter
+            The words around the edit, before and after it.
+
+        """
+        if name in self.pending:
+            self.pending[name].append((removed, inserted))
+        elif name in self.documents:
+            self.change(self.documents[name], removed, inserted)
+
+    def change(self, counts, removed, inserted, shared=True):
+        removed_words = Counter()
+        for word, number in removed.items():
+            number = min(number, counts[word])
+            if number > 0:
+                counts[word] -= number
+                removed_words[word] = number
+            if word in counts and counts[word] <= 0:
+                del counts[word]
+        counts.update(inserted)
+
+        if shared:
+            self.subtract(removed_words)
+            self.merge(inserted)
+
+    def merge(self, counts):
+        """Adds the words to `counts` and `words`."""
+        new_words = [word for word in counts if word not in self.counts]
+        self.counts.update(counts)
+        if len(new_words) <= self.FEW:
+            for word in new_words:
+                insort(self.words, word)
+        else:
+            # Two sorted runs, which sort merges in linear time
+            self.words += sorted(new_words)
+            self.words.sort()
+
+    def subtract(self, counts):
+        """Takes the words out of `counts` and `words`."""
+        gone = []
+        for word, number in counts.items():
+            self.counts[word] -= number
+            if self.counts[word] <= 0:
+                del self.counts[word]
+                gone.append(word)
+
+        if len(gone) <= self.FEW:
+            for word in gone:
+                del self.words[bisect_left(self.words, word)]
+        else:
+            gone = set(gone)
+            self.words = [word for word in self.words if word not in gone]
+
+    def complete(self, prefix, limit=10):
+        """Returns the most common words that start with the prefix.
+
+        The prefix itself is not one of them.
+
+        """
+        start = bisect_left(self.words, prefix)
+        candidates = []
+        for word in self.words[start:start + self.SCAN_LIMIT]:
+            if not word.startswith(prefix):
+                break
+            if word != prefix:
+                candidates.append(word)
+        return heapq.nlargest(limit, candidates, key=self.counts.__getitem__)
+
+    def run(self):
+        while True:
+            name, generation, source = self.jobs.get()
+            try:
+                if isinstance(source, str):
+                    source = read_chunks(source)
+                counts = count_chunks(source)
+            except (OSError, UnicodeDecodeError):
+                counts = Counter()
+            self.results.put((name, generation, counts))
+
+    def poll(self):
+        self.poll_job = None
+        while True:
+            try:
+                name, generation, counts = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if self.generations.get(name) != generation:
+                continue  # Removed or added again meanwhile
+
+            for removed, inserted in self.pending.pop(name):
+                self.change(counts, removed, inserted, shared=False)
+            self.documents[name] = counts
+            self.merge(counts)
+
+        if self.pending:
+            self.poll_job = self.widget.after(self.POLL_INTERVAL, self.poll)
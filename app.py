@@ -1,38 +1,73 @@
-import tkinter as tk
+import os
+import sys
+import startup
 from platform import system as platform
-from TextEditor import TextEditor
-
-
-root = tk.Tk()
-# root['bg'] = BACKGROUND_COLOR
-text_editor = TextEditor(master=root)
-
-# Window settings
-text_editor.master.title("Notepad^")
-text_editor.master.configure(background='white')
-text_editor.master.geometry("900x700")
-text_editor.master.iconbitmap('icons/Notepad.ico')
-
-# Binds (if on MACOSX, it is Cmd instead of Ctrl)
-if platform() == 'Darwin':
-    text_editor.master.bind('<Command-s>', text_editor.ctrlS)
-    text_editor.master.bind('<Command-o>', text_editor.ctrlO)
-    text_editor.master.bind('<Command-q>', text_editor.ctrlQ)
-    text_editor.master.bind('<Command-n>', text_editor.ctrlN)
-    text_editor.master.bind('<Command-Left>', text_editor.left_file)
-    text_editor.master.bind('<Command-Right>', text_editor.right_file)
-    text_editor.master.protocol(
-        "WM_DELETE_WINDOW", lambda: text_editor.ctrlQ("")
-    )
-else:
-    text_editor.master.bind('<Control-s>', text_editor.ctrlS)
-    text_editor.master.bind('<Control-o>', text_editor.ctrlO)
-    text_editor.master.bind('<Control-q>', text_editor.ctrlQ)
-    text_editor.master.bind('<Control-n>', text_editor.ctrlN)
-    text_editor.master.bind('<Control-Left>', text_editor.left_file)
-    text_editor.master.bind('<Control-Right>', text_editor.right_file)
-    text_editor.master.protocol(
-        "WM_DELETE_WINDOW", lambda: text_editor.ctrlQ("")
-    )
-
-root.mainloop()  # Start the program
+
+
+# Guarded, the processes of the search pool import this module
+if __name__ == "__main__":
+    # Prints how long the imports and every step of the startup take
+    profile = "--startup-profile" in sys.argv
+    if profile:
+        startup.enable()
+
+    # Imported here, so the search pool processes don't load the GUI
+    import tkinter as tk
+    from TextEditor import TextEditor
+    import tracing
+
+    # Opt-in tracing of the slow operations, see tracing.py
+    if os.environ.get("NOTEPAD_TRACE"):
+        tracing.enable(os.environ["NOTEPAD_TRACE"])
+
+    with startup.phase("create window"):
+        root = tk.Tk()
+    # root['bg'] = BACKGROUND_COLOR
+    with startup.phase("create editor"):
+        text_editor = TextEditor(master=root)
+
+    # Window settings
+    text_editor.master.title("Notepad^")
+    text_editor.master.configure(background='white')
+    text_editor.master.geometry("900x700")
+    text_editor.master.iconbitmap('icons/Notepad.ico')
+
+    # Binds (if on MACOSX, it is Cmd instead of Ctrl)
+    if platform() == 'Darwin':
+        text_editor.master.bind('<Command-s>', text_editor.ctrlS)
+        text_editor.master.bind('<Command-o>', text_editor.ctrlO)
+        text_editor.master.bind('<Command-q>', text_editor.ctrlQ)
+        text_editor.master.bind('<Command-n>', text_editor.ctrlN)
+        text_editor.master.bind('<Command-f>', text_editor.ctrlF)
+        text_editor.master.bind('<Command-F>', text_editor.ctrlShiftF)
+        text_editor.master.bind('<Command-Left>', text_editor.left_file)
+        text_editor.master.bind('<Command-Right>', text_editor.right_file)
+        text_editor.master.bind('<F12>', text_editor.toggle_stats)
+        text_editor.master.protocol(
+            "WM_DELETE_WINDOW", lambda: text_editor.ctrlQ("")
+        )
+    else:
+        text_editor.master.bind('<Control-s>', text_editor.ctrlS)
+        text_editor.master.bind('<Control-o>', text_editor.ctrlO)
+        text_editor.master.bind('<Control-q>', text_editor.ctrlQ)
+        text_editor.master.bind('<Control-n>', text_editor.ctrlN)
+        text_editor.master.bind('<Control-f>', text_editor.ctrlF)
+        text_editor.master.bind('<Control-F>', text_editor.ctrlShiftF)
+        text_editor.master.bind('<Control-Left>', text_editor.left_file)
+        text_editor.master.bind('<Control-Right>', text_editor.right_file)
+        text_editor.master.bind('<F12>', text_editor.toggle_stats)
+        text_editor.master.protocol(
+            "WM_DELETE_WINDOW", lambda: text_editor.ctrlQ("")
+        )
+
+    # Show the window now, the rest of the setup comes right after it
+    with startup.phase("first paint"):
+        root.update_idletasks()
+
+    def finish_startup():
+        text_editor.finish_startup()
+        if profile:
+            startup.report()
+    root.after_idle(finish_startup)
+
+    root.mainloop()  # Start the program
@@ -0,0 +1,183 @@
+"""Changes many files from the command line, without the editor window.
+
+The files are opened, changed and saved by the same `Engine` as in the
+editor, so they are replaced atomically and keep their line endings
+unless told otherwise, mixed ones become the platform's. Directories
+are walked recursively. The files are shared out to a pool of
+processes::
+
+    python batch.py --strip-trailing --final-newline --newline lf src
+    python batch.py --replace colour color --include "*.txt" docs
+
+It exits with status 1 if a file could not be changed.
+
+"""
+import argparse
+import fnmatch
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Engine import Engine
+from search import compile_pattern, replace_all
+
+
+NEWLINES = {"lf": "\n", "crlf": "\r\n"}
+TRAILING = re.compile(r"[ \t]+$", re.MULTILINE)
+CHUNKS_PER_JOB = 4  # Smaller chunks even out the work of the processes
+
+
+def find_files(paths, include=None):
+    """Yields the files, and the files in the directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if include is None or fnmatch.fnmatch(filename, include):
+                    yield os.path.join(directory, filename)
+
+
+def make_transform(options):
+    """Returns the function that changes the text of a file."""
+    pattern = None
+    if options.replace is not None:
+        pattern = compile_pattern(
+            options.replace[0], options.regex, not options.ignore_case
+        )
+
+    def transform(text):
+        if pattern is not None:
+            text, _ = replace_all(
+                text, pattern, options.replace[1], options.regex
+            )
+        if options.expand_tabs is not None:
+            text = text.expandtabs(options.expand_tabs)
+        if options.strip_trailing:
+            text = TRAILING.sub("", text)
+        if options.final_newline and text and not text.endswith("\n"):
+            text += "\n"
+        return text
+
+    return transform
+
+
+def process_files(filenames, options):
+    """Changes the files, in a process of the pool.
+
+    Returns
+    -------
+    list of (str, bool, str or None)
+        The filename, whether it changed and the error, if any.
+
+    """
+    engine = Engine()
+    transform = make_transform(options)
+    results = []
+    for filename in filenames:
+        try:
+            changed = engine.transform(filename, transform)
+            if options.newline != "keep":
+                document = engine.open(filename)
+                version = document.version
+                engine.set_newline(filename, NEWLINES[options.newline])
+                changed = changed or document.version != version
+            engine.close(filename, save=not options.dry_run)
+        except (OSError, UnicodeDecodeError, re.error) as error:
+            engine.documents.pop(filename, None)
+            results.append((filename, False, str(error)))
+        else:
+            results.append((filename, changed, None))
+    return results
+
+
+def split(items, count):
+    """Returns the items in `count` lists of about the same length."""
+    size = max(1, -(-len(items) // count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run(filenames, options):
+    """Processes the files, on `options.jobs` processes.
+
+    Returns
+    -------
+    list of (str, bool, str or None)
+        See `process_files`, in the order of the files.
+
+    """
+    if options.jobs <= 1 or len(filenames) <= 1:
+        return process_files(filenames, options)
+
+    chunks = split(filenames, options.jobs * CHUNKS_PER_JOB)
+    results = []
+    with ProcessPoolExecutor(max_workers=options.jobs) as executor:
+        for chunk_results in executor.map(
+            process_files, chunks, [options] * len(chunks)
+        ):
+            results += chunk_results
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="files, or directories to walk")
+    parser.add_argument("--include", metavar="GLOB",
+                        help="only the files of the directories that match")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(),
+                        help="processes to use (default: one per CPU)")
+    parser.add_argument("--newline", choices=("lf", "crlf", "keep"),
+                        default="keep", help="line ending to save with")
+    parser.add_argument("--strip-trailing", action="store_true",
+                        help="remove spaces and tabs at the ends of lines")
+    parser.add_argument("--final-newline", action="store_true",
+                        help="end the files with a newline")
+    parser.add_argument("--expand-tabs", type=int, metavar="N",
+                        help="replace tabs by spaces, N columns apart")
+    parser.add_argument("--replace", nargs=2,
+                        metavar=("PATTERN", "REPLACEMENT"))
+    parser.add_argument("--regex", action="store_true",
+                        help="the pattern is a regular expression")
+    parser.add_argument("--ignore-case", action="store_true")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only list the files that would change")
+    options = parser.parse_args()
+
+    if options.replace is not None:
+        try:
+            pattern = compile_pattern(options.replace[0], options.regex)
+        except re.error as error:
+            parser.error("invalid pattern: " + str(error))
+        try:
+            # The replacement is checked before the first match
+            replace_all("", pattern, options.replace[1], options.regex)
+        except re.error as error:
+            parser.error("invalid replacement: " + str(error))
+
+    start = time.perf_counter()
+    filenames = list(find_files(options.paths, options.include))
+    results = run(filenames, options)
+
+    changed = failed = 0
+    for filename, file_changed, error in results:
+        if error is not None:
+            failed += 1
+            print(filename + ": " + error, file=sys.stderr)
+        elif file_changed:
+            changed += 1
+            print(("would change " if options.dry_run else "changed ")
+                  + filename)
+
+    print("{} files, {} changed, {} failed in {:.2f} s".format(
+        len(results), changed, failed, time.perf_counter() - start
+    ))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
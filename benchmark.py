@@ -0,0 +1,413 @@
+"""Benchmarks of the editor's hot paths.
+
+Synthetic files of every size and shape are opened, shown, formatted,
+saved and closed in a real editor window, and many tabs are switched
+between and closed. The time and the peak memory of every operation
+are printed, and can be saved as a baseline to compare later runs with.
+Without a display, run it under a virtual X server::
+
+    python benchmark.py --xvfb --save baseline.json
+    python benchmark.py --xvfb --compare baseline.json
+
+The comparison exits with status 1 if an operation got slower or uses
+more memory than the baseline allows.
+
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+SIZES = {"1KB": KB, "64KB": 64 * KB, "1MB": MB, "16MB": 16 * MB,
+         "128MB": 128 * MB, "1GB": GB}
+SHAPES = {
+    "lines": 80,  # Characters per line
+    "long": MB,  # Lines of a megabyte, or one line for smaller files
+}
+TAB_COUNTS = (1, 10, 100, 500)
+TAB_FILE_SIZE = 16 * KB
+BLOCK_SIZE = MB  # Files are written from a few random blocks
+TOLERANCE = 0.25  # Allowed slowdown or memory growth over the baseline
+NOISE = 0.005  # Seconds of difference that are never a regression
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "def", "return",
+         "class", "if", "else", "0x1f", "42", "'text'", "# note")
+
+
+def size_name(size):
+    for name, value in SIZES.items():
+        if value == size:
+            return name
+    return str(size)
+
+
+def make_block(rng, size, line_length):
+    """Returns `size` characters of random words, in lines."""
+    words = []
+    length = 0
+    line = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        if line + len(word) >= line_length:
+            words.append("\n")
+            length += 1
+            line = 0
+        else:
+            separator = " " if line > 0 else ""
+            words.append(separator + word)
+            length += len(separator) + len(word)
+            line += len(separator) + len(word)
+    return "".join(words)[:size - 1] + "\n"
+
+
+def generate_file(directory, size, shape, seed=0):
+    """Writes a synthetic file, or reuses it from an earlier run.
+
+    The content only depends on the size, the shape and the seed, so
+    every run benchmarks the same text.
+
+    Returns
+    -------
+    str
+        The name of the file.
+
+    """
+    filename = os.path.join(
+        directory, shape + "-" + size_name(size) + "-" + str(seed) + ".txt"
+    )
+    if os.path.exists(filename) and os.path.getsize(filename) == size:
+        return filename
+
+    rng = random.Random(seed)
+    line_length = min(SHAPES[shape], size)
+    blocks = [
+        make_block(rng, min(BLOCK_SIZE, size), line_length)
+        for _ in range(4)
+    ]
+    with open(filename, "w", encoding="utf-8", newline="\n") as f:
+        written = 0
+        while written < size:
+            block = rng.choice(blocks)[:size - written]
+            f.write(block)
+            written += len(block)
+    return filename
+
+
+def reset_peak_rss():
+    """Starts measuring the peak memory from now on (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """Returns the peak resident memory of the process, in bytes."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * KB
+    except OSError:
+        pass
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * KB
+
+
+def start_xvfb():
+    """Starts a virtual X server for this process, if there's no display.
+
+    Returns
+    -------
+    subprocess.Popen or None
+
+    """
+    if os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb is not installed, run under another X server")
+
+    display = ":" + str(90 + os.getpid() % 100)
+    server = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    time.sleep(1)  # Let it accept connections
+    os.environ["DISPLAY"] = display
+    return server
+
+
+class Benchmark:
+    """Runs the operations in one editor window and keeps the results.
+
+    The editor gets its own home directory, so its session, scratch and
+    formatting stores start empty and the user's are left alone.
+
+    Attributes
+    ----------
+    results : dict
+        Name of the operation -> {"seconds": median, "peak_rss": bytes}
+
+    """
+
+    def __init__(self, data_directory, repeat=3):
+        self.data_directory = data_directory
+        self.repeat = repeat
+        self.results = {}
+
+        os.environ["HOME"] = tempfile.mkdtemp(prefix="notepad-bench-")
+        import tkinter as tk
+        from tkinter import filedialog
+        from TextEditor import TextEditor
+        import shortcuts
+
+        self.filedialog = filedialog
+        self.shortcuts = shortcuts
+        self.root = tk.Tk()
+        self.root.geometry("900x700")
+        self.editor = TextEditor(master=self.root)
+        self.tab_manager = self.editor.tab_manager
+        self.text_field = self.editor.text_field
+        self.root.update()
+        self.editor.finish_startup()
+        self.root.update()
+
+    def measure(self, name, operation, prepare=None):
+        """Times the operation `repeat` times and keeps the median.
+
+        Parameters
+        ----------
+        name : str
+        operation : callable ()
+        prepare : callable (), optional
+            Run before every repetition, it is not timed.
+
+        """
+        times = []
+        peak = 0
+        for _ in range(self.repeat):
+            if prepare is not None:
+                prepare()
+            reset_peak_rss()
+            start = time.perf_counter()
+            operation()
+            times.append(time.perf_counter() - start)
+            peak = max(peak, peak_rss())
+        self.record(name, statistics.median(times), peak)
+
+    def record(self, name, seconds, peak):
+        self.results[name] = {"seconds": seconds, "peak_rss": peak}
+        print("{:<40} {:>10.4f} s {:>10.1f} MB".format(
+            name, seconds, peak / MB
+        ), flush=True)
+
+    def wait_loaded(self):
+        """Lets Tk run until the current document is fully shown."""
+        loader = self.tab_manager.loader
+        while loader is not None and loader.running:
+            self.root.update()
+        self.root.update_idletasks()
+
+    def open_file(self, filename):
+        """Opens the file like the user would, through `open_file`."""
+        self.filedialog.askopenfile = (
+            lambda **options: open(filename, options.get("mode", "r"))
+        )
+        self.tab_manager.open_file()
+        self.wait_loaded()
+
+    def close_all(self):
+        self.tab_manager.close_all_files()
+        self.tab_manager.save_worker.drain()
+        self.root.update()
+
+    def modify(self):
+        """Changes the document, but not its text, which stays reusable."""
+        self.text_field.insert("1.0", "x")
+        self.text_field.delete("1.0")
+
+    def select_all(self):
+        self.text_field.tag_add("sel", "1.0", "end-1c")
+
+    def run_file(self, size, shape):
+        """Benchmarks the operations on a single file."""
+        filename = generate_file(self.data_directory, size, shape)
+        label = "/" + shape + "/" + size_name(size)
+        tab_manager = self.tab_manager
+
+        self.measure(
+            "open_file" + label, lambda: self.open_file(filename),
+            self.close_all
+        )
+
+        first_paints = []  # Seconds until the first chunk was shown
+
+        def display():
+            tab_manager.display_text(tab_manager.current_file_ref["file"])
+            if tab_manager.loader is not None:
+                first_paints.append(tab_manager.loader.first_paint)
+            self.wait_loaded()
+        self.measure("display_text" + label, display, tab_manager.stop_loading)
+        if first_paints:  # Large files are shown without a loader
+            self.record(
+                "first_paint" + label, statistics.median(first_paints),
+                self.results["display_text" + label]["peak_rss"]
+            )
+
+        def write():
+            tab_manager.write_to_file(tab_manager.current_file_ref)
+            tab_manager.save_worker.drain()
+        self.measure("write_to_file" + label, write, self.modify)
+
+        event = SimpleNamespace(widget=self.text_field)
+        for handler in ("title", "color", "textReset"):
+            self.measure(
+                "shortcuts." + handler + label,
+                lambda: getattr(self.shortcuts, handler)(event),
+                self.select_all
+            )
+
+        tab_manager.save_file()  # The formatting made it modified
+        tab_manager.save_worker.drain()
+        self.measure("close_all_files" + label, self.close_all,
+                     lambda: self.open_file(filename))
+
+    def run_tabs(self, count):
+        """Benchmarks switching between and closing many tabs."""
+        filenames = [
+            generate_file(self.data_directory, TAB_FILE_SIZE, "lines", seed)
+            for seed in range(count)
+        ]
+        label = "/" + str(count) + " tabs"
+        tab_manager = self.tab_manager
+
+        def open_all():
+            self.close_all()
+            for filename in filenames:
+                self.open_file(filename)
+        open_all()
+
+        def switch_all():
+            for file_ref in list(tab_manager.files_in_tab):
+                tab_manager.switch_tabs(file_ref)
+                self.wait_loaded()
+        self.measure("switch_tabs" + label, switch_all)
+        self.measure("close_all_files" + label, self.close_all, open_all)
+
+    def run(self, max_size, max_tabs):
+        for size in SIZES.values():
+            if size > max_size:
+                continue
+            for shape in SHAPES:
+                self.run_file(size, shape)
+        for count in TAB_COUNTS:
+            if count <= max_tabs:
+                self.run_tabs(count)
+
+    def close(self):
+        self.close_all()
+        self.tab_manager.file_watcher.close()
+        self.editor.search_panel.shutdown()
+        self.root.destroy()
+
+
+def compare(results, baseline, tolerance):
+    """Returns the operations that regressed from the baseline.
+
+    Returns
+    -------
+    list of str
+        A description of every regression.
+
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        seconds = result["seconds"]
+        if (seconds > base["seconds"] * (1 + tolerance)
+                and seconds - base["seconds"] > NOISE):
+            regressions.append("{}: {:.4f} s, was {:.4f} s".format(
+                name, seconds, base["seconds"]
+            ))
+        if result["peak_rss"] > base["peak_rss"] * (1 + tolerance):
+            regressions.append("{}: {:.1f} MB, was {:.1f} MB".format(
+                name, result["peak_rss"] / MB, base["peak_rss"] / MB
+            ))
+    return regressions
+
+
+def parse_size(text):
+    if text in SIZES:
+        return SIZES[text]
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--data", default=os.path.join(tempfile.gettempdir(), "notepad-data"),
+        help="directory of the generated files, reused between runs"
+    )
+    parser.add_argument(
+        "--max-size", type=parse_size, default=GB,
+        help="biggest file to benchmark, like 16MB (default 1GB)"
+    )
+    parser.add_argument(
+        "--max-tabs", type=int, default=max(TAB_COUNTS),
+        help="most tabs to benchmark"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="BASELINE",
+                        help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="fail if the results regressed from it")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--xvfb", action="store_true",
+                        help="start a virtual X server if there's no display")
+    arguments = parser.parse_args()
+
+    os.makedirs(arguments.data, exist_ok=True)
+    server = start_xvfb() if arguments.xvfb else None
+    try:
+        benchmark = Benchmark(arguments.data, arguments.repeat)
+        try:
+            benchmark.run(arguments.max_size, arguments.max_tabs)
+        finally:
+            benchmark.close()
+    finally:
+        if server is not None:
+            server.terminate()
+
+    if arguments.save is not None:
+        with open(arguments.save, "w") as f:
+            json.dump({"results": benchmark.results}, f, indent=2)
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(
+            benchmark.results, baseline, arguments.tolerance
+        )
+        if regressions:
+            print("\nREGRESSIONS:", *regressions, sep="\n  ")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+MAX_DIFF_LINES = 5000  # Changed regions longer than this are one edit
+
+
+def common_prefix(old, new):
+    """Returns the length of the text both strings start with.
+
+    The strings are compared by slices that halve at every step, so it
+    takes O(n) character comparisons done by C code.
+
+    """
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[low:middle] == new[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(old, new, limit):
+    """Like `common_prefix` for the end, but at most `limit` long."""
+    low, high = 0, min(len(old), len(new), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if old[len(old) - middle:len(old) - low] == (
+            new[len(new) - middle:len(new) - low]
+        ):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def diff_edits(old, new):
+    """Returns the edits that turn the old text into the new one.
+
+    The text both start and end with is skipped first. If what is left
+    is short enough, it is compared line by line, otherwise it is
+    replaced in one edit.
+
+    Returns
+    -------
+    list of tuple (start, end, inserted)
+        `old[start:end]` is replaced by `inserted`. The edits are in
+        order and the offsets are in the old text.
+
+    """
+    prefix = common_prefix(old, new)
+    suffix = common_suffix(old, new, min(len(old), len(new)) - prefix)
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+    if old_middle == new_middle:
+        return []
+
+    old_lines = old_middle.splitlines(keepends=True)
+    new_lines = new_middle.splitlines(keepends=True)
+    if max(len(old_lines), len(new_lines)) > MAX_DIFF_LINES:
+        return [(prefix, len(old) - suffix, new_middle)]
+
+    old_starts = [prefix]
+    for line in old_lines:
+        old_starts.append(old_starts[-1] + len(line))
+
+    edits = []
+    import difflib  # Only needed once a file is reloaded
+    matcher = difflib.SequenceMatcher(
+        None, old_lines, new_lines, autojunk=False
+    )
+    for tag, old_first, old_last, new_first, new_last in (
+        matcher.get_opcodes()
+    ):
+        if tag != "equal":
+            edits.append((
+                old_starts[old_first],
+                old_starts[old_last],
+                "".join(new_lines[new_first:new_last])
+            ))
+    return edits
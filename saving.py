@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+
+def atomic_write(filename, chunks, newline=None):
+    """Replaces the content of the file with the chunks of text.
+
+    The chunks are streamed into a temporary file next to the target,
+    which is synced to the disk and then renamed over the target, so
+    the file is either fully saved or left as it was.
+
+    Parameters
+    ----------
+    filename : str
+        If it is a symlink, the file it points to is replaced.
+    chunks : iterable of str
+    newline : str, optional
+        Line ending written for every "\\n", the platform's by default.
+
+    """
+    target = os.path.realpath(filename)
+    directory, name = os.path.split(target)
+    fd, temp_name = tempfile.mkstemp(
+        prefix="." + name + ".", suffix=".tmp", dir=directory
+    )
+
+    try:
+        with open(fd, "w", encoding="utf-8", newline=newline) as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if os.path.exists(target):
+            os.chmod(temp_name, os.stat(target).st_mode & 0o7777)
+        os.replace(temp_name, target)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+    sync_directory(directory)
+
+
+def sync_directory(directory):
+    """Makes sure a rename in the directory is on the disk."""
+    if not hasattr(os, "O_DIRECTORY"):  # Windows can't open directories
+        return
+
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,253 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+
+PREVIEW_SIZE = 200  # Characters of a line shown with its matches
+
+Matches = namedtuple("Matches", ["starts", "ends", "chunk_starts"])
+Matches.__doc__ = """The matches of a pattern in a document.
+
+`starts` and `ends` are arrays of character offsets, sorted.
+`chunk_starts` holds the offset of every chunk that was searched, so
+a match can be found in the block of a large document.
+"""
+
+
+def compile_pattern(text, regex=False, case=True):
+    """Returns the compiled pattern of a search.
+
+    Parameters
+    ----------
+    text : str
+    regex : bool, optional
+        If False, the text is searched literally.
+    case : bool, optional
+        If False, the case of letters is ignored.
+
+    Raises
+    ------
+    re.error
+        If the regular expression is not valid.
+
+    """
+    flags = re.MULTILINE
+    if not case:
+        flags |= re.IGNORECASE
+    if not regex:
+        text = re.escape(text)
+    return re.compile(text, flags)
+
+
+def find_all(chunks, pattern):
+    """Returns the `Matches` of the pattern in the text.
+
+    The chunks are joined first, so matches that cross chunks are
+    found too. Empty matches are left out.
+
+    Parameters
+    ----------
+    chunks : iterable of str
+    pattern : re.Pattern
+
+    """
+    chunk_starts = array("q")
+    parts = []
+    offset = 0
+    for chunk in chunks:
+        chunk_starts.append(offset)
+        parts.append(chunk)
+        offset += len(chunk)
+    text = "".join(parts)
+
+    starts = array("q")
+    ends = array("q")
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start != end:
+            starts.append(start)
+            ends.append(end)
+
+    return Matches(starts, ends, chunk_starts)
+
+
+def replace_all(text, pattern, replacement, regex=False):
+    """Returns (new text, number of replacements).
+
+    With `regex`, groups can be used in the replacement ("\\1").
+
+    """
+    if not regex:
+        replacement = replacement.replace("\\", "\\\\")
+    return pattern.subn(replacement, text)
+
+
+def move_ranges(ranges, edits):
+    """Returns where the ranges are after the edits of a replace.
+
+    A range that covers a part of a match covers its replacement, a
+    range inside a match that was replaced by nothing is dropped.
+
+    Parameters
+    ----------
+    ranges : list of (int, int)
+        Start and end offsets in the text before the edits.
+    edits : list of tuple (offset, removed, inserted)
+        See `replace_with_edits`.
+
+    Returns
+    -------
+    list of (int, int)
+        The ranges in the new text.
+
+    """
+    old_starts = []
+    moved = 0
+    for offset, removed, inserted in edits:
+        old_starts.append(offset - moved)
+        moved += len(inserted) - len(removed)
+
+    def move(offset, number, end):
+        if number < 0:
+            return offset
+        new_start, removed, inserted = edits[number]
+        old_end = old_starts[number] + len(removed)
+        if offset >= old_end:
+            return new_start + len(inserted) + offset - old_end
+        return new_start + len(inserted) if end else new_start  # Inside
+
+    moved_ranges = []
+    for start, end in ranges:
+        # A match at the start is in the range, one at the end is not
+        new_start = move(start, bisect_right(old_starts, start) - 1, False)
+        new_end = move(end, bisect_left(old_starts, end) - 1, True)
+        if new_start < new_end:
+            moved_ranges.append((new_start, new_end))
+    return moved_ranges
+
+
+def match_at_or_after(matches, offset):
+    """Returns the number of the first match from the offset on.
+
+    It wraps around to the first match, and is None if there is none.
+
+    """
+    if len(matches.starts) == 0:
+        return None
+    number = bisect_left(matches.starts, offset)
+    return number if number < len(matches.starts) else 0
+
+
+def matches_between(matches, start, end):
+    """Returns the range of the numbers of the matches in an area."""
+    first = bisect_left(matches.ends, start + 1)
+    last = bisect_left(matches.starts, end)
+    return range(first, max(first, last))
+
+
+def replace_with_edits(text, pattern, replacement, regex=False):
+    """Returns the new text and the edits that make it, see `replace_all`.
+
+    Returns
+    -------
+    str, list of tuple (offset, removed, inserted)
+        The offsets are in the new text. Since the edits are in order,
+        each offset is also right for the text with only the edits
+        before it made.
+
+    """
+    edits = []
+    moved = 0  # Characters added by the edits so far
+
+    def replace(match):
+        nonlocal moved
+        if regex:
+            inserted = match.expand(replacement)
+        else:
+            inserted = replacement
+        edits.append((match.start() + moved, match.group(), inserted))
+        moved += len(inserted) - len(match.group())
+        return inserted
+
+    return pattern.sub(replace, text), edits
+
+
+def replace_in_chunks(chunks, pattern, replacement, regex=False):
+    """Replaces the matches chunk by chunk, see `replace_all`.
+
+    Matches that would cross two chunks are not replaced.
+
+    Returns
+    -------
+    dict, int
+        The new text of every chunk that changed, by its number, and
+        the number of replacements.
+
+    """
+    changed = {}
+    count = 0
+    for number, chunk in enumerate(chunks):
+        new_chunk, replaced = replace_all(chunk, pattern, replacement, regex)
+        if replaced > 0:
+            changed[number] = new_chunk
+            count += replaced
+    return changed, count
+
+
+def find_lines(text, pattern, limit=None):
+    """Returns the matches with the line they are on.
+
+    Parameters
+    ----------
+    text : str
+    pattern : re.Pattern
+    limit : int, optional
+        Stops after that many matches.
+
+    Returns
+    -------
+    list of tuple (line, column, length, line text)
+
+    """
+    hits = []
+    line = 1
+    counted = 0  # Newlines before this offset are in `line`
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+
+        line += text.count("\n", counted, start)
+        counted = start
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end == -1:
+            line_end = len(text)
+        hits.append((
+            line, start - line_start, end - start,
+            text[line_start:min(line_end, line_start + PREVIEW_SIZE)]
+        ))
+        if len(hits) == limit:
+            break
+    return hits
+
+
+def find_lines_in_part(text, pattern, limit=None):
+    """Returns the `find_lines` of a part of a document, and its newlines.
+
+    The parts are searched one after the other, see
+    `SearchPanel.search_parts`.
+
+    """
+    return find_lines(text, pattern, limit), text.count("\n")
+
+
+def search_file(filename, pattern, limit=None):
+    """Returns the `find_lines` of the pattern in a file.
+
+    It is meant to run in another process, see `SearchPanel`.
+
+    """
+    with open(filename, encoding="utf-8", errors="replace") as f:
+        return find_lines(f.read(), pattern, limit)
@@ -1,51 +1,89 @@
-import tkinter as tk
-from tkinter.font import Font as tk_font
-from app import TextEditor as app
 
+TITLE_FONT = ('Georgia', 30, 'bold')
+TEXT_FONT = ('Microsoft Sans Serif', 14)
+FORMAT_TAGS = ("color", "nadpis")  # Tags that are saved with a document
 
-TITLE_FONT = tk_font(family='Georgia', size=30, weight="bold")
-TEXT_FONT = tk_font(family='Microsoft Sans Serif', size=14)
+
+def configure_tags(text_field):
+    text_field.tag_config("color", foreground="#8A2BE2")
+    text_field.tag_config("nadpis", font=TITLE_FONT)
+
+
+def formatted(text_field):
+    """Tells the tab manager that the formatting was changed."""
+    text_field.event_generate("<<Formatted>>")
 
 
 def paste(event):
-    tk.Entry.event_delete(app.text_field, "<<Paste>>")
-    tk.Entry.event_generate(app.text_field, '<<Paste>>')
-    app.text_field.see(tk.END)
+    """Pastes with the text field's own <<Paste>> binding."""
+    event.widget.event_generate("<<Paste>>")
+    return "break"
 
 
 def color(event):
-    if app.text_field.tag_ranges("sel"):
-        app.text_field.tag_add("color", "sel.first", "sel.last")
-        app.text_field.tag_config("color", foreground="#8A2BE2")
+    text_field = event.widget
+    if text_field.tag_ranges("sel"):
+        text_field.tag_add("color", "sel.first", "sel.last")
     else:
-        word_start = app.text_field.index("insert-1c wordstart")
-        word_end = app.text_field.index("insert")
-        app.text_field.tag_add('color', word_start, word_end)
-        app.text_field.tag_config("color", foreground="#8A2BE2")
+        word_start = text_field.index("insert-1c wordstart")
+        word_end = text_field.index("insert")
+        text_field.tag_add('color', word_start, word_end)
+    formatted(text_field)
+    return "break"  # Keeps the default binding of the keys from running
 
 
 def textReset(event):
-    if app.text_field.tag_ranges("sel"):
-        app.text_field.tag_add("color", "sel.first", "sel.last")
-        app.text_field.tag_config("color", foreground="black")
+    text_field = event.widget
+    if text_field.tag_ranges("sel"):
+        text_field.tag_remove("color", "sel.first", "sel.last")
+        text_field.tag_remove("nadpis", "sel.first", "sel.last")
+    else:
+        text_field.tag_remove('color', "insert-1c wordstart", "insert")
+        text_field.tag_remove('nadpis', "insert linestart", "insert")
+    formatted(text_field)
+    return "break"
+
 
-        app.text_field.tag_add("nadpis", "sel.first", "sel.last")
-        app.text_field.tag_config("nadpis", font=TEXT_FONT)
+def title(event):
+    text_field = event.widget
+    if text_field.tag_ranges("sel"):
+        text_field.tag_add("nadpis", "sel.first", "sel.last")
     else:
-        app.text_field.tag_add('color', "insert-1c wordstart", "insert")
-        app.text_field.tag_config("color", foreground="black")
+        cur_cursor = text_field.index("insert")
+        line_start = text_field.index("insert-1c linestart")
+        text_field.tag_add('nadpis', line_start, cur_cursor)
+    formatted(text_field)
+    return "break"
 
-        app.text_field.tag_add('nadpis', "insert linestart", "insert")
-        app.text_field.tag_config("nadpis", font=TEXT_FONT)
 
+def capture_formatting(text_field):
+    """Returns the ranges of the formatting tags in the text field.
 
-def title(event):
-    if app.text_field.tag_ranges("sel"):
-        app.text_field.tag_add("nadpis", "sel.first", "sel.last")
-        app.text_field.tag_config("nadpis", font=TITLE_FONT)
-
-    if not app.text_field.tag_ranges("sel"):
-        cur_cursor = app.text_field.index("insert")
-        line_start = app.text_field.index("insert-1c linestart")
-        app.text_field.tag_add('nadpis', line_start, cur_cursor)
-        app.text_field.tag_config("nadpis", font=TITLE_FONT)
+    Returns
+    -------
+    dict
+        Tag -> list of (start line, start column, end line, end column).
+
+    """
+    formatting = {}
+    for tag in FORMAT_TAGS:
+        indexes = [
+            tuple(map(int, str(index).split(".")))
+            for index in text_field.tag_ranges(tag)
+        ]
+        formatting[tag] = [
+            start + end for start, end in zip(indexes[::2], indexes[1::2])
+        ]
+    return formatting
+
+
+def apply_formatting(text_field, formatting):
+    """Puts the formatting back, with one `tag_add` call per tag."""
+    for tag, ranges in formatting.items():
+        if ranges == []:
+            continue
+        indexes = []
+        for start_line, start_column, end_line, end_column in ranges:
+            indexes.append(str(start_line) + "." + str(start_column))
+            indexes.append(str(end_line) + "." + str(end_column))
+        text_field.tag_add(tag, *indexes)
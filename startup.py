@@ -0,0 +1,95 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+ORIGIN = time.perf_counter()  # About when the interpreter started
+MIN_IMPORT = 0.001  # Seconds under which an import is left out
+
+enabled = False
+events = []  # (start, duration, depth, label), seconds since ORIGIN
+depth = 0
+
+
+@contextmanager
+def phase(label):
+    """Records how long a step of the startup takes, when enabled."""
+    global depth
+    if not enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    depth += 1
+    try:
+        yield
+    finally:
+        depth -= 1
+        events.append(
+            (start - ORIGIN, time.perf_counter() - start, depth, label)
+        )
+
+
+class TimedLoader:
+    """Runs the loader of a module inside of a `phase`."""
+
+    def __init__(self, loader, name):
+        self.loader = loader
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with phase("import " + self.name):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class ImportTimer:
+    """Finder that times the modules imported after it is installed."""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if hasattr(spec.loader, "exec_module"):
+            spec.loader = TimedLoader(spec.loader, name)
+        return spec
+
+
+def enable():
+    """Starts recording the phases and the imports."""
+    global enabled
+    enabled = True
+    sys.meta_path.insert(0, ImportTimer())
+
+
+def report(file=None):
+    """Prints the timeline of the startup and stops recording."""
+    global enabled
+    enabled = False
+    sys.meta_path[:] = [
+        finder for finder in sys.meta_path
+        if not isinstance(finder, ImportTimer)
+    ]
+
+    file = sys.stderr if file is None else file
+    print("{:>9} {:>9}  {}".format("start ms", "took ms", "step"), file=file)
+    for start, duration, level, label in sorted(events):
+        if label.startswith("import ") and duration < MIN_IMPORT:
+            continue
+        print("{:>9.1f} {:>9.1f}  {}{}".format(
+            start * 1000, duration * 1000, "  " * level, label
+        ), file=file)
+    print("{:>9.1f} {:>9}  ready".format(
+        (time.perf_counter() - ORIGIN) * 1000, ""
+    ), file=file)
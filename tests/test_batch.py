@@ -0,0 +1,118 @@
+import argparse
+
+import pytest
+
+import batch
+
+
+def options(**values):
+    defaults = {
+        "jobs": 1, "newline": "keep", "strip_trailing": False,
+        "final_newline": False, "expand_tabs": None, "replace": None,
+        "regex": False, "ignore_case": False, "dry_run": False,
+    }
+    defaults.update(values)
+    return argparse.Namespace(**defaults)
+
+
+@pytest.mark.parametrize("values, text, expected", [
+    ({"strip_trailing": True}, "a  \nb\t\nc", "a\nb\nc"),
+    ({"final_newline": True}, "a\nb", "a\nb\n"),
+    ({"final_newline": True}, "", ""),
+    ({"expand_tabs": 4}, "a\tb\n\tc", "a   b\n    c"),
+    ({"replace": ["colour", "color"]}, "Colour colour", "Colour color"),
+    ({"replace": ["colour", "color"], "ignore_case": True},
+     "Colour colour", "color color"),
+    ({"replace": [r"(\d+)px", r"\1em"], "regex": True},
+     "4px 10px", "4em 10em"),
+    ({"replace": [".", r"\n"]}, "a.b", r"a\nb"),  # Literal replacement
+])
+def test_transform(values, text, expected):
+    assert batch.make_transform(options(**values))(text) == expected
+
+
+def test_find_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.txt", "b.py", "sub/c.txt"):
+        (tmp_path / name).write_text("")
+    single = tmp_path / "b.py"
+
+    found = list(batch.find_files([str(tmp_path), str(single)], "*.txt"))
+    assert sorted(found) == sorted([
+        str(tmp_path / "a.txt"), str(tmp_path / "sub" / "c.txt"), str(single)
+    ])
+
+
+def test_split():
+    assert batch.split(list(range(5)), 2) == [[0, 1, 2], [3, 4]]
+    assert batch.split([1], 8) == [[1]]
+    assert batch.split([], 4) == []
+
+
+def test_process_files(tmp_path):
+    changed = tmp_path / "Untitled-notes.txt"  # A file, not a scratch one
+    changed.write_bytes(b"x  \r\ny")
+    same = tmp_path / "same.txt"
+    same.write_text("ok\n")
+    binary = tmp_path / "binary.txt"
+    binary.write_bytes(b"\xff\xfe")
+
+    results = batch.process_files(
+        [str(changed), str(same), str(binary)],
+        options(strip_trailing=True, final_newline=True)
+    )
+    assert results[0] == (str(changed), True, None)
+    assert results[1] == (str(same), False, None)
+    assert results[2][1] is False and results[2][2] is not None
+    assert changed.read_bytes() == b"x\r\ny\r\n"
+
+
+def test_newline_and_dry_run(tmp_path):
+    path = tmp_path / "lf.txt"
+    path.write_bytes(b"a\nb\n")
+
+    results = batch.process_files(
+        [str(path)], options(newline="crlf", dry_run=True)
+    )
+    assert results == [(str(path), True, None)]
+    assert path.read_bytes() == b"a\nb\n"
+
+    batch.process_files([str(path)], options(newline="crlf"))
+    assert path.read_bytes() == b"a\r\nb\r\n"
+
+
+def test_run_in_processes(tmp_path):
+    filenames = []
+    for number in range(6):
+        path = tmp_path / (str(number) + ".txt")
+        path.write_text("line " + str(number) + "   ")
+        filenames.append(str(path))
+
+    results = batch.run(filenames, options(jobs=2, strip_trailing=True))
+    assert [result[0] for result in results] == filenames
+    assert all(changed for _, changed, _ in results)
+    assert (tmp_path / "3.txt").read_text() == "line 3"
+
+
+@pytest.mark.parametrize("replace", [["(", "x"], ["(a)", r"\2"]])
+def test_invalid_replace_is_refused(tmp_path, monkeypatch, replace):
+    path = tmp_path / "a.txt"
+    path.write_text("a\n")
+    monkeypatch.setattr(
+        "sys.argv", ["batch.py", "--regex", "--replace"] + replace
+        + [str(path)]
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        batch.main()
+    assert exit_info.value.code == 2
+    assert path.read_text() == "a\n"
+
+
+def test_invalid_replacement_fails_the_file(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_text("a\n")
+    results = batch.process_files(
+        [str(path)], options(replace=["(a)", r"\2"], regex=True)
+    )
+    assert results[0][1] is False and results[0][2] is not None
+    assert path.read_text() == "a\n"
@@ -0,0 +1,80 @@
+import sys
+
+from BufferCache import BufferCache
+
+
+class Sized:
+    """A document that takes `size` bytes."""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __sizeof__(self):
+        return self.size
+
+
+def size_of(size):
+    """Returns what a `Sized` takes in the cache, with the GC header."""
+    return sys.getsizeof(Sized(size))
+
+
+def cache_with(budget):
+    written = []
+    cache = BufferCache(
+        lambda key, document: written.append(key), budget
+    )
+    return cache, written
+
+
+def test_least_recently_used_is_written_back():
+    cache, written = cache_with(3 * size_of(100))
+    for key in ("a", "b", "c"):
+        cache.put(key, Sized(100))
+    cache.get("a")  # Now "b" is the oldest
+
+    cache.put("d", Sized(100))
+    assert written == ["b"]
+    assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+    assert cache.size == 3 * size_of(100)
+
+
+def test_peek_keeps_the_order():
+    cache, written = cache_with(2 * size_of(100))
+    cache.put("a", Sized(100))
+    cache.put("b", Sized(100))
+    assert cache.peek("a").size == 100
+
+    cache.put("c", Sized(100))
+    assert written == ["a"]
+
+
+def test_the_last_buffer_is_kept_over_the_budget():
+    cache, written = cache_with(size_of(100))
+    cache.put("a", Sized(50))
+    cache.put("b", Sized(500))
+    assert written == ["a"]
+    assert "b" in cache and len(cache) == 1
+
+
+def test_the_size_is_the_one_it_was_put_with():
+    cache, written = cache_with(1000)
+    document = Sized(100)
+    cache.put("a", document)
+    document.size = 5000  # Grew while loading
+    assert cache.size == size_of(100)
+    assert cache.pop("a") is document
+    assert cache.size == 0
+    assert cache.pop("a") is None
+    assert written == []
+
+
+def test_flush_writes_back_everything():
+    cache, written = cache_with(1000)
+    cache.put("a", Sized(10))
+    cache.put("b", Sized(10))
+    cache.put("a", Sized(20))  # Put again, now the newest
+    assert cache.size == size_of(10) + size_of(20)
+
+    cache.flush()
+    assert written == ["b", "a"]
+    assert len(cache) == 0 and cache.size == 0
@@ -0,0 +1,71 @@
+from Dictionary import Dictionary
+from SpellChecker import misspelled
+
+
+def dictionary_of(tmp_path, words):
+    path = tmp_path / "words.txt"
+    path.write_text("\n".join(words) + "\n", encoding="utf-8")
+    return Dictionary([str(tmp_path / "missing.txt"), str(path)])
+
+
+def test_lookup(tmp_path):
+    dictionary = dictionary_of(tmp_path, ["cat", "Hat", "zebra", "", "apple"])
+    assert dictionary.available
+    for word in ("cat", "hat", "HAT", "zebra", "apple"):
+        assert word in dictionary
+    for word in ("", "ca", "cats", "bat", "zebras"):
+        assert word not in dictionary
+    assert [dictionary.word_at(number) for number in range(4)] == [
+        "apple", "cat", "hat", "zebra"
+    ]
+
+
+def test_the_filter_lets_every_word_through(tmp_path):
+    words = ["word" + str(number) for number in range(1000)]
+    dictionary = dictionary_of(tmp_path, words)
+    dictionary.load()
+    for word in words:
+        assert all(
+            dictionary.bits[bit >> 3] & (1 << (bit & 7))
+            for bit in dictionary.bit_positions(word)
+        )
+
+
+def test_the_filter_rejects_most_unknown_words(tmp_path):
+    dictionary = dictionary_of(
+        tmp_path, ["word" + str(number) for number in range(1000)]
+    )
+    dictionary.load()
+    passed = 0
+    for number in range(2000):
+        bits = dictionary.bit_positions("other" + str(number))
+        if all(dictionary.bits[bit >> 3] & (1 << (bit & 7)) for bit in bits):
+            passed += 1
+    assert passed < 100  # About 1% is expected
+
+
+def test_words_past_the_filter_are_searched(tmp_path):
+    dictionary = dictionary_of(tmp_path, ["cat", "dog"])
+    dictionary.load()
+    dictionary.bits = bytearray(b"\xff" * len(dictionary.bits))
+    assert "cat" in dictionary
+    assert "cow" not in dictionary
+
+
+def test_no_word_list(tmp_path):
+    dictionary = Dictionary([str(tmp_path / "missing.txt")])
+    assert not dictionary.available
+    assert "cat" not in dictionary
+    assert misspelled(dictionary, [(1, "wrnog")]) == []
+
+
+def test_misspelled(tmp_path):
+    dictionary = dictionary_of(tmp_path, ["the", "cat", "sat", "it"])
+    lines = [
+        (1, "The cat sat on the mat."),
+        (2, "NASA camelCase it's cat's a"),
+        (3, "catt 42 dog_"),
+    ]
+    assert misspelled(dictionary, lines) == [
+        (1, 12, 14), (1, 19, 22), (3, 0, 4), (3, 8, 11)
+    ]
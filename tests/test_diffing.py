@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import diffing
+from diffing import common_prefix, common_suffix, diff_edits
+
+
+def apply_edits(text, edits):
+    """Applies the edits from the last one, like TabManager.reload_file."""
+    for start, end, inserted in reversed(edits):
+        text = text[:start] + inserted + text[end:]
+    return text
+
+
+def test_common_prefix_and_suffix():
+    assert common_prefix("abcdef", "abcxef") == 3
+    assert common_prefix("", "abc") == 0
+    assert common_prefix("same", "same") == 4
+    assert common_suffix("abcdef", "abcxef", 6) == 2
+    assert common_suffix("aaaa", "aa", 1) == 1  # Limited
+
+
+def test_same_text_has_no_edits():
+    assert diff_edits("one\ntwo\n", "one\ntwo\n") == []
+
+
+@pytest.mark.parametrize("old, new", [
+    ("", "new text\n"),
+    ("old text\n", ""),
+    ("one\ntwo\nthree\n", "one\n2\nthree\n"),
+    ("one\ntwo\nthree\n", "zero\none\ntwo\nthree\nfour\n"),
+    ("a\nb\nc\nd\n", "a\nc\nd\nb\n"),
+    ("no newline", "no newline at the end"),
+])
+def test_edits_turn_old_into_new(old, new):
+    edits = diff_edits(old, new)
+    assert apply_edits(old, edits) == new
+
+    ends = [0]
+    for start, end, _ in edits:
+        assert ends[-1] <= start <= end <= len(old)  # In order
+        ends.append(end)
+
+
+def test_only_the_changed_lines_are_replaced():
+    old = "".join("line " + str(number) + "\n" for number in range(100))
+    new = old.replace("line 50\n", "line fifty\n")
+    edits = diff_edits(old, new)
+    assert len(edits) == 1
+    start, end, inserted = edits[0]
+    assert end - start < 10
+    assert "fifty" in inserted
+
+
+def test_long_changes_are_one_edit(monkeypatch):
+    monkeypatch.setattr(diffing, "MAX_DIFF_LINES", 10)
+    old = "".join(str(number) + "\n" for number in range(50))
+    new = "".join(str(number * 2) + "\n" for number in range(50))
+    edits = diff_edits(old, new)
+    assert len(edits) == 1
+    assert apply_edits(old, edits) == new
+
+
+def test_random_changes():
+    rng = random.Random(7)
+    for _ in range(300):
+        lines = [rng.choice(["a", "b", "c", ""]) + "\n" for _ in range(20)]
+        old = "".join(lines)
+        for _ in range(rng.randint(1, 5)):
+            position = rng.randrange(len(lines))
+            choice = rng.random()
+            if choice < 0.3:
+                del lines[position]
+            elif choice < 0.6:
+                lines.insert(position, rng.choice("xyz") + "\n")
+            else:
+                lines[position] = rng.choice("abxy") + "\n"
+            if lines == []:
+                lines = ["\n"]
+        new = "".join(lines)
+        if rng.random() < 0.2:
+            new = new.rstrip("\n")
+        assert apply_edits(old, diff_edits(old, new)) == new
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from Document import Document
+from EditorText import Edit
+
+
+def line_column(text, offset):
+    """Tk's line and column of an offset, computed the slow way."""
+    line = text.count("\n", 0, offset) + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1)
+
+
+@pytest.fixture
+def small_pieces(monkeypatch):
+    """Makes every piece tiny, so the treap has many nodes."""
+    monkeypatch.setattr(Document, "PIECE_SIZE", 4)
+
+
+def test_empty_document():
+    document = Document()
+    assert len(document) == 0
+    assert document.get_text() == ""
+    assert document.line_count == 1
+    assert document.line_column(0) == (1, 0)
+    assert document.offset_of(3, 5) == 0
+    assert document.is_blank()
+
+
+def test_insert_and_delete(small_pieces):
+    document = Document("hello world")
+    document.insert(5, ",")
+    document.insert(len(document), "!")
+    document.insert(0, ">> ")
+    assert document.get_text() == ">> hello, world!"
+
+    document.delete(0, 3)
+    document.delete(5, 1)
+    assert document.get_text() == "hello world!"
+    document.delete(5, 0)
+    assert document.get_text() == "hello world!"
+
+
+def test_line_mapping(small_pieces):
+    text = "first\n\nthird line\nlast"
+    document = Document(text)
+    assert document.line_count == 4
+    for offset in range(len(text) + 1):
+        line, column = line_column(text, offset)
+        assert document.line_column(offset) == (line, column)
+        assert document.offset_of(line, column) == offset
+
+
+def test_offsets_past_the_end_are_clamped():
+    document = Document("ab\ncd")
+    assert document.offset_of(2, 10) == len(document)
+    assert document.offset_of(9) == len(document)
+    assert document.line_column(99) == (2, 2)
+
+
+def test_get_text_range(small_pieces):
+    text = "0123456789\nabcdefghij\n"
+    document = Document(text)
+    for start in range(0, len(text), 3):
+        for end in range(start, len(text) + 1, 5):
+            assert document.get_text(start, end) == text[start:end]
+
+
+def test_apply_counts_versions():
+    document = Document("one\ntwo")
+    document.apply(Edit("2.0", "two", "2"))
+    document.apply(Edit("1.3", "", " 1"))
+    assert document.get_text() == "one 1\n2"
+    assert document.version == 2
+    assert document.modified
+
+    document.mark_saved()
+    assert not document.modified
+
+
+def test_snapshot_is_not_changed_by_edits():
+    document = Document("abc")
+    snapshot = document.snapshot()
+    document.insert(1, "x")
+    document.delete(0, 1)
+    assert snapshot.get_text() == "abc"
+    assert document.get_text() == "xbc"
+
+
+def test_from_file_loads_lazily(tmp_path):
+    path = tmp_path / "crlf.txt"
+    text = "".join("line " + str(number) + "\r\n" for number in range(500))
+    path.write_bytes(text.encode())
+
+    document = Document.from_file(str(path))
+    assert not document.loaded
+    assert document.read_more(10) != ""
+    assert document.get_text() == text.replace("\r\n", "\n")
+    assert document.loaded
+    assert document.newline == "\r\n"
+
+
+def test_random_edits_match_a_string(small_pieces):
+    rng = random.Random(2)
+    text = ""
+    document = Document()
+    for _ in range(2000):
+        offset = rng.randint(0, len(text))
+        if text and rng.random() < 0.4:
+            length = rng.randint(1, 10)
+            text = text[:offset] + text[offset + length:]
+            document.delete(offset, length)
+        else:
+            inserted = "".join(rng.choice("ab\n ") for _ in range(
+                rng.randint(1, 12)
+            ))
+            text = text[:offset] + inserted + text[offset:]
+            document.insert(offset, inserted)
+
+        assert len(document) == len(text)
+        probe = rng.randint(0, len(text))
+        line, column = line_column(text, probe)
+        assert document.line_column(probe) == (line, column)
+        assert document.offset_of(line, column) == probe
+
+    assert document.get_text() == text
+    assert document.line_count == text.count("\n") + 1
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from Engine import Engine
+from FormatStore import FormatStore
+from ScratchStore import ScratchStore
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return Engine(
+        ScratchStore(str(tmp_path / "scratch.sqlite3")),
+        FormatStore(str(tmp_path / "formatting.sqlite3"))
+    )
+
+
+def test_untitled_documents(engine):
+    first = engine.new()
+    second = engine.new()
+    assert first != second
+    assert engine.is_untitled(first)
+    assert engine.is_empty_untitled(first)
+
+    engine.replace_text(first, "draft")
+    engine.save(first)
+    assert engine.scratch_store.load(first) == "draft"
+    assert not engine.open(first).modified
+
+
+def test_untitled_is_not_decided_by_the_name(engine, tmp_path):
+    path = tmp_path / "Untitled-notes.txt"
+    path.write_text("on disk\n")
+    assert not engine.is_untitled(str(path))
+    assert not engine.is_untitled("Untitled-notes.txt")
+    assert engine.open(str(path)).get_text() == "on disk\n"
+
+    untitled = engine.new()
+    assert engine.key(untitled) == untitled
+    assert engine.key(str(path)) == os.path.normcase(
+        os.path.realpath(str(path))
+    )
+
+
+def test_adopted_names_are_not_handed_out_again(engine):
+    engine.adopt("Untitled-4.txt")
+    assert engine.is_untitled("Untitled-4.txt")
+    assert engine.new() == "Untitled-5.txt"
+
+
+def test_close_throws_empty_untitled_documents_away(engine):
+    filename = engine.new()
+    engine.save(filename)  # Not modified, nothing is written
+    engine.replace_text(filename, "text")
+    engine.save(filename)
+    engine.replace_text(filename, "  \n")
+    engine.close(filename)
+
+    assert engine.scratch_store.load(filename) is None
+    assert filename not in engine.documents
+    assert not engine.is_untitled(filename)
+
+
+def test_save_keeps_the_line_endings(engine, tmp_path):
+    path = tmp_path / "crlf.txt"
+    path.write_bytes(b"one\r\ntwo\r\n")
+    filename = str(path)
+
+    assert engine.transform(filename, str.upper)
+    assert not engine.transform(filename, str.upper)  # Already upper
+    engine.close(filename)
+    assert path.read_bytes() == b"ONE\r\nTWO\r\n"
+
+
+def test_set_newline(engine, tmp_path):
+    path = tmp_path / "lf.txt"
+    path.write_bytes(b"a\nb\n")
+    filename = str(path)
+
+    engine.set_newline(filename, "\r\n")
+    assert engine.open(filename).modified
+    engine.close(filename)
+    assert path.read_bytes() == b"a\r\nb\r\n"
+
+
+def test_close_without_saving(engine, tmp_path):
+    path = tmp_path / "keep.txt"
+    path.write_text("keep\n")
+    engine.replace_text(str(path), "changed\n")
+    engine.close(str(path), save=False)
+    assert path.read_text() == "keep\n"
+
+
+def test_remove(engine, tmp_path):
+    path = tmp_path / "gone.txt"
+    path.write_text("x")
+    engine.open(str(path))
+    engine.remove(str(path))
+    assert not os.path.exists(path)
+    assert str(path) not in engine.documents
+
+    filename = engine.new()
+    engine.replace_text(filename, "x")
+    engine.save(filename)
+    engine.remove(filename)
+    assert engine.scratch_store.load(filename) is None
+
+
+def test_carry_over():
+    from Document import Document
+    old = Document("old")
+    old.newline = "\r\n"
+    old.version = 3
+    old.saved_version = 2
+    old.formatting = {"color": [(1, 0, 1, 3)]}
+
+    new = Engine.carry_over(old, Document("new"))
+    assert new.newline == "\r\n"
+    assert new.version == 4
+    assert new.saved_version == 2
+    assert new.formatting == {}
@@ -0,0 +1,85 @@
+import random
+
+from Engine import Engine
+from FindBar import FindBar
+from FormatStore import FormatStore, decode, encode, merge_ranges
+from ScratchStore import ScratchStore
+from search import compile_pattern
+
+
+def test_merge_ranges():
+    ranges = [(2, 0, 2, 4), (1, 0, 1, 3), (1, 2, 1, 8), (2, 4, 3, 1)]
+    assert merge_ranges(ranges) == [(1, 0, 1, 8), (2, 0, 3, 1)]
+    assert merge_ranges([]) == []
+
+
+def test_encode_and_decode():
+    formatting = {
+        "color": [(1, 4, 1, 9), (1, 12, 3, 2), (3, 5, 3, 6)],
+        "nadpis": [(10, 0, 10, 25)],
+        "empty": [],
+    }
+    assert decode(encode(formatting)) == formatting
+
+
+def test_encode_merges_the_ranges():
+    formatting = {"color": [(1, 5, 1, 9), (1, 0, 1, 6)]}
+    assert decode(encode(formatting)) == {"color": [(1, 0, 1, 9)]}
+
+
+def test_random_ranges():
+    rng = random.Random(3)
+    for _ in range(200):
+        ranges = []
+        for _ in range(rng.randint(0, 30)):
+            start_line = rng.randint(1, 40)
+            start_column = rng.randint(0, 80)
+            end_line = start_line + rng.choice([0, 0, 0, 1, 5])
+            end_column = rng.randint(0, 80)
+            if end_line == start_line:
+                end_column = start_column + rng.randint(1, 20)
+            ranges.append((start_line, start_column, end_line, end_column))
+        formatting = {"color": ranges}
+        assert decode(encode(formatting)) == {
+            "color": merge_ranges(ranges)
+        }
+
+
+def test_store(tmp_path):
+    store = FormatStore(str(tmp_path / "formatting.sqlite3"))
+    formatting = {"color": [(1, 0, 1, 5)], "nadpis": []}
+    store.write("/notes.txt", formatting, 100)
+    assert store.load("/notes.txt", 100) == {
+        "color": [(1, 0, 1, 5)], "nadpis": []
+    }
+    assert store.load("/notes.txt", 99) is None  # Changed by another program
+    assert store.load("/other.txt", 100) is None
+
+    store.write("/notes.txt", {"color": []}, 100)  # No formatting left
+    assert store.load("/notes.txt", 100) is None
+
+
+def test_formatting_survives_replace_all(tmp_path):
+    path = str(tmp_path / "notes.txt")
+    with open(path, "w") as f:
+        f.write("one colour\ntwo colour three\n")
+    engine = Engine(
+        ScratchStore(str(tmp_path / "scratch.sqlite3")),
+        FormatStore(str(tmp_path / "formatting.sqlite3"))
+    )
+    document = engine.open(path)
+    document.formatting = {
+        "color": [(1, 4, 1, 10), (2, 6, 2, 12)],
+        "nadpis": [(2, 0, 2, 16)],
+    }
+
+    new_document, edits = FindBar.replaced_document(
+        document.snapshot(), compile_pattern("colour"), "color", False
+    )
+    engine.documents[path] = Engine.carry_over(document, new_document)
+    engine.save(path)
+
+    assert engine.format_store.load(engine.key(path), 26) == {
+        "color": [(1, 4, 1, 9), (2, 4, 2, 11)],
+        "nadpis": [(2, 0, 2, 15)],
+    }
@@ -0,0 +1,127 @@
+from EditorText import Edit
+from Highlighter import Highlighter
+from Lexer import CLexer, PythonLexer, lexer_for
+
+
+class FakeTextField:
+    """Holds lines of text and the syntax tags of every line."""
+
+    def __init__(self, text):
+        self.lines = text.split("\n")
+        self.tags = {}  # line -> set of (start column, end column, tag)
+        self.listeners = []
+        self.scroll_listeners = []
+
+    def tag_configure(self, tag, **options):
+        pass
+
+    def after_idle(self, callback):
+        return "job"
+
+    def after(self, delay, callback):
+        return "job"
+
+    def winfo_height(self):
+        return 0
+
+    def index(self, index):
+        if index == "@0,0":
+            return "1.0"
+        return str(len(self.lines)) + ".0"  # The whole text is in view
+
+    def get(self, start, end):
+        return self.lines[int(start.split(".")[0]) - 1]
+
+    def tag_remove(self, tag, start, end):
+        line = int(start.split(".")[0])
+        self.tags[line] = {
+            token for token in self.tags.get(line, set())
+            if "syntax_" + token[2] != tag
+        }
+
+    def tag_add(self, tag, *indexes):
+        for start, end in zip(indexes[::2], indexes[1::2]):
+            line, start_column = map(int, start.split("."))
+            end_column = int(end.split(".")[1])
+            self.tags.setdefault(line, set()).add(
+                (start_column, end_column, tag[len("syntax_"):])
+            )
+
+    def replace_lines(self, line, count, new_lines):
+        """Replaces `count` lines from `line` and tells the listeners."""
+        removed = "\n".join(self.lines[line - 1:line - 1 + count])
+        self.lines[line - 1:line - 1 + count] = new_lines
+        edit = Edit(str(line) + ".0", removed, "\n".join(new_lines))
+        for listener in self.listeners:
+            listener(edit)
+
+
+def string_lines(text_field):
+    """Returns the lines that are a string from start to end."""
+    return [
+        line for line, tokens in sorted(text_field.tags.items())
+        if (0, len(text_field.lines[line - 1]), "string") in tokens
+    ]
+
+
+def test_python_long_strings_span_lines():
+    lexer = PythonLexer()
+    tokens, state = lexer.tokenize('x = """start', lexer.INITIAL)
+    assert tokens == [(4, 7, "string"), (7, 12, "string")]
+    assert state == "long_string"
+
+    tokens, state = lexer.tokenize("if in the middle", state)
+    assert tokens == [(0, 16, "string")]
+    assert state == "long_string"
+
+    tokens, state = lexer.tokenize('end""" if x', state)
+    assert tokens == [(0, 6, "string"), (7, 9, "keyword")]
+    assert state == "root"
+
+
+def test_c_block_comments_span_lines():
+    lexer = CLexer()
+    tokens, state = lexer.tokenize("int x; /* a", lexer.INITIAL)
+    assert tokens == [(0, 3, "keyword"), (7, 11, "comment")]
+    assert state == "block_comment"
+
+    tokens, state = lexer.tokenize("return */ return", state)
+    assert tokens == [(0, 9, "comment"), (10, 16, "keyword")]
+    assert state == "root"
+
+    tokens, state = lexer.tokenize("/* one line */ // rest", state)
+    assert tokens == [(0, 14, "comment"), (15, 22, "comment")]
+    assert state == "root"
+
+
+def test_lexer_for():
+    assert isinstance(lexer_for("a/b.PY"), PythonLexer)
+    assert isinstance(lexer_for("main.c"), CLexer)
+    assert lexer_for("notes.txt") is None
+
+
+def test_highlighter_carries_the_state_across_lines():
+    text_field = FakeTextField('a = 1\ns = """\nif\n"""\nif x')
+    highlighter = Highlighter(text_field)
+    highlighter.reset(PythonLexer())
+    highlighter.refresh()
+
+    assert string_lines(text_field) == [3, 4]
+    assert (0, 2, "keyword") in text_field.tags[5]
+    assert highlighter.states == [
+        "root", "root", "long_string", "long_string", "root", "root"
+    ]
+
+
+def test_highlighter_lexes_again_after_an_edit():
+    text_field = FakeTextField('a = 1\ns = """\nif\n"""\nif x')
+    highlighter = Highlighter(text_field)
+    highlighter.reset(PythonLexer())
+    highlighter.refresh()
+
+    # Without the opening quotes, the closing ones start a string
+    text_field.replace_lines(2, 1, ["s = 2"])
+    highlighter.refresh()
+    assert (0, 2, "keyword") in text_field.tags[3]
+    assert string_lines(text_field) == [4, 5]
+    assert highlighter.states[4:] == ["long_string", "long_string"]
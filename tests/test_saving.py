@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from Engine import Engine
+from LargeDocument import LargeDocument
+from saving import atomic_write
+
+
+def save_edited(path, data):
+    """Writes the bytes, edits the first character and saves the file."""
+    with open(path, "wb") as f:
+        f.write(data)
+    engine = Engine()
+    text = "".join(engine.open(path).iter_chunks())
+    engine.replace_text(path, "X" + text[1:])
+    engine.save(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"a\r\nb\r\n", b"X\r\nb\r\n"),
+    (b"a\nb\n", b"X\nb\n"),
+    (b"a\r\nb", b"X\r\nb"),  # No newline at the end
+    (b"a\nb", b"X\nb"),
+    (b"abc", b"Xbc"),
+])
+def test_line_endings_are_kept(tmp_path, data, expected):
+    assert save_edited(str(tmp_path / "a.txt"), data) == expected
+
+
+def test_mixed_line_endings_become_the_platforms(tmp_path):
+    saved = save_edited(str(tmp_path / "a.txt"), b"a\r\nb\nc")
+    assert saved == os.linesep.join(["X", "b", "c"]).encode()
+
+
+@pytest.mark.parametrize("data", [b"a\nb\n" * 4, b"a\r\nb\r\n" * 4])
+def test_large_documents_keep_their_line_endings(
+    tmp_path, monkeypatch, data
+):
+    monkeypatch.setattr(LargeDocument, "MIN_SIZE", 1)
+    monkeypatch.setattr(LargeDocument, "BLOCK_SIZE", 4)
+    path = str(tmp_path / "large.txt")
+    with open(path, "wb") as f:
+        f.write(data)
+
+    engine = Engine()
+    document = engine.open(path)
+    assert isinstance(document, LargeDocument)
+    assert document.newline == ("\r\n" if b"\r" in data else "\n")
+    document.overlays[0] = "X" + document.original_text(0)[1:]
+    document.version += 1
+    engine.save(path)
+    engine.close(path)
+
+    with open(path, "rb") as f:
+        assert f.read() == data.replace(b"a", b"X", 1)
+
+
+def test_atomic_write_keeps_the_mode(tmp_path):
+    path = str(tmp_path / "a.txt")
+    with open(path, "w") as f:
+        f.write("old")
+    os.chmod(path, 0o640)
+
+    atomic_write(path, ["new", " text\n"], "\n")
+    with open(path) as f:
+        assert f.read() == "new text\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(str(tmp_path)) == ["a.txt"]  # No temporary file left
@@ -0,0 +1,94 @@
+import re
+
+import pytest
+
+from search import (
+    compile_pattern, find_all, find_lines, match_at_or_after,
+    matches_between, move_ranges, replace_all, replace_in_chunks,
+    replace_with_edits
+)
+
+
+def test_compile_pattern():
+    assert compile_pattern("a.b").search("axb") is None
+    assert compile_pattern("a.b", regex=True).search("axb")
+    assert compile_pattern("ab", case=False).search("AB")
+    with pytest.raises(re.error):
+        compile_pattern("(", regex=True)
+
+
+def test_find_all_across_chunks():
+    pattern = compile_pattern("needle")
+    matches = find_all(["hay nee", "dle hay ", "needle"], pattern)
+    assert list(matches.starts) == [4, 15]
+    assert list(matches.ends) == [10, 21]
+    assert list(matches.chunk_starts) == [0, 7, 15]
+
+
+def test_find_all_leaves_out_empty_matches():
+    matches = find_all(["ab"], compile_pattern("x*", regex=True))
+    assert len(matches.starts) == 0
+
+
+def test_match_numbers():
+    matches = find_all(["a.a.a"], compile_pattern("a"))
+    assert match_at_or_after(matches, 1) == 1
+    assert match_at_or_after(matches, 5) == 0  # Wraps around
+    assert list(matches_between(matches, 1, 4)) == [1]
+    assert list(matches_between(matches, 0, 5)) == [0, 1, 2]
+    empty = find_all([""], compile_pattern("a"))
+    assert match_at_or_after(empty, 0) is None
+
+
+def test_replace_all():
+    pattern = compile_pattern(r"(\w+)@", regex=True)
+    assert replace_all("a@ b@", pattern, r"<\1>", regex=True) == (
+        "<a> <b>", 2
+    )
+    literal = compile_pattern("@")
+    assert replace_all("a@b", literal, r"\1") == (r"a\1b", 1)
+
+
+def test_replace_with_edits():
+    pattern = compile_pattern("ab")
+    text, edits = replace_with_edits("xab ab", pattern, "c")
+    assert text == "xc c"
+    assert edits == [(1, "ab", "c"), (3, "ab", "c")]
+
+    # Every offset is right once the edits before it are made
+    old = "xab ab"
+    for offset, removed, inserted in edits:
+        assert old[offset:offset + len(removed)] == removed
+        old = old[:offset] + inserted + old[offset + len(removed):]
+    assert old == text
+
+
+def test_replace_in_chunks_leaves_matches_across_chunks():
+    pattern = compile_pattern("ab")
+    changed, count = replace_in_chunks(["ab a", "b ab", "cd"], pattern, "X")
+    assert changed == {0: "X a", 1: "b X"}
+    assert count == 2
+
+
+def test_move_ranges():
+    # "one two three" -> "one 2 three"
+    edits = replace_with_edits(
+        "one two three", compile_pattern("two"), "2"
+    )[1]
+    assert move_ranges([(0, 3)], edits) == [(0, 3)]  # Before
+    assert move_ranges([(8, 13)], edits) == [(6, 11)]  # After
+    assert move_ranges([(0, 13)], edits) == [(0, 11)]  # Around
+    assert move_ranges([(5, 9)], edits) == [(4, 7)]  # From inside
+    assert move_ranges([(4, 7)], edits) == [(4, 5)]  # The match itself
+
+    removed = replace_with_edits("a two b", compile_pattern("two"), "")[1]
+    assert move_ranges([(3, 5)], removed) == []
+
+
+def test_find_lines():
+    text = "one\ntwo two\n\nthree two"
+    hits = find_lines(text, compile_pattern("two"))
+    assert hits == [
+        (2, 0, 3, "two two"), (2, 4, 3, "two two"), (4, 6, 3, "three two")
+    ]
+    assert len(find_lines(text, compile_pattern("two"), limit=2)) == 2
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from SearchPanel import SearchPanel
+from search import compile_pattern, find_lines
+
+
+def search_parts(chunks, pattern, max_hits=1000, part_size=8):
+    with ThreadPoolExecutor(1) as pool:
+        panel = SimpleNamespace(
+            pool=pool, MAX_HITS=max_hits, PART_SIZE=part_size
+        )
+        future = SearchPanel.search_parts(panel, chunks, pattern)
+        return future.result(timeout=5)
+
+
+def test_parts_give_the_hits_of_the_whole_text():
+    chunks = ["one two\n", "two\nthree\n", "four two\n", "two"]
+    pattern = compile_pattern("two")
+    assert search_parts(chunks, pattern) == find_lines(
+        "".join(chunks), pattern
+    )
+
+
+def test_parts_stop_at_the_hit_limit():
+    chunks = ["a a\n"] * 10
+    hits = search_parts(chunks, compile_pattern("a"), max_hits=5)
+    assert len(hits) == 5
+    assert hits[-1][0] == 3  # The line of the fifth hit
@@ -0,0 +1,80 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from TabRegistry import TabRegistry
+
+
+def file_ref(name):
+    return {"file": SimpleNamespace(name=name)}
+
+
+def test_order_and_neighbours():
+    registry = TabRegistry()
+    first, second, third = (file_ref(name) for name in "abc")
+    for reference in (first, second, third):
+        registry.add(reference)
+    assert list(registry) == [first, second, third]
+    assert registry.left_of(second) is first
+    assert registry.right_of(second) is third
+    assert registry.left_of(first) is None
+
+    registry.remove(second)
+    assert list(registry) == [first, third]
+    assert registry.right_of(first) is third
+    assert second not in registry
+    assert registry.get(second["id"]) is None
+    assert len(registry) == 2
+
+
+def test_paths_are_found_however_they_are_written(tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text("")
+    registry = TabRegistry()
+    reference = file_ref(str(path))
+    registry.add(reference)
+
+    monkeypatch.chdir(tmp_path)
+    assert registry.find("notes.txt") is reference
+    assert registry.find(os.path.join("..", tmp_path.name, "notes.txt")) \
+        is reference
+    assert registry.find(str(tmp_path / "other.txt")) is None
+
+
+def test_symlinks_are_found_by_their_target(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("")
+    link = tmp_path / "link.txt"
+    try:
+        os.symlink(str(path), str(link))
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks are not supported here")
+
+    registry = TabRegistry()
+    reference = file_ref(str(link))
+    registry.add(reference)
+    assert registry.find(str(path)) is reference
+
+
+def test_untitled_documents_are_found_by_name(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = TabRegistry(lambda filename: filename == "Untitled-1.txt")
+    untitled = file_ref("Untitled-1.txt")
+    registry.add(untitled)
+    assert registry.key("Untitled-1.txt") == "Untitled-1.txt"
+    assert registry.key("Untitled-2.txt") == os.path.normcase(
+        os.path.realpath(str(tmp_path / "Untitled-2.txt"))
+    )
+    assert registry.find("Untitled-1.txt") is untitled
+
+
+def test_registries_do_not_share_state():
+    first = TabRegistry()
+    second = TabRegistry()
+    reference = file_ref("a.txt")
+    first.add(reference)
+    assert len(second) == 0
+    assert reference not in second
+    assert second.find("a.txt") is None
+    assert second.first_ref() is None
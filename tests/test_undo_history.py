@@ -0,0 +1,171 @@
+import pytest
+
+from UndoHistory import UndoHistory
+
+
+class FakeText:
+    """Stands in for the text field, with "line.column+Nc" indexes."""
+
+    def __init__(self, text=""):
+        self.text = text
+
+    def offset(self, index):
+        index, _, plus = index.partition("+")
+        line, column = map(int, index.split("."))
+        start = 0
+        for _ in range(line - 1):
+            start = self.text.index("\n", start) + 1
+        offset = start + column
+        if plus:
+            offset += int(plus.rstrip("c"))
+        return offset
+
+    def insert(self, index, text):
+        offset = self.offset(index)
+        self.text = self.text[:offset] + text + self.text[offset:]
+
+    def delete(self, first, last):
+        start, end = self.offset(first), self.offset(last)
+        self.text = self.text[:start] + self.text[end:]
+
+
+def type_text(history, text_field, line, column, text):
+    """Types the text a character at a time, recording every edit."""
+    for character in text:
+        index = str(line) + "." + str(column)
+        text_field.insert(index, character)
+        history.record((index, "", character))
+        column += 1
+
+
+def test_typing_is_undone_a_word_at_a_time():
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "hello world")
+    assert text_field.text == "hello world"
+
+    history.undo(text_field)
+    assert text_field.text == "hello"
+    history.undo(text_field)
+    assert text_field.text == ""
+    assert history.undo(text_field) is None
+
+
+def test_redo_makes_the_edits_again():
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "one two")
+    history.undo(text_field)
+    history.undo(text_field)
+
+    assert history.redo(text_field) == "1.0+3c"
+    assert text_field.text == "one"
+    history.redo(text_field)
+    assert text_field.text == "one two"
+    assert history.redo(text_field) is None
+
+
+def test_a_new_edit_clears_the_redo():
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "abc")
+    history.undo(text_field)
+    history.record_group([("1.0", "", "x")])
+    assert history.redo(text_field) is None
+
+
+def test_backspaces_are_merged():
+    history = UndoHistory()
+    text_field = FakeText("abcd")
+    for column in (3, 2, 1):
+        index = "1." + str(column)
+        removed = text_field.text[column]
+        text_field.delete(index, index + "+1c")
+        history.record((index, removed, ""))
+    assert text_field.text == "a"
+
+    assert len(history.groups) == 1
+    history.undo(text_field)
+    assert text_field.text == "abcd"
+
+
+def test_groups_are_undone_at_once():
+    history = UndoHistory()
+    text_field = FakeText("one\ntwo\n")
+    history.begin_group()
+    for index, removed, inserted in (("2.0", "two", "2"), ("1.0", "one", "1")):
+        text_field.delete(index, index + "+" + str(len(removed)) + "c")
+        text_field.insert(index, inserted)
+        history.record((index, removed, inserted))
+    history.end_group()
+    assert text_field.text == "1\n2\n"
+
+    history.undo(text_field)
+    assert text_field.text == "one\ntwo\n"
+    history.redo(text_field)
+    assert text_field.text == "1\n2\n"
+
+
+def test_undo_and_redo_are_not_recorded():
+    history = UndoHistory()
+
+    class RecordingText(FakeText):
+        def insert(self, index, text):
+            super().insert(index, text)
+            history.record((index, "", text))
+
+    text_field = RecordingText()
+    history.record_group([("1.0", "x", "")])
+    history.undo(text_field)
+    assert text_field.text == "x"
+    assert len(history.groups) == 0
+
+
+def test_the_oldest_groups_are_dropped_over_the_limit():
+    history = UndoHistory(limit=3 * (UndoHistory.EDIT_OVERHEAD + 10))
+    for number in range(10):
+        history.record_group([("1.0", "", str(number) * 10)])
+    assert len(history.groups) == 3
+    assert history.size <= history.limit
+    assert history.groups[0] == [("1.0", "", "7" * 10)]
+
+
+@pytest.mark.parametrize("redo", [False, True])
+def test_compressed_history_is_kept(redo):
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "some words")
+    if redo:
+        history.undo(text_field)
+
+    history.compress()
+    assert len(history.groups) == 0
+    history.decompress()
+    history.undo(text_field)
+    assert text_field.text == ("" if redo else "some")
+
+
+def test_an_empty_group_is_dropped_and_keeps_the_redo():
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "abc")
+    history.undo(text_field)
+
+    history.begin_group()
+    history.end_group()
+    assert len(history.groups) == 0
+    assert history.redo(text_field) == "1.0+3c"
+    assert text_field.text == "abc"
+
+
+def test_an_edit_in_a_group_clears_the_redo():
+    history = UndoHistory()
+    text_field = FakeText()
+    type_text(history, text_field, 1, 0, "abc")
+    history.undo(text_field)
+
+    history.begin_group()
+    history.record(("1.0", "", "x"))
+    history.end_group()
+    assert history.redo(text_field) is None
+    assert history.groups[-1] == [("1.0", "", "x")]
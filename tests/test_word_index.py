@@ -0,0 +1,72 @@
+import time
+from collections import Counter
+
+from WordIndex import WordIndex, count_chunks, count_words
+
+
+class FakeWidget:
+    """Runs nothing by itself, the tests call `WordIndex.poll`."""
+
+    def after(self, delay, callback):
+        return "job"
+
+
+def wait_counted(index):
+    """Polls until the queued documents are counted."""
+    deadline = time.monotonic() + 5
+    while index.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+        index.poll()
+    assert not index.pending
+
+
+def test_count_words():
+    counts = count_words("the cat and the hat, a hat")
+    assert counts == Counter({"the": 2, "cat": 1, "and": 1, "hat": 2})
+
+
+def test_count_chunks_joins_words_across_chunks():
+    text = "completion of words across chunks"
+    for size in range(1, len(text) + 1):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert count_chunks(chunks) == count_words(text)
+
+
+def test_complete_by_frequency():
+    index = WordIndex(FakeWidget())
+    index.add("a", ["tabs table tables tablet tables"])
+    index.add("b", ["tablet tablet"])
+    wait_counted(index)
+
+    # Ties are in alphabetical order
+    assert index.complete("tab") == ["tablet", "tables", "table", "tabs"]
+    assert index.complete("tab", limit=1) == ["tablet"]
+    assert index.complete("tablet") == []  # Only longer words
+    assert index.complete("zzz") == []
+
+
+def test_remove_and_update():
+    index = WordIndex(FakeWidget())
+    index.add("a", ["alpha alpha beta"])
+    index.add("b", ["alphabet"])
+    wait_counted(index)
+
+    index.update("a", Counter({"alpha": 2}), Counter({"alpine": 1}))
+    assert index.complete("alp") == ["alphabet", "alpine"]
+
+    index.remove("b")
+    assert "b" not in index
+    assert index.complete("alp") == ["alpine"]
+    assert index.words == sorted(index.counts)
+
+
+def test_edits_while_counting_are_kept(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("present present\n")
+
+    index = WordIndex(FakeWidget())
+    index.add(str(path), str(path))
+    index.update(str(path), Counter({"present": 1}), Counter({"presto": 1}))
+    wait_counted(index)
+
+    assert index.counts == Counter({"present": 1, "presto": 1})
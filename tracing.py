@@ -0,0 +1,83 @@
+import functools
+import time
+from contextlib import contextmanager
+from Tracer import Tracer
+
+
+tracer = None  # Tracing is off until `enable` is called
+
+
+def enable(path):
+    """Starts writing the spans into the trace file, see `Tracer`."""
+    global tracer
+    disable()
+    tracer = Tracer(path)
+
+
+def disable():
+    global tracer
+    if tracer is not None:
+        tracer.close()
+        tracer = None
+
+
+def add_span(name, start, duration, args=None):
+    """Records a span that was measured by the caller."""
+    if tracer is not None:
+        tracer.add(name, start, duration, args)
+
+
+@contextmanager
+def span(name, **args):
+    """Records the time the block takes.
+
+    The block gets the args dict, to add what it learns to the span.
+
+    """
+    if tracer is None:
+        yield args
+        return
+
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        tracer.add(name, start, time.perf_counter() - start, args)
+
+
+def traced(name, details=None):
+    """Decorates a function so every call is recorded as a span.
+
+    Parameters
+    ----------
+    name : str
+    details : callable (*args), optional
+        Called with the arguments of the function before it runs,
+        returns the args dict of the span. It is not timed, and if it
+        fails the span has no args.
+
+    Note
+    ----
+    While tracing is off, the only cost is a check of `tracer`.
+
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if tracer is None:
+                return function(*args, **kwargs)
+
+            span_args = None
+            if details is not None:
+                try:
+                    span_args = details(*args)
+                except Exception:
+                    pass  # Tracing must not break the traced function
+
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add_span(name, start, time.perf_counter() - start, span_args)
+        return wrapper
+    return decorate